@@ -0,0 +1,46 @@
+from django.contrib import admin
+
+from edc_consent.modeladmin_mixins import ConsentModelAdminMixin
+
+from .admin_site import consent_app_admin
+from .models import SubjectConsent
+
+
+@admin.register(SubjectConsent, site=consent_app_admin)
+class SubjectConsentAdmin(ConsentModelAdminMixin, admin.ModelAdmin):
+    # SubjectConsent does not collect samples
+    exclude_fields = ("may_store_samples",)
+
+    fieldsets = (
+        (
+            None,
+            {
+                "fields": (
+                    "subject_identifier",
+                    "first_name",
+                    "last_name",
+                    "initials",
+                    "consent_datetime",
+                    "gender",
+                    "dob",
+                    "identity",
+                    "confirm_identity",
+                )
+            },
+        ),
+    )
+
+    def update_radio_fields(self) -> None:
+        # ConsentModelAdminMixin updates radio_fields in place
+        self.radio_fields = {}
+        super().update_radio_fields()
+        for f in self.exclude_fields:
+            del self.radio_fields[f]
+
+    def get_list_display(self, request) -> tuple[str, ...]:
+        list_display = super().get_list_display(request)
+        return tuple(f for f in list_display if f not in self.exclude_fields)
+
+    def get_list_filter(self, request) -> tuple[str, ...]:
+        list_filter = super().get_list_filter(request)
+        return tuple(f for f in list_filter if f not in self.exclude_fields)
@@ -0,0 +1,3 @@
+from django.contrib.admin import AdminSite
+
+consent_app_admin = AdminSite(name="consent_app_admin")
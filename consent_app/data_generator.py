@@ -0,0 +1,336 @@
+"""Synthetic consent data for load-testing and query-plan checks.
+
+See management command `generate_consent_data`.
+"""
+
+from __future__ import annotations
+
+import random
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from string import ascii_uppercase
+from uuid import UUID
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.sites.models import Site
+from django.db import transaction
+from edc_constants.constants import NO, YES
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from faker import Faker
+from model_bakery import baker
+
+from edc_consent.bulk_encryption import bulk_create_consents
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.consent_definition_extension import ConsentDefinitionExtension
+from edc_consent.site_consents import site_consents
+from edc_consent.tests.consent_test_utils import consent_definition_factory
+
+from .models import CrfOne, SubjectConsentV1Ext, SubjectVisit
+
+__all__ = ["ConsentDataGenerator", "DATE_DISTRIBUTIONS", "MAX_VERSIONS"]
+
+# one proxy model per consent definition, see consent_app.models
+CONSENT_MODELS = [
+    "consent_app.subjectconsentv1",
+    "consent_app.subjectconsentv2",
+    "consent_app.subjectconsentv3",
+    "consent_app.subjectconsentv4",
+]
+MAX_VERSIONS = len(CONSENT_MODELS)
+
+# mode of the triangular distribution of report dates within a
+# consent definition's validity period. `None` is uniform.
+DATE_DISTRIBUTIONS = {"uniform": None, "early": 0.0, "late": 1.0}
+
+
+@dataclass
+class ConsentDataGenerator:
+    """Bulk creates consents, re-consents, consent extensions and
+    CRFs (SubjectVisit and CrfOne) for consent_app.
+
+    `versions` consecutive consent definitions, each updating the
+    previous, are registered over the study period. Version 1 is
+    extended by `SubjectConsentV1Ext`. Each subject consents once at a
+    site and version drawn from `site_weights` and `version_weights`,
+    and re-consents to each later version with `reconsent_rate`.
+
+    Rows are prepared with the baker recipes and written with
+    `bulk_create`, `batch_size` subjects at a time, so at most one
+    batch is held in memory. `save`, signals and history are skipped.
+    Values
+    set by `save` (version, consent_definition_name, consent_version,
+    ...) are set here instead. Output is deterministic for a given
+    `seed`.
+    """
+
+    subjects: int = 1000
+    site_ids: list[int] = field(default_factory=lambda: [Site.objects.get_current().id])
+    versions: int = 2
+    site_weights: list[float] | None = None
+    version_weights: list[float] | None = None
+    date_distribution: str = "uniform"
+    reconsent_rate: float = 0.5
+    extension_rate: float = 0.5
+    crfs_per_subject: int = 3
+    visit_interval: timedelta = timedelta(days=28)
+    batch_size: int = 1000
+    seed: int = 0
+    cdefs: list[ConsentDefinition] = field(default_factory=list, init=False)
+
+    def __post_init__(self):
+        if not 1 <= self.versions <= MAX_VERSIONS:
+            raise ValueError(
+                f"Expected versions between 1 and {MAX_VERSIONS}. Got {self.versions}."
+            )
+        if self.date_distribution not in DATE_DISTRIBUTIONS:
+            raise ValueError(
+                f"Invalid date distribution. Expected one of {list(DATE_DISTRIBUTIONS)}. "
+                f"Got {self.date_distribution}."
+            )
+        for name, weights, expected in [
+            ("site_weights", self.site_weights, len(self.site_ids)),
+            ("version_weights", self.version_weights, self.versions),
+        ]:
+            if weights and len(weights) != expected:
+                raise ValueError(f"Expected {expected} {name}. Got {len(weights)}.")
+        self.rng = random.Random(self.seed)
+        self.fake = Faker()
+        self.fake.seed_instance(self.seed)
+        self.sites = Site.objects.in_bulk(self.site_ids)
+
+    def register_cdefs(self) -> list[ConsentDefinition]:
+        """Resets the registry and registers `versions` consecutive
+        consent definitions covering the study period.
+        """
+        site_consents.registry = {}
+        study_open = ResearchProtocolConfig().study_open_datetime
+        study_close = ResearchProtocolConfig().study_close_datetime
+        period = (study_close - study_open) / self.versions
+        self.cdefs = []
+        for index in range(self.versions):
+            self.cdefs.append(
+                consent_definition_factory(
+                    model=CONSENT_MODELS[index],
+                    start=study_open + (period * index),
+                    end=study_open + (period * (index + 1)) - timedelta(seconds=1),
+                    version=f"{index + 1}.0",
+                    updates=self.cdefs[index - 1] if index else None,
+                )
+            )
+        extension = ConsentDefinitionExtension(
+            "consent_app.subjectconsentv1ext",
+            version="1.1",
+            start=self.cdefs[0].start + ((self.cdefs[0].end - self.cdefs[0].start) / 2),
+            extends=self.cdefs[0],
+            timepoints=[1, 2],
+        )
+        for index, cdef in enumerate(self.cdefs):
+            site_consents.register(
+                cdef,
+                updated_by=self.cdefs[index + 1] if index + 1 < self.versions else None,
+                extended_by=extension if index == 0 else None,
+            )
+        return self.cdefs
+
+    def generate(self) -> dict[str, int]:
+        """Registers the consent definitions and bulk creates the
+        data. Returns the number of rows created by model.
+        """
+        self.register_cdefs()
+        counts = {cdef.model: 0 for cdef in self.cdefs}
+        counts.update(
+            {
+                model_cls._meta.label_lower: 0
+                for model_cls in [SubjectConsentV1Ext, SubjectVisit, CrfOne]
+            }
+        )
+        with transaction.atomic():
+            for start in range(0, self.subjects, self.batch_size):
+                stop = min(start + self.batch_size, self.subjects)
+                for model, created in self.generate_batch(range(start, stop)).items():
+                    counts[model] += created
+        return counts
+
+    def generate_batch(self, indexes: range) -> dict[str, int]:
+        """Prepares and bulk creates the data for the subjects in
+        `indexes`. Returns the number of rows created by model.
+        """
+        consents: dict[str, list] = {cdef.model: [] for cdef in self.cdefs}
+        extensions, visits, crfs = [], [], []
+        for index in indexes:
+            subject_consents = self.prepare_subject_consents(index)
+            for cdef, obj in subject_consents:
+                consents[cdef.model].append(obj)
+            extension = self.prepare_extension(*subject_consents[0])
+            if extension:
+                extensions.append(extension)
+            for subject_visit, crf in self.prepare_crfs(subject_consents, extension):
+                visits.append(subject_visit)
+                crfs.append(crf)
+        counts = {}
+        for model, objs in consents.items():
+            bulk_create_consents(objs, batch_size=self.batch_size)
+            counts.update({model: len(objs)})
+        for model_cls, objs in [
+            (SubjectConsentV1Ext, extensions),
+            (SubjectVisit, visits),
+            (CrfOne, crfs),
+        ]:
+            model_cls.objects.bulk_create(objs, batch_size=self.batch_size)
+            counts.update({model_cls._meta.label_lower: len(objs)})
+        return counts
+
+    def prepare_subject_consents(self, index: int) -> list[tuple[ConsentDefinition, object]]:
+        """Returns the consent and any re-consents for one subject as
+        a list of (cdef, unsaved consent).
+        """
+        subject_identifier = f"S{index:07d}"
+        site = self.sites[self.rng.choices(self.site_ids, weights=self.site_weights)[0]]
+        first_index = self.rng.choices(range(self.versions), weights=self.version_weights)[0]
+        consent_datetime = self.get_report_datetime(self.cdefs[first_index])
+        last_name = self.fake.last_name().upper()
+        # unique per subject, see unique constraints on ConsentModelMixin
+        first_name = f"{self.fake.first_name().upper()} {self.get_letters(index)}"
+        opts = dict(
+            subject_identifier=subject_identifier,
+            first_name=first_name,
+            last_name=last_name,
+            initials=f"{first_name[0]}{last_name[0]}",
+            dob=(consent_datetime - relativedelta(years=self.rng.randint(18, 60))).date(),
+            identity=f"{index:09d}",
+            confirm_identity=f"{index:09d}",
+            citizen=YES,
+            subject_type="subject",
+            site=site,
+        )
+        subject_consents = []
+        for cdef_index in range(first_index, self.versions):
+            if cdef_index > first_index:
+                if self.rng.random() >= self.reconsent_rate:
+                    break
+                consent_datetime = self.get_report_datetime(self.cdefs[cdef_index])
+            cdef = self.cdefs[cdef_index]
+            subject_consents.append(
+                (
+                    cdef,
+                    baker.prepare_recipe(
+                        cdef.model,
+                        id=self.get_uuid(),
+                        subject_identifier_as_pk=self.get_uuid(),
+                        consent_identifier=self.get_uuid(),
+                        screening_identifier=f"{subject_identifier}-{cdef.version}",
+                        consent_datetime=consent_datetime,
+                        report_datetime=consent_datetime,
+                        created=consent_datetime,
+                        modified=consent_datetime,
+                        model_name=cdef.model,
+                        version=cdef.version,
+                        consent_definition_name=cdef.name,
+                        **opts,
+                    ),
+                )
+            )
+        return subject_consents
+
+    def prepare_extension(
+        self, cdef: ConsentDefinition, subject_consent
+    ) -> SubjectConsentV1Ext | None:
+        """Returns an unsaved extension or None for a subject first
+        consented to the extended version.
+        """
+        if not cdef.extended_by or self.rng.random() >= self.extension_rate:
+            return None
+        report_datetime = max(cdef.extended_by.start, subject_consent.consent_datetime)
+        report_datetime += (cdef.end - report_datetime) * self.rng.random()
+        return SubjectConsentV1Ext(
+            id=self.get_uuid(),
+            subject_consent=subject_consent,
+            subject_identifier=subject_consent.subject_identifier,
+            subject_identifier_as_pk=self.get_uuid(),
+            report_datetime=report_datetime,
+            created=report_datetime,
+            modified=report_datetime,
+            agrees_to_extension=self.rng.choice([YES, YES, YES, NO]),
+            consent_extension_version=cdef.extended_by.version,
+            consent_extension_definition_name=cdef.extended_by.name,
+            site=subject_consent.site,
+        )
+
+    def prepare_crfs(
+        self,
+        subject_consents: list[tuple[ConsentDefinition, object]],
+        extension: SubjectConsentV1Ext | None,
+    ) -> list[tuple[SubjectVisit, CrfOne]]:
+        """Returns unsaved (SubjectVisit, CrfOne) pairs at
+        `visit_interval` from the first consent.
+
+        Like `requires_consent_on_pre_save`, visits are stamped with
+        the version of the consent definition for the report date,
+        or the extension's version if the subject agreed to the
+        extension. Visits on a date not covered by one of the
+        subject's consents are skipped.
+        """
+        pairs = []
+        subject_consent = subject_consents[0][1]
+        versions = {cdef.version for cdef, _ in subject_consents}
+        starts = [cdef.start for cdef in self.cdefs]
+        for timepoint in range(self.crfs_per_subject):
+            report_datetime = (
+                subject_consent.consent_datetime + self.visit_interval * timepoint
+            )
+            cdef = self.cdefs[bisect_right(starts, report_datetime) - 1]
+            if cdef.version not in versions or report_datetime > cdef.end:
+                continue
+            version = cdef.version
+            if (
+                extension
+                and extension.agrees_to_extension == YES
+                and cdef.extended_by
+                and cdef.extended_by.start <= report_datetime
+                and extension.report_datetime <= report_datetime
+            ):
+                version = cdef.extended_by.version
+            opts = dict(
+                report_datetime=report_datetime,
+                created=report_datetime,
+                modified=report_datetime,
+                consent_version=version,
+                consent_model=cdef.model,
+                site=subject_consent.site,
+            )
+            subject_visit = SubjectVisit(
+                id=self.get_uuid(),
+                subject_identifier=subject_consent.subject_identifier,
+                visit_schedule_name="visit_schedule",
+                schedule_name="schedule1",
+                **opts,
+            )
+            crf = CrfOne(
+                id=self.get_uuid(),
+                subject_visit=subject_visit,
+                subject_identifier=subject_consent.subject_identifier,
+                subject_identifier_as_pk=self.get_uuid(),
+                **opts,
+            )
+            pairs.append((subject_visit, crf))
+        return pairs
+
+    def get_report_datetime(self, cdef: ConsentDefinition) -> datetime:
+        mode = DATE_DISTRIBUTIONS[self.date_distribution]
+        if mode is None:
+            fraction = self.rng.random()
+        else:
+            fraction = self.rng.triangular(0.0, 1.0, mode)
+        return cdef.start + (cdef.end - cdef.start) * fraction
+
+    def get_uuid(self) -> UUID:
+        return UUID(int=self.rng.getrandbits(128), version=4)
+
+    @staticmethod
+    def get_letters(index: int) -> str:
+        """Returns `index` as uppercase letters, e.g. 0 -> A, 26 -> BA."""
+        letters = ascii_uppercase[index % 26]
+        while index := index // 26:
+            letters = ascii_uppercase[index % 26] + letters
+        return letters
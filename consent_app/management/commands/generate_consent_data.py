@@ -0,0 +1,89 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from consent_app.data_generator import (
+    DATE_DISTRIBUTIONS,
+    MAX_VERSIONS,
+    ConsentDataGenerator,
+)
+from edc_consent.tests.benchmarks.utils import register_sites
+
+
+def weights(value: str) -> list[float]:
+    return [float(w) for w in value.split(",")]
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk create synthetic consents, re-consents, consent extensions and "
+        "CRFs for consent_app. Deterministic for a given --seed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subjects", dest="subjects", type=int, default=1000)
+        parser.add_argument(
+            "--sites",
+            dest="sites",
+            type=int,
+            default=1,
+            help="Number of sites to register",
+        )
+        parser.add_argument(
+            "--versions",
+            dest="versions",
+            type=int,
+            default=2,
+            choices=range(1, MAX_VERSIONS + 1),
+            help="Number of consecutive consent versions",
+        )
+        parser.add_argument(
+            "--site-weights",
+            dest="site_weights",
+            type=weights,
+            default=None,
+            help="Comma separated, one per site. Default is equal weights",
+        )
+        parser.add_argument(
+            "--version-weights",
+            dest="version_weights",
+            type=weights,
+            default=None,
+            help="Comma separated, one per version. Weights the version first consented to",
+        )
+        parser.add_argument(
+            "--date-distribution",
+            dest="date_distribution",
+            choices=list(DATE_DISTRIBUTIONS),
+            default="uniform",
+            help="Distribution of report dates within each consent period",
+        )
+        parser.add_argument("--reconsent-rate", dest="reconsent_rate", type=float, default=0.5)
+        parser.add_argument("--extension-rate", dest="extension_rate", type=float, default=0.5)
+        parser.add_argument("--crfs-per-subject", dest="crfs_per_subject", type=int, default=3)
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=1000)
+        parser.add_argument("--seed", dest="seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        sites = register_sites(options["sites"])
+        try:
+            generator = ConsentDataGenerator(
+                subjects=options["subjects"],
+                site_ids=[site.site_id for site in sites],
+                versions=options["versions"],
+                site_weights=options["site_weights"],
+                version_weights=options["version_weights"],
+                date_distribution=options["date_distribution"],
+                reconsent_rate=options["reconsent_rate"],
+                extension_rate=options["extension_rate"],
+                crfs_per_subject=options["crfs_per_subject"],
+                batch_size=options["batch_size"],
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        start = perf_counter()
+        counts = generator.generate()
+        for model, count in counts.items():
+            self.stdout.write(f"{model}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Done in {perf_counter() - start:.1f}s"))
@@ -17,7 +17,11 @@ from edc_consent.field_mixins import (
     ReviewFieldsMixin,
     VulnerabilityFieldsMixin,
 )
-from edc_consent.managers import ConsentObjectsByCdefManager, CurrentSiteByCdefManager
+from edc_consent.managers import (
+    ConsentObjectsByCdefManager,
+    CurrentSiteByCdefManager,
+    RequiresConsentManager,
+)
 from edc_consent.model_mixins import (
     ConsentExtensionModelMixin,
     ConsentModelMixin,
@@ -194,6 +198,10 @@ class TestModel(
 ):
     report_datetime = models.DateTimeField(default=get_utcnow)
 
+    objects = RequiresConsentManager()
+
+    history = HistoricalRecords()
+
 
 class CrfOne(
     RequiresConsentFieldsModelMixin,
@@ -1,5 +1,23 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from django.contrib import messages
+from django.http import StreamingHttpResponse
 from edc_utils import get_utcnow
+from simple_history.exceptions import NotHistoricalModelError
+from simple_history.utils import get_history_manager_for_model
+
+from .export import ConsentExport
+from .utils import get_open_data_query_counts
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from django.db.models import QuerySet
+
+# subject identifiers listed in an action message before truncating
+MAX_SUBJECTS_IN_MESSAGE = 10
 
 
 def verify_consent(request=None, consent_obj=None):
@@ -21,36 +39,133 @@ def unverify_consent(consent_obj=None):
     return consent_obj
 
 
+def verify_consents(request=None, queryset: QuerySet = None) -> int:
+    """Verifies the unverified consents in the queryset with a single
+    UPDATE and writes the history records in bulk.
+
+    Returns the number of consents verified.
+    """
+    verified_datetime = get_utcnow()
+    return _bulk_update_verification(
+        request=request,
+        queryset=queryset.filter(is_verified=False),
+        is_verified=True,
+        is_verified_datetime=verified_datetime,
+        verified_by=request.user.username,
+        history_date=verified_datetime,
+    )
+
+
+def unverify_consents(request=None, queryset: QuerySet = None) -> int:
+    """Unverifies the verified consents in the queryset with a single
+    UPDATE and writes the history records in bulk.
+
+    Returns the number of consents unverified.
+    """
+    return _bulk_update_verification(
+        request=request,
+        queryset=queryset.filter(is_verified=True),
+        is_verified=False,
+        is_verified_datetime=None,
+        verified_by=None,
+        history_date=get_utcnow(),
+    )
+
+
+def _bulk_update_verification(
+    request=None,
+    queryset: QuerySet = None,
+    history_date: datetime | None = None,
+    **values,
+) -> int:
+    consent_objs = list(queryset)
+    if not consent_objs:
+        return 0
+    for consent_obj in consent_objs:
+        for attr, value in values.items():
+            setattr(consent_obj, attr, value)
+    updated = queryset.model._base_manager.filter(
+        pk__in=[consent_obj.pk for consent_obj in consent_objs]
+    ).update(**values)
+    try:
+        history_manager = get_history_manager_for_model(queryset.model._meta.concrete_model)
+    except NotHistoricalModelError:
+        pass
+    else:
+        history_manager.bulk_history_create(
+            consent_objs,
+            update=True,
+            default_user=getattr(request, "user", None),
+            default_date=history_date,
+        )
+    return updated
+
+
 def flag_as_verified_against_paper(modeladmin, request, queryset, **kwargs):  # noqa
-    """Flags instance as verified against the paper document."""
-    for consent_obj in queryset:
-        if not consent_obj.open_data_queries.count() > 0:
-            if verify_consent(request, consent_obj):
-                messages.add_message(
-                    request,
-                    messages.SUCCESS,
-                    f"'{consent_obj._meta.verbose_name}' for ' "
-                    f"{consent_obj.subject_identifier}' "
-                    f"has been verified against the paper document.",
-                )
-        else:
-            messages.add_message(
-                request,
-                messages.ERROR,
-                f"'{consent_obj._meta.verbose_name}' for ' "
-                f"{consent_obj.subject_identifier}' "
-                f"has open data queries.",
+    """Flags instances as verified against the paper document.
+
+    Consents for subjects with open data queries are skipped.
+    """
+    opts = queryset.model._meta
+    open_query_counts = get_open_data_query_counts(
+        queryset.values_list("subject_identifier", flat=True), model=opts.label_lower
+    )
+    verified = verify_consents(
+        request=request,
+        queryset=queryset.exclude(subject_identifier__in=list(open_query_counts)),
+    )
+    message = (
+        f"{verified} '{opts.verbose_name_plural}' have been verified "
+        "against the paper document."
+    )
+    if open_query_counts:
+        skipped = sorted(open_query_counts)
+        message = f"{message} Skipped {len(skipped)} with open data queries. "
+        if len(skipped) > MAX_SUBJECTS_IN_MESSAGE:
+            message = (
+                f"{message}See {', '.join(skipped[:MAX_SUBJECTS_IN_MESSAGE])} "
+                f"and {len(skipped) - MAX_SUBJECTS_IN_MESSAGE} more."
             )
+        else:
+            message = f"{message}See {', '.join(skipped)}."
+    messages.add_message(
+        request, messages.WARNING if open_query_counts else messages.SUCCESS, message
+    )
 
 
 flag_as_verified_against_paper.short_description = "Verify consent against paper document"
 
 
 def unflag_as_verified_against_paper(modeladmin, request, queryset, **kwargs):  # noqa
-    """Unflags instance as verified."""
-    for consent_obj in queryset:
-        unverify_consent(consent_obj)
+    """Unflags instances as verified."""
+    unverified = unverify_consents(request=request, queryset=queryset)
+    messages.add_message(
+        request,
+        messages.SUCCESS,
+        f"{unverified} '{queryset.model._meta.verbose_name_plural}' have been unverified.",
+    )
 
 
 # noinspection PyTypeHints
 unflag_as_verified_against_paper.short_description = "Unverify consent"  # type:ignore
+
+
+def export_consents_as_csv(modeladmin, request, queryset, **kwargs):  # noqa
+    """Streams the selected consents as a CSV listing, see
+    edc_consent.export.
+
+    Requires the `edc_consent.export_consents` permission, see
+    ConsentModelAdminMixin.has_export_permission.
+    """
+    opts = queryset.model._meta
+    response = StreamingHttpResponse(
+        ConsentExport(queryset=queryset).as_csv(), content_type="text/csv"
+    )
+    filename = f"{opts.model_name}_{get_utcnow().strftime('%Y%m%d%H%M%S')}.csv"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+# noinspection PyTypeHints
+export_consents_as_csv.short_description = "Export consent listing (CSV)"  # type:ignore
+export_consents_as_csv.allowed_permissions = ("export",)  # type:ignore
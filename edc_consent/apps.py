@@ -1,7 +1,29 @@
 from django.apps import AppConfig as DjangoAppConfig
+from django.conf import settings
+from django.core.signals import request_finished
+from django.test.signals import setting_changed
 
 
 class AppConfig(DjangoAppConfig):
     name = "edc_consent"
     verbose_name = "Edc Consent"
     include_in_administration_section = True
+
+    def ready(self):
+        from .instrumentation import consent_metrics, publish_consent_metrics
+        from .timeline import (
+            connect_timeline_signals,
+            timeline_enabled,
+            timeline_setting_changed,
+        )
+
+        if timeline_enabled():
+            connect_timeline_signals()
+        setting_changed.connect(
+            timeline_setting_changed, dispatch_uid="edc_consent.timeline_setting_changed"
+        )
+        if getattr(settings, "EDC_CONSENT_INSTRUMENTATION", False):
+            consent_metrics.enable()
+        request_finished.connect(
+            publish_consent_metrics, dispatch_uid="edc_consent.publish_consent_metrics"
+        )
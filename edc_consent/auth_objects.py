@@ -7,6 +7,10 @@ navbar_tuples = []
 for codename in navbar_codenames:
     navbar_tuples.append((codename, f"Can access {codename.split('.')[1]}"))
 
+export_codenames = ["edc_consent.export_consents"]
+
+export_tuples = [("edc_consent.export_consents", "Can export consent listing")]
+
 consent_codenames = []
 try:
     cdefs = site_consents.get_consent_definitions()
@@ -22,4 +26,5 @@ else:
 
 
 consent_codenames.extend(navbar_codenames)
+consent_codenames.extend(export_codenames)
 consent_codenames.sort()
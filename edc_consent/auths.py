@@ -3,7 +3,7 @@ from edc_auth.constants import PII, PII_VIEW
 from edc_auth.site_auths import site_auths
 from edc_auth.utils import remove_default_model_permissions_from_edc_permissions
 
-from .auth_objects import consent_codenames, navbar_tuples
+from .auth_objects import consent_codenames, export_tuples, navbar_tuples
 
 site_auths.add_post_update_func(
     "edc_consent",
@@ -13,6 +13,9 @@ site_auths.add_post_update_func(
 site_auths.add_custom_permissions_tuples(
     model="edc_consent.edcpermissions", codename_tuples=navbar_tuples
 )
+site_auths.add_custom_permissions_tuples(
+    model="edc_consent.edcpermissions", codename_tuples=export_tuples
+)
 
 site_auths.update_group(*consent_codenames, name=PII, no_delete=True)
 site_auths.update_group(*consent_codenames, name=PII_VIEW, view_only=True)
@@ -0,0 +1,214 @@
+"""Batched encryption for bulk creating consents.
+
+Saving a model with encrypted fields hashes and encrypts each value
+on its own: a PBKDF2 hash, an RSA or AES cipher and a lookup and
+insert on the `Crypt` table, per field, per row. For bulk imports and
+re-consent campaigns this crypto work is the bottleneck.
+
+`BulkEncryptor` does the same work once per unique value for a batch
+of unsaved instances:
+
+* values are deduplicated by algorithm and access mode;
+* one `FieldCryptor` (salt and keys) is used per algorithm and mode;
+* existing secrets are found with one query per chunk of hashes;
+* missing secrets are encrypted and inserted with `bulk_create`;
+* for large batches, hashing and encryption run in a thread pool
+  (`hashlib.pbkdf2_hmac` releases the GIL).
+
+The stored column value is the same hash prefix and hash the per-row
+path stores, see `FieldCryptor.get_prep_value`.
+
+    bulk_create_consents(objs, batch_size=500)
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Type
+from uuid import uuid4
+
+from Cryptodome.Cipher import AES as AES_CIPHER
+from django.core.cache import cache
+from django.db import models
+from django_crypto_fields.constants import HASH_PREFIX
+from django_crypto_fields.field_cryptor import FieldCryptor
+from django_crypto_fields.fields import BaseField
+from django_crypto_fields.utils import get_crypt_model_cls
+
+if TYPE_CHECKING:
+    from .stubs import ConsentLikeModel
+
+__all__ = ["BulkEncryptor", "bulk_create_consents", "get_encrypted_fields"]
+
+# below this number of unique values, hash and encrypt in this thread
+PARALLEL_THRESHOLD = 64
+CHUNK_SIZE = 500
+
+
+def get_encrypted_fields(model_cls: Type[models.Model]) -> list[BaseField]:
+    return [f for f in model_cls._meta.concrete_fields if isinstance(f, BaseField)]
+
+
+def is_plaintext(value: Any) -> bool:
+    if isinstance(value, (str, bytes)):
+        return not FieldCryptor.is_encrypted(value)
+    return value is not None
+
+
+class BulkEncryptor:
+    """Hashes and encrypts the encrypted field values of a batch of
+    unsaved model instances.
+
+    Use `encrypted(objs)` to replace the plaintext values with the
+    hash the field would store while saving.
+    """
+
+    def __init__(
+        self,
+        model_cls: Type[models.Model],
+        workers: int | None = None,
+        parallel_threshold: int | None = None,
+    ):
+        self.model_cls = model_cls
+        self.fields = get_encrypted_fields(model_cls)
+        self.workers = workers
+        self.parallel_threshold = (
+            PARALLEL_THRESHOLD if parallel_threshold is None else parallel_threshold
+        )
+        self.cryptors: dict[tuple[str, str], FieldCryptor] = {}
+        for fld in self.fields:
+            key = (fld.algorithm, fld.mode)
+            if key not in self.cryptors:
+                self.cryptors[key] = FieldCryptor(fld.algorithm, fld.mode)
+
+    def get_values(self, objs: Iterable[models.Model]) -> dict[tuple[str, str], set]:
+        """Returns the unique plaintext values by (algorithm, mode)."""
+        values: dict[tuple[str, str], set] = {key: set() for key in self.cryptors}
+        for obj in objs:
+            for fld in self.fields:
+                value = getattr(obj, fld.attname)
+                if is_plaintext(value):
+                    values[(fld.algorithm, fld.mode)].add(value)
+        return values
+
+    def map(self, func, items: list) -> list:
+        if len(items) < self.parallel_threshold or self.workers == 1:
+            return [func(item) for item in items]
+        # threads, not processes: the work is in C code that releases the
+        # GIL and FieldCryptor (keys, salt) is not picklable. See
+        # benchmarks/bench_bulk_encryption.py.
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(func, items))
+
+    def encrypt(self, objs: Iterable[models.Model]) -> dict[tuple[str, str], dict[Any, bytes]]:
+        """Returns a dict of hashes with prefix by plaintext value
+        by (algorithm, mode).
+
+        Inserts any missing secrets into the Crypt model and the
+        cache, as `FieldCryptor.update_crypt` does.
+        """
+        hashes = {}
+        for key, values in self.get_values(objs).items():
+            field_cryptor = self.cryptors[key]
+            values = list(values)
+            hashed_values = dict(zip(values, self.map(field_cryptor.hash, values)))
+            self.update_crypt(field_cryptor, hashed_values)
+            hashes[key] = {
+                value: HASH_PREFIX.encode() + hashed_value
+                for value, hashed_value in hashed_values.items()
+            }
+        return hashes
+
+    def update_crypt(self, field_cryptor: FieldCryptor, hashed_values: dict[Any, bytes]):
+        crypt_model_cls = get_crypt_model_cls()
+        opts = dict(algorithm=field_cryptor.algorithm, mode=field_cryptor.access_mode)
+        by_hash = {
+            hashed_value.decode(): value for value, hashed_value in hashed_values.items()
+        }
+        existing = set()
+        hashes = list(by_hash)
+        for index in range(0, len(hashes), CHUNK_SIZE):
+            existing.update(
+                crypt_model_cls.objects.using(field_cryptor.using)
+                .filter(hash__in=hashes[index : index + CHUNK_SIZE], **opts)
+                .values_list("hash", flat=True)
+            )
+        missing = [hashed_value for hashed_value in hashes if hashed_value not in existing]
+        secrets = self.map(
+            field_cryptor.cryptor.encrypt, [by_hash[hashed_value] for hashed_value in missing]
+        )
+        crypt_model_cls.objects.using(field_cryptor.using).bulk_create(
+            [
+                crypt_model_cls(
+                    hash=hashed_value,
+                    secret=secret,
+                    cipher_mode=AES_CIPHER.MODE_CBC,
+                    **opts,
+                )
+                for hashed_value, secret in zip(missing, secrets)
+            ],
+            batch_size=CHUNK_SIZE,
+            ignore_conflicts=True,
+        )
+        # same (bytes) cache keys as FieldCryptor.update_crypt
+        cache.set_many(
+            {
+                field_cryptor.cache_key_prefix + hashed_value.encode(): secret
+                for hashed_value, secret in zip(missing, secrets)
+            }
+        )
+
+    @contextmanager
+    def encrypted(self, objs: list[models.Model]) -> Iterator[list[models.Model]]:
+        """Sets each encrypted field to the hash with prefix and
+        restores the plaintext on exit.
+
+        The field's `get_prep_value` does not re-encrypt a value that
+        is already a hash with prefix.
+        """
+        hashes = self.encrypt(objs)
+        plaintext = []
+        for obj in objs:
+            values = {}
+            for fld in self.fields:
+                value = getattr(obj, fld.attname)
+                if is_plaintext(value):
+                    values[fld.attname] = value
+                    setattr(obj, fld.attname, hashes[(fld.algorithm, fld.mode)][value])
+            plaintext.append(values)
+        try:
+            yield objs
+        finally:
+            for obj, values in zip(objs, plaintext):
+                for attname, value in values.items():
+                    setattr(obj, attname, value)
+
+
+def bulk_create_consents(
+    objs: list[ConsentLikeModel],
+    batch_size: int | None = None,
+    workers: int | None = None,
+) -> list[ConsentLikeModel]:
+    """Bulk creates consents of one model, encrypting their PII
+    values in batches.
+
+    Like `QuerySet.bulk_create`, `save`, signals and history are
+    skipped. Set `version`, `consent_definition_name`, `model_name`
+    and the subject identifiers before calling. A missing `id` is set
+    here, as `UUIDAutoField.pre_save` would on save.
+    """
+    if not objs:
+        return []
+    for obj in objs:
+        if obj.id is None:
+            obj.id = uuid4()
+    model_cls = type(objs[0])
+    batch_size = batch_size or CHUNK_SIZE
+    encryptor = BulkEncryptor(model_cls, workers=workers)
+    created = []
+    for index in range(0, len(objs), batch_size):
+        batch = objs[index : index + batch_size]
+        with encryptor.encrypted(batch):
+            created.extend(model_cls.objects.bulk_create(batch))
+    return created
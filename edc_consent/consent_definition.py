@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import KW_ONLY, dataclass, field
 from datetime import datetime
+from functools import total_ordering
 from typing import TYPE_CHECKING, Type
 
 from django.apps import apps as django_apps
@@ -13,11 +14,13 @@ from edc_sites import site_sites
 from edc_utils import ceil_secs, floor_secs, formatted_date, formatted_datetime
 from edc_utils.date import to_local
 
+from .consent_handle import HANDLE_FIELDS, ConsentHandle
 from .exceptions import (
     ConsentDefinitionError,
     ConsentDefinitionValidityPeriodError,
     NotConsentedError,
 )
+from .instrumentation import instrumented
 
 if TYPE_CHECKING:
     from edc_model.models import BaseUuidModel
@@ -29,44 +32,64 @@ if TYPE_CHECKING:
     class SubjectScreening(ScreeningModelMixin, EligibilityModelMixin, BaseUuidModel): ...
 
 
-@dataclass(order=True)
+@total_ordering
+@dataclass(eq=False, frozen=True, slots=True)
 class ConsentDefinition:
     """A class that represents the general attributes
     of a consent.
+
+    Instances are immutable. List-like attributes (gender, site_ids,
+    screening_model, timepoints) may be given as lists but are
+    stored as tuples or a frozenset. `updated_by` and `extended_by`
+    are set once, when registered, see `link` and site_consents.
+
+    Equality, hash and order are by (start, name).
     """
 
-    proxy_model: str = field(compare=False)
+    proxy_model: str
     _ = KW_ONLY
-    start: datetime = field(default=ResearchProtocolConfig().study_open_datetime, compare=True)
-    end: datetime = field(default=ResearchProtocolConfig().study_close_datetime, compare=False)
-    version: str = field(default="1", compare=False)
-    updates: ConsentDefinition = field(default=None, compare=False)
-    extends: ConsentDefinition = field(default=None, compare=False)
-    screening_model: list[str] = field(default_factory=list, compare=False)
-    age_min: int = field(default=18, compare=False)
-    age_max: int = field(default=110, compare=False)
-    age_is_adult: int = field(default=18, compare=False)
-    gender: list[str] | None = field(default_factory=list, compare=False)
-    site_ids: list[int] = field(default_factory=list, compare=False)
-    country: str | None = field(default=None, compare=False)
-    validate_duration_overlap_by_model: bool | None = field(default=True, compare=False)
-    subject_type: str = field(default="subject", compare=False)
-    timepoints: list[int] | None = field(default_factory=list, compare=False)
-
-    name: str = field(init=False, compare=False)
+    start: datetime = ResearchProtocolConfig().study_open_datetime
+    end: datetime = ResearchProtocolConfig().study_close_datetime
+    version: str = "1"
+    updates: ConsentDefinition = None
+    extends: ConsentDefinition = None
+    screening_model: tuple[str, ...] = ()
+    age_min: int = 18
+    age_max: int = 110
+    age_is_adult: int = 18
+    gender: tuple[str, ...] = ()
+    site_ids: tuple[int, ...] = ()
+    country: str | None = None
+    validate_duration_overlap_by_model: bool | None = True
+    subject_type: str = "subject"
+    timepoints: frozenset[int] = frozenset()
+
+    name: str = field(init=False)
     # set updated_by when the cdef is registered, see site_consents
-    updated_by: ConsentDefinition = field(default=None, compare=False, init=False)
-    extended_by: ConsentDefinitionExtension = field(default=None, compare=False, init=False)
-    _model: str = field(init=False, compare=False)
-    sort_index: str = field(init=False)
+    updated_by: ConsentDefinition = field(default=None, init=False)
+    extended_by: ConsentDefinitionExtension = field(default=None, init=False)
+    _model: str = field(init=False, repr=False)
+    sort_index: str = field(init=False, repr=False)
+    sort_key: tuple[datetime, str] = field(init=False, repr=False)
+    _hash: int = field(init=False, repr=False)
 
     def __post_init__(self):
-        self.model = self.proxy_model
-        self.name = f"{self.proxy_model}-{self.version}"
-        self.sort_index = self.name
-        self.gender = [MALE, FEMALE] if not self.gender else self.gender
-        if not self.screening_model:
-            self.screening_model = [get_subject_screening_model()]
+        name = f"{self.proxy_model}-{self.version}"
+        screening_model = self.screening_model or [get_subject_screening_model()]
+        if isinstance(screening_model, str):
+            screening_model = [screening_model]
+        for attr, value in [
+            ("_model", self.proxy_model),
+            ("name", name),
+            ("sort_index", name),
+            ("sort_key", (self.start, name)),
+            ("_hash", hash((self.start, name))),
+            ("gender", tuple(self.gender or [MALE, FEMALE])),
+            ("screening_model", tuple(screening_model)),
+            ("site_ids", tuple(self.site_ids or ())),
+            ("timepoints", frozenset(self.timepoints or ())),
+        ]:
+            object.__setattr__(self, attr, value)
         if MALE not in self.gender and FEMALE not in self.gender:
             raise ConsentDefinitionError(f"Invalid gender. Got {self.gender}.")
         if not self.start.tzinfo:
@@ -83,6 +106,31 @@ class ConsentDefinition:
             )
         self.check_date_within_study_period()
 
+    def __eq__(self, other):
+        if not isinstance(other, ConsentDefinition):
+            return NotImplemented
+        return self.sort_key == other.sort_key
+
+    def __lt__(self, other):
+        if not isinstance(other, ConsentDefinition):
+            return NotImplemented
+        return self.sort_key < other.sort_key
+
+    def __hash__(self):
+        return self._hash
+
+    def link(
+        self,
+        updated_by: ConsentDefinition | None = None,
+        extended_by: ConsentDefinitionExtension | None = None,
+    ) -> None:
+        """Sets `updated_by` and `extended_by`.
+
+        Called by site_consents.register.
+        """
+        object.__setattr__(self, "updated_by", updated_by)
+        object.__setattr__(self, "extended_by", extended_by)
+
     @property
     def model(self):
         from .managers import ConsentObjectsByCdefManager, CurrentSiteByCdefManager
@@ -106,10 +154,6 @@ class ConsentDefinition:
             )
         return self._model
 
-    @model.setter
-    def model(self, value):
-        self._model = value
-
     @property
     def sites(self):
         if not site_sites.loaded:
@@ -126,31 +170,84 @@ class ConsentDefinition:
             sites = [s for s in site_sites.all(aslist=True)]
         return sites
 
+    @instrumented("ConsentDefinition.get_consent_for")
     def get_consent_for(
         self,
         subject_identifier: str = None,
         site_id: int | None = None,
         raise_if_not_consented: bool | None = None,
-    ) -> ConsentLikeModel | None:
+        using: str | None = None,
+        lightweight: bool | None = None,
+    ) -> ConsentLikeModel | ConsentHandle | None:
+        """Returns the subject's consent for this version.
+
+        `using` is a database alias. If None, the database routers
+        decide, see edc_consent.routers.
+
+        If `lightweight`, returns a ConsentHandle read from the
+        non-encrypted columns instead of the model instance.
+        """
         raise_if_not_consented = (
             True if raise_if_not_consented is None else raise_if_not_consented
         )
-        opts: dict[str, str | int] = dict(
-            subject_identifier=subject_identifier, version=self.version
+        qs = self.model_cls.objects.using(using)
+        opts = self.get_consent_for_opts(subject_identifier, site_id)
+        try:
+            if lightweight:
+                consent_obj = ConsentHandle.from_row(
+                    qs.values_list(*HANDLE_FIELDS).get(**opts), model=self.model
+                )
+            else:
+                consent_obj = qs.get(**opts)
+        except ObjectDoesNotExist:
+            consent_obj = None
+        if not consent_obj and raise_if_not_consented:
+            raise self.not_consented_error(subject_identifier)
+        return consent_obj
+
+    async def aget_consent_for(
+        self,
+        subject_identifier: str = None,
+        site_id: int | None = None,
+        raise_if_not_consented: bool | None = None,
+        using: str | None = None,
+        lightweight: bool | None = None,
+    ) -> ConsentLikeModel | ConsentHandle | None:
+        """Async version of `get_consent_for`."""
+        raise_if_not_consented = (
+            True if raise_if_not_consented is None else raise_if_not_consented
         )
-        if site_id:
-            opts.update(site_id=site_id)
+        qs = self.model_cls.objects.using(using)
+        opts = self.get_consent_for_opts(subject_identifier, site_id)
         try:
-            consent_obj = self.model_cls.objects.get(**opts)
+            if lightweight:
+                consent_obj = ConsentHandle.from_row(
+                    await qs.values_list(*HANDLE_FIELDS).aget(**opts), model=self.model
+                )
+            else:
+                consent_obj = await qs.aget(**opts)
         except ObjectDoesNotExist:
             consent_obj = None
         if not consent_obj and raise_if_not_consented:
-            raise NotConsentedError(
-                f"Consent not found for this version. Has subject '{subject_identifier}' "
-                f"completed a version '{self.version}' consent?"
-            )
+            raise self.not_consented_error(subject_identifier)
         return consent_obj
 
+    def get_consent_for_opts(
+        self, subject_identifier: str, site_id: int | None
+    ) -> dict[str, str | int]:
+        opts: dict[str, str | int] = dict(
+            subject_identifier=subject_identifier, version=self.version
+        )
+        if site_id:
+            opts.update(site_id=site_id)
+        return opts
+
+    def not_consented_error(self, subject_identifier: str) -> NotConsentedError:
+        return NotConsentedError(
+            f"Consent not found for this version. Has subject '{subject_identifier}' "
+            f"completed a version '{self.version}' consent?"
+        )
+
     @property
     def model_cls(self) -> Type[ConsentLikeModel]:
         return django_apps.get_model(self.model)
@@ -213,3 +310,17 @@ class ConsentDefinition:
             return previous_consent.last()
         else:
             raise ObjectDoesNotExist("Previous consent does not exist")
+
+    async def aget_previous_consent(
+        self, subject_identifier: str, exclude_id=None
+    ) -> ConsentLikeModel:
+        """Async version of `get_previous_consent`."""
+        previous_consent = await (
+            self.model_cls.objects.filter(subject_identifier=subject_identifier)
+            .exclude(id=exclude_id)
+            .order_by("consent_datetime")
+            .alast()
+        )
+        if previous_consent is None:
+            raise ObjectDoesNotExist("Previous consent does not exist")
+        return previous_consent
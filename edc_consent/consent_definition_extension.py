@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import KW_ONLY, dataclass, field
 from datetime import datetime
+from functools import total_ordering
 from typing import TYPE_CHECKING, Type
 
 from django.apps import apps as django_apps
@@ -14,6 +15,7 @@ from edc_utils.date import to_local
 from edc_visit_schedule.schedule import VisitCollection
 
 from .exceptions import ConsentDefinitionError
+from .instrumentation import instrumented
 
 if TYPE_CHECKING:
     from edc_identifier.model_mixins import UniqueSubjectIdentifierModelMixin
@@ -32,7 +34,8 @@ if TYPE_CHECKING:
         _meta: ...
 
 
-@dataclass(order=True)
+@total_ordering
+@dataclass(eq=False, frozen=True, slots=True)
 class ConsentDefinitionExtension:
     """A definition to truncate the number of visits/timepoints in a
     visit collection for a consented subject, if necessary.
@@ -54,27 +57,50 @@ class ConsentDefinitionExtension:
     visit collection if necessary.
     """
 
-    model: str = field(compare=False)
+    model: str
     _ = KW_ONLY
-    start: datetime = field(default=ResearchProtocolConfig().study_open_datetime, compare=True)
-    version: str = field(default="1", compare=False)
-    extends: ConsentDefinition = field(default=None, compare=False)
-    timepoints: list[int] | None = field(default_factory=list, compare=False)
-    site_ids: list[int] = field(default_factory=list, compare=False)
-    country: str | None = field(default=None, compare=False)
-
-    name: str = field(init=False, compare=False)
-    sort_index: str = field(init=False)
+    start: datetime = ResearchProtocolConfig().study_open_datetime
+    version: str = "1"
+    extends: ConsentDefinition = None
+    timepoints: frozenset[int] = frozenset()
+    site_ids: tuple[int, ...] = ()
+    country: str | None = None
+
+    name: str = field(init=False)
+    sort_index: str = field(init=False, repr=False)
+    sort_key: tuple[datetime, str] = field(init=False, repr=False)
+    _hash: int = field(init=False, repr=False)
 
     def __post_init__(self):
-        self.name = f"{self.model}-{self.version}"
-        self.sort_index = self.name
+        name = f"{self.model}-{self.version}"
+        for attr, value in [
+            ("name", name),
+            ("sort_index", name),
+            ("sort_key", (self.start, name)),
+            ("_hash", hash((self.start, name))),
+            ("timepoints", frozenset(self.timepoints or ())),
+            ("site_ids", tuple(self.site_ids or ())),
+        ]:
+            object.__setattr__(self, attr, value)
         if not self.start.tzinfo:
             raise ConsentDefinitionError(f"Naive datetime not allowed. Got {self.start}.")
         elif str(self.start.tzinfo) != "UTC":
             raise ConsentDefinitionError(f"Start date must be UTC. Got {self.start}.")
         self.extends.check_date_within_study_period()
 
+    def __eq__(self, other):
+        if not isinstance(other, ConsentDefinitionExtension):
+            return NotImplemented
+        return self.sort_key == other.sort_key
+
+    def __lt__(self, other):
+        if not isinstance(other, ConsentDefinitionExtension):
+            return NotImplemented
+        return self.sort_key < other.sort_key
+
+    def __hash__(self):
+        return self._hash
+
     def update_visit_collection(
         self,
         visits: VisitCollection = None,
@@ -116,16 +142,29 @@ class ConsentDefinitionExtension:
             sites = [s for s in site_sites.all(aslist=True)]
         return sites
 
-    def get_consent_extension_for(self, **kwargs) -> ConsentExtensionLikeModel | None:
+    @instrumented("ConsentDefinitionExtension.get_consent_extension_for")
+    def get_consent_extension_for(
+        self,
+        subject_consent: ConsentLikeModel | None = None,
+        using: str | None = None,
+        **kwargs,
+    ) -> ConsentExtensionLikeModel | None:
         """Returns the consent extension model instance for the
         parent consent definition.
 
         If field `agrees_to_extension` == YES, extension is granted.
+
+        Pass `subject_consent` (a model instance or ConsentHandle),
+        if already fetched, to skip the parent consent lookup.
+        `using` is a database alias, see
+        `ConsentDefinition.get_consent_for`.
         """
-        subject_consent = self.get_consent_for(**kwargs)
+        if subject_consent is None:
+            kwargs.setdefault("lightweight", True)
+            subject_consent = self.get_consent_for(using=using, **kwargs)
         try:
-            consent_extension_obj = self.model_cls.objects.get(
-                subject_consent=subject_consent,
+            consent_extension_obj = self.model_cls.objects.using(using).get(
+                subject_consent_id=getattr(subject_consent, "pk", None),
                 report_datetime__gte=self.start,
                 agrees_to_extension=YES,
             )
@@ -137,6 +176,30 @@ class ConsentDefinitionExtension:
         """Returns the parent consent model instance for the subject."""
         return self.extends.get_consent_for(**kwargs)
 
+    async def aget_consent_extension_for(
+        self,
+        subject_consent: ConsentLikeModel | None = None,
+        using: str | None = None,
+        **kwargs,
+    ) -> ConsentExtensionLikeModel | None:
+        """Async version of `get_consent_extension_for`."""
+        if subject_consent is None:
+            kwargs.setdefault("lightweight", True)
+            subject_consent = await self.aget_consent_for(using=using, **kwargs)
+        try:
+            consent_extension_obj = await self.model_cls.objects.using(using).aget(
+                subject_consent_id=getattr(subject_consent, "pk", None),
+                report_datetime__gte=self.start,
+                agrees_to_extension=YES,
+            )
+        except ObjectDoesNotExist:
+            consent_extension_obj = None
+        return consent_extension_obj
+
+    async def aget_consent_for(self, **kwargs) -> ConsentLikeModel | None:
+        """Async version of `get_consent_for`."""
+        return await self.extends.aget_consent_for(**kwargs)
+
     @property
     def display_name(self) -> str:
         return (
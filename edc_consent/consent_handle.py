@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from django.apps import apps as django_apps
+
+if TYPE_CHECKING:
+    from .stubs import ConsentLikeModel
+
+__all__ = ["HANDLE_FIELDS", "ConsentHandle"]
+
+# non-encrypted columns, in the order of the ConsentHandle fields
+HANDLE_FIELDS = ("id", "subject_identifier", "version", "consent_datetime", "dob", "site_id")
+
+# attributes, other than the model fields, read from the full instance
+INSTANCE_ATTRS = ("_state", "get_absolute_url", "natural_key")
+
+
+@lru_cache
+def get_instance_attrs(model: str) -> frozenset[str]:
+    """Returns the names of the attributes a ConsentHandle reads
+    from the full instance of `model`.
+    """
+    fields = django_apps.get_model(model)._meta.concrete_fields
+    return frozenset(
+        [*INSTANCE_ATTRS, *(f.name for f in fields), *(f.attname for f in fields)]
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class ConsentHandle:
+    """A read-only stand-in for a consent model instance built from
+    the non-encrypted columns only.
+
+    Returned by `get_consent_for` and `get_consent_or_raise` if
+    `lightweight=True`, for internal callers that need only these
+    fields. Other model fields, and the attributes in
+    INSTANCE_ATTRS, are read from the full model instance, fetched (and
+    decrypted) once on first access, see `get_instance`. Any other
+    attribute raises AttributeError. A handle is not a model instance;
+    use `get_instance` where one is expected, for example to assign a
+    foreign key.
+    """
+
+    id: UUID
+    subject_identifier: str
+    version: str
+    consent_datetime: datetime
+    dob: date | None
+    site_id: int
+    model: str
+    _instance: Any = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_row(cls, row: tuple, model: str) -> ConsentHandle:
+        return cls(*row, model=model)
+
+    @property
+    def pk(self) -> UUID:
+        return self.id
+
+    def get_instance(self) -> ConsentLikeModel:
+        """Returns the full model instance."""
+        if self._instance is None:
+            model_cls = django_apps.get_model(self.model)
+            object.__setattr__(self, "_instance", model_cls._base_manager.get(id=self.id))
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        # not dunder lookups, e.g. by copy or pickle, or the slots
+        # before they are set
+        if name.startswith("__") or name in ("model", "_instance"):
+            raise AttributeError(name)
+        if name == "_meta":
+            return django_apps.get_model(self.model)._meta
+        if name not in get_instance_attrs(self.model):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'. "
+                "Use `get_instance` for the full model instance."
+            )
+        return getattr(self.get_instance(), name)
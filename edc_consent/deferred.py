@@ -0,0 +1,271 @@
+"""Defer the consent checks of the requires consent pre_save signal.
+
+By default, `requires_consent_on_pre_save` resolves the consent
+definition and the subject's consent for each model instance as it is
+saved. When saving many instances in one transaction, for example in
+an offline sync import, defer the checks:
+
+    with deferred_consent_checks():
+        for obj in objs:
+            obj.save()
+
+While the block is active, the signal only records each instance.
+When the block exits, the consents for all recorded instances are
+fetched in bulk, checked and `consent_version` and `consent_model`
+are stamped with one `bulk_update` per model, and on the historical
+rows written in the block. The block runs in
+`transaction.atomic`, so a `NotConsentedError` raised on exit rolls
+back everything saved in the block.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from django.db import transaction
+from edc_constants.constants import YES
+from edc_sites import site_sites
+from simple_history.exceptions import NotHistoricalModelError
+from simple_history.utils import get_history_manager_for_model
+
+from .consent_handle import HANDLE_FIELDS, ConsentHandle
+from .site_consents import site_consents
+
+if TYPE_CHECKING:
+    from .consent_definition import ConsentDefinition
+    from .consent_definition_extension import ConsentDefinitionExtension
+    from .model_mixins import RequiresConsentFieldsModelMixin
+
+__all__ = [
+    "consent_checks_deferred",
+    "defer_consent_check",
+    "deferred_consent_checks",
+    "get_requires_consent_cdef",
+    "update_consent_fields_in_bulk",
+    "update_historical_consent_fields",
+]
+
+CHUNK_SIZE = 500
+
+_deferred: ContextVar[dict | None] = ContextVar("edc_consent_deferred", default=None)
+
+
+def consent_checks_deferred() -> bool:
+    return _deferred.get() is not None
+
+
+def defer_consent_check(instance: RequiresConsentFieldsModelMixin) -> bool:
+    """Records the instance and returns True if consent checks are
+    deferred, otherwise returns False.
+    """
+    instances = _deferred.get()
+    if instances is None:
+        return False
+    # an instance saved more than once is checked once
+    instances[id(instance)] = instance
+    return True
+
+
+@contextmanager
+def deferred_consent_checks(using: str | None = None) -> Iterator[None]:
+    """Defers consent checks for instances saved in the block to the
+    end of the block, see module docstring.
+    """
+    instances: dict = {}
+    with transaction.atomic(using=using):
+        token = _deferred.set(instances)
+        try:
+            yield
+        finally:
+            _deferred.reset(token)
+        update_consent_fields_in_bulk(instances.values(), using=using)
+
+
+def get_requires_consent_cdef(instance: RequiresConsentFieldsModelMixin) -> ConsentDefinition:
+    """Returns the consent definition used to stamp `consent_version`
+    and `consent_model` on the instance.
+
+    Uses the visit schedule's consent definitions if the instance
+    has a schedule, otherwise the registry.
+    """
+    site = getattr(instance, "related_visit", instance).site
+    try:
+        schedule = getattr(instance, "related_visit", instance).schedule
+    except AttributeError:
+        schedule = None
+    if schedule:
+        return schedule.get_consent_definition(
+            site=site_sites.get(site.id), report_datetime=instance.report_datetime
+        )
+    # this is a PRN model, like SubjectLocator, with no visit_schedule
+    return site_consents.get_consent_definition(
+        site=site_sites.get(site.id), report_datetime=instance.report_datetime
+    )
+
+
+def update_consent_fields_in_bulk(
+    instances: Iterable[RequiresConsentFieldsModelMixin], using: str | None = None
+) -> None:
+    """Checks the subject is consented and sets `consent_version`
+    and `consent_model` for saved instances, raising on the first
+    instance not consented.
+
+    Same as `update_consent_fields_or_raise` for each instance, but
+    with one query per consent definition (and consent extension)
+    for all instances.
+    """
+    rows = []
+    cdefs: dict[tuple[int, datetime], ConsentDefinition] = {}
+    for instance in instances:
+        related = getattr(instance, "related_visit", instance)
+        site_id = related.site.id
+        key = (site_id, instance.report_datetime)
+        if key not in cdefs:
+            cdefs[key] = site_consents.get_consent_definition(
+                site=site_sites.get(site_id), report_datetime=instance.report_datetime
+            )
+        rows.append(
+            (
+                instance,
+                related.subject_identifier,
+                cdefs[key],
+                get_requires_consent_cdef(instance),
+            )
+        )
+    if not rows:
+        return
+    lookup_cdefs = set()
+    for *_, check_cdef, cdef in rows:
+        lookup_cdefs.update(c for c in [check_cdef, check_cdef.updates, cdef] if c)
+    consents = get_consents(lookup_cdefs, sorted({row[1] for row in rows}), using=using)
+    extended = get_extended_consent_ids(
+        {cdef.extended_by for *_, cdef in rows if cdef.extended_by},
+        [consent_obj.id for consent_obj in consents.values()],
+        using=using,
+    )
+    updated: dict[type, list] = {}
+    for instance, subject_identifier, check_cdef, cdef in rows:
+        instance.consent_version = get_consent_version_or_raise(
+            instance, subject_identifier, check_cdef, cdef, consents, extended
+        )
+        instance.consent_model = cdef.model
+        updated.setdefault(type(instance), []).append(instance)
+    for model_cls, objs in updated.items():
+        model_cls._base_manager.using(using).bulk_update(
+            objs, ["consent_version", "consent_model"], batch_size=CHUNK_SIZE
+        )
+        update_historical_consent_fields(model_cls, objs, using=using)
+
+
+def update_historical_consent_fields(
+    model_cls: type[RequiresConsentFieldsModelMixin],
+    objs: list[RequiresConsentFieldsModelMixin],
+    using: str | None = None,
+) -> None:
+    """Sets `consent_version` and `consent_model` on the historical
+    rows written for the instances while the checks were deferred.
+
+    `bulk_update` bypasses simple_history. Only historical rows where
+    `consent_version` is null are updated, i.e. those saved without
+    the consent check.
+    """
+    try:
+        history_manager = get_history_manager_for_model(model_cls._meta.concrete_model)
+    except NotHistoricalModelError:
+        return
+    ids_by_values: dict[tuple[str, str], list] = {}
+    for obj in objs:
+        ids_by_values.setdefault((obj.consent_version, obj.consent_model), []).append(obj.id)
+    for (consent_version, consent_model), ids in ids_by_values.items():
+        for index in range(0, len(ids), CHUNK_SIZE):
+            history_manager.model._base_manager.using(using).filter(
+                id__in=ids[index : index + CHUNK_SIZE], consent_version__isnull=True
+            ).update(consent_version=consent_version, consent_model=consent_model)
+
+
+def get_consent_version_or_raise(
+    instance: RequiresConsentFieldsModelMixin,
+    subject_identifier: str,
+    check_cdef: ConsentDefinition,
+    cdef: ConsentDefinition,
+    consents: dict[tuple[str, str], ConsentHandle],
+    extended: dict[ConsentDefinitionExtension, set],
+) -> str:
+    """Raises if not consented, as `site_consents.get_consent_or_raise`,
+    otherwise returns the consent version to stamp on the instance.
+    """
+    consent_obj = consents.get((check_cdef.name, subject_identifier))
+    if not consent_obj:
+        raise check_cdef.not_consented_error(subject_identifier)
+    if previous_cdef := site_consents.get_previous_cdef_or_raise(
+        check_cdef, consent_obj, subject_identifier, instance.report_datetime
+    ):
+        if not consents.get((previous_cdef.name, subject_identifier)):
+            raise previous_cdef.not_consented_error(subject_identifier)
+    if cdef.extended_by and cdef.extended_by.start <= instance.report_datetime:
+        consent_obj = consents.get((cdef.name, subject_identifier))
+        if (
+            consent_obj
+            and consent_obj.site_id == instance.site_id
+            and consent_obj.id in extended[cdef.extended_by]
+        ):
+            return cdef.extended_by.version
+    return cdef.version
+
+
+def get_consents(
+    cdefs: Iterable[ConsentDefinition],
+    subject_identifiers: list[str],
+    site_id: int | None = None,
+    using: str | None = None,
+) -> dict[tuple[str, str], ConsentHandle]:
+    """Returns a dict of ConsentHandles by (cdef name,
+    subject_identifier).
+
+    Filters as `ConsentDefinition.get_consent_for` does, by version
+    and, if `site_id`, by site, so that each key resolves to the same
+    consent as the non-deferred check.
+    """
+    consents = {}
+    for cdef in cdefs:
+        opts = cdef.get_consent_for_opts(subject_identifier=None, site_id=site_id)
+        opts.pop("subject_identifier")
+        for index in range(0, len(subject_identifiers), CHUNK_SIZE):
+            for row in (
+                cdef.model_cls.objects.using(using)
+                .filter(
+                    subject_identifier__in=subject_identifiers[index : index + CHUNK_SIZE],
+                    **opts,
+                )
+                .values_list(*HANDLE_FIELDS)
+            ):
+                consent_obj = ConsentHandle.from_row(row, model=cdef.model)
+                consents[(cdef.name, consent_obj.subject_identifier)] = consent_obj
+    return consents
+
+
+def get_extended_consent_ids(
+    extensions: Iterable[ConsentDefinitionExtension],
+    consent_ids: list,
+    using: str | None = None,
+) -> dict[ConsentDefinitionExtension, set]:
+    """Returns a dict of the ids of consents with an agreed consent
+    extension by consent extension definition.
+    """
+    extended = {}
+    for extension in extensions:
+        extended[extension] = set()
+        for index in range(0, len(consent_ids), CHUNK_SIZE):
+            extended[extension].update(
+                extension.model_cls.objects.using(using)
+                .filter(
+                    subject_consent_id__in=consent_ids[index : index + CHUNK_SIZE],
+                    report_datetime__gte=extension.start,
+                    agrees_to_extension=YES,
+                )
+                .values_list("subject_consent_id", flat=True)
+            )
+    return extended
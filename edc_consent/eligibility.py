@@ -0,0 +1,168 @@
+"""Check screened subjects in bulk against the age and gender rules
+of a consent definition.
+
+The consent form validates one subject at a time, see
+`ConsentModelFormValidationMixin.validate_min_age`,
+`validate_max_age`, `validate_gender_of_consent` and
+`validate_guardian_and_dob`. For screening reports, flag all subjects
+that would fail with one call:
+
+    codes = ConsentEligibility(cdef).evaluate(dobs, genders, report_datetimes)
+    # [(), (MIN_AGE,), (GENDER, MINOR), ...]
+
+Ages are computed as integer date arithmetic (yyyymmdd) over arrays,
+using NumPy if installed. `get_message` returns the text the consent
+form would show for a failure code.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+from edc_utils import formatted_age
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from .consent_definition import ConsentDefinition
+
+__all__ = [
+    "GENDER",
+    "INVALID_DOB",
+    "MAX_AGE",
+    "MIN_AGE",
+    "MINOR",
+    "ConsentEligibility",
+    "get_ages",
+]
+
+MIN_AGE = "min_age"
+MAX_AGE = "max_age"
+GENDER = "gender"
+# below age_is_adult, a guardian is required
+MINOR = "minor"
+# dob is missing or after the report date
+INVALID_DOB = "invalid_dob"
+
+
+def as_yyyymmdd(value: date | datetime) -> int:
+    """Returns the date, or the UTC date of a datetime, as an int,
+    for example 20240131.
+    """
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc).date()
+    return value.year * 10000 + value.month * 100 + value.day
+
+
+def get_ages(
+    dobs: Sequence[date | None], report_datetimes: Sequence[date | datetime]
+) -> list[int | None]:
+    """Returns the age in years of each dob on the report date, as
+    `edc_utils.age(dob, report_datetime).years`, or None if the dob
+    is missing or after the report date.
+
+    A dob on 29 February has its birthday on 28 February in years
+    that are not leap years, as with `relativedelta`.
+    """
+    dob_values = [as_yyyymmdd(dob) if dob else 0 for dob in dobs]
+    ref_values = [as_yyyymmdd(dt) for dt in report_datetimes]
+    if np is not None:
+        dob_array = np.array(dob_values, dtype=np.int64)
+        ref_array = np.array(ref_values, dtype=np.int64)
+        year = ref_array // 10000
+        is_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+        dob_array = np.where((dob_array % 10000 == 229) & ~is_leap, dob_array - 1, dob_array)
+        ages = (ref_array - dob_array) // 10000
+        valid = (dob_array > 0) & (dob_array <= ref_array)
+        return [int(a) if v else None for a, v in zip(ages.tolist(), valid.tolist())]
+    ages = []
+    for dob_value, ref_value in zip(dob_values, ref_values):
+        year = ref_value // 10000
+        is_leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        if dob_value % 10000 == 229 and not is_leap:
+            dob_value -= 1
+        ages.append((ref_value - dob_value) // 10000 if 0 < dob_value <= ref_value else None)
+    return ages
+
+
+class ConsentEligibility:
+    """Returns the failure codes of the consent definition's age and
+    gender rules for many subjects.
+    """
+
+    def __init__(self, cdef: ConsentDefinition):
+        self.cdef = cdef
+
+    def evaluate(
+        self,
+        dobs: Sequence[date | None],
+        genders: Sequence[str],
+        report_datetimes: Sequence[date | datetime],
+    ) -> list[tuple[str, ...]]:
+        """Returns a tuple of failure codes per subject, empty if
+        the subject passes.
+        """
+        codes = []
+        for age_in_years, gender in zip(get_ages(dobs, report_datetimes), genders):
+            subject_codes = []
+            if age_in_years is None:
+                subject_codes.append(INVALID_DOB)
+            else:
+                if age_in_years < self.cdef.age_min:
+                    subject_codes.append(MIN_AGE)
+                if age_in_years > self.cdef.age_max:
+                    subject_codes.append(MAX_AGE)
+                if age_in_years < self.cdef.age_is_adult:
+                    subject_codes.append(MINOR)
+            if gender not in self.cdef.gender:
+                subject_codes.append(GENDER)
+            codes.append(tuple(subject_codes))
+        return codes
+
+    def evaluate_rows(
+        self, rows: Iterable[tuple[date | None, str, date | datetime]]
+    ) -> list[tuple[str, ...]]:
+        """Same as `evaluate` for rows of (dob, gender,
+        report_datetime), for example from `values_list`.
+        """
+        rows = list(rows)
+        return self.evaluate(
+            [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
+        )
+
+    def get_message(
+        self, code: str, dob: date | None, gender: str, report_datetime: date | datetime
+    ) -> str:
+        """Returns the message the consent form shows for the failure
+        code.
+        """
+        age_in_years = get_ages([dob], [report_datetime])[0]
+        if code == MIN_AGE:
+            return (
+                f"Subject's age is {age_in_years}. "
+                "Subject is not eligible for consent. Minimum age of consent is "
+                f"{self.cdef.age_min}."
+            )
+        elif code == MAX_AGE:
+            return (
+                f"Subject's age is {age_in_years}. "
+                "Subject is not eligible for consent. Maximum age of consent is "
+                f"{self.cdef.age_max}."
+            )
+        elif code == MINOR:
+            return (
+                f"Subject's age is {formatted_age(dob, report_datetime)}. "
+                "Subject is a minor. Guardian's "
+                "name is required with signature on the paper "
+                "document."
+            )
+        elif code == GENDER:
+            gender_of_consent = "' or '".join(self.cdef.gender)
+            return f"Gender of consent can only be '{gender_of_consent}'. Got '{gender}'."
+        elif code == INVALID_DOB:
+            return f"Invalid date of birth. Got {dob} on {report_datetime}."
+        raise ValueError(f"Unknown eligibility failure code. Got {code}.")
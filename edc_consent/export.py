@@ -0,0 +1,191 @@
+"""Stream a consent listing by site and version as CSV or JSONL.
+
+Rows are read with `values(...).iterator(chunk_size=...)`, so memory
+use does not grow with the number of consents. For each chunk, the
+consent extension status is fetched with one query per consent
+extension definition and the age at consent is computed in bulk, see
+`edc_consent.eligibility.get_ages`.
+
+Encrypted (PII) fields are not exported unless requested with
+`fields`, and then only those fields are decrypted:
+
+    export = ConsentExport(fields=["first_name"], site_id=10)
+    for line in export.as_csv():
+        f.write(line)
+
+See the `export_consents` management command and the
+`export_consents_as_csv` admin action.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from datetime import date, datetime
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Iterator
+from uuid import UUID
+
+from edc_constants.constants import YES
+
+from .eligibility import get_ages
+from .site_consents import site_consents
+from .utils import get_consent_models
+
+if TYPE_CHECKING:
+    from django.db.models import QuerySet
+
+__all__ = ["ConsentExport"]
+
+CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = [
+    "id",
+    "subject_identifier",
+    "site_id",
+    "version",
+    "consent_datetime",
+    "dob",
+    "is_verified",
+    "is_verified_datetime",
+]
+
+COLUMNS = [
+    "subject_identifier",
+    "site_id",
+    "version",
+    "consent_datetime",
+    "age_at_consent",
+    "is_verified",
+    "is_verified_datetime",
+    "agrees_to_extension",
+    "extension_version",
+]
+
+
+class Echo:
+    """A file-like object for `csv.writer` that returns the line
+    instead of writing it.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class ConsentExport:
+    """Streams consents ordered by site, version and subject.
+
+    If `queryset` is None, exports the consents of all registered
+    consent definitions.
+    """
+
+    def __init__(
+        self,
+        queryset: QuerySet | None = None,
+        fields: list[str] | None = None,
+        site_id: int | None = None,
+        version: str | None = None,
+        chunk_size: int | None = None,
+        using: str | None = None,
+    ):
+        self.queryset = queryset
+        self.fields = list(fields or [])
+        self.site_id = site_id
+        self.version = version
+        self.chunk_size = chunk_size or CHUNK_SIZE
+        self.using = using
+        for qs in self.querysets:
+            field_names = [f.name for f in qs.model._meta.concrete_fields]
+            if unknown := [name for name in self.fields if name not in field_names]:
+                raise ValueError(
+                    f"Unknown consent field. Got {', '.join(unknown)}. "
+                    f"See {qs.model._meta.label_lower}."
+                )
+
+    @property
+    def columns(self) -> list[str]:
+        return COLUMNS + [name for name in self.fields if name not in COLUMNS]
+
+    @property
+    def querysets(self) -> list[QuerySet]:
+        if self.queryset is not None:
+            querysets = [self.queryset]
+        else:
+            querysets = [
+                model_cls._base_manager.using(self.using).all()
+                for model_cls in get_consent_models()
+            ]
+        opts = {}
+        if self.site_id:
+            opts.update(site_id=self.site_id)
+        if self.version:
+            opts.update(version=self.version)
+        return [qs.filter(**opts) for qs in querysets]
+
+    def rows(self) -> Iterator[dict[str, Any]]:
+        fields = EXPORT_FIELDS + [name for name in self.fields if name not in EXPORT_FIELDS]
+        for qs in self.querysets:
+            values = (
+                qs.order_by("site_id", "version", "subject_identifier", "id")
+                .values(*fields)
+                .iterator(chunk_size=self.chunk_size)
+            )
+            while chunk := list(islice(values, self.chunk_size)):
+                yield from self.get_chunk_rows(chunk)
+
+    def get_chunk_rows(self, chunk: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        extensions = self.get_extensions([row["id"] for row in chunk])
+        ages = get_ages(
+            [row["dob"] for row in chunk], [row["consent_datetime"] for row in chunk]
+        )
+        for row, age_at_consent in zip(chunk, ages):
+            agrees_to_extension, extension_version = extensions.get(row["id"], (None, None))
+            row.update(
+                age_at_consent=age_at_consent,
+                agrees_to_extension=agrees_to_extension,
+                extension_version=extension_version,
+            )
+            yield {column: row[column] for column in self.columns}
+
+    def get_extensions(self, consent_ids: list[UUID]) -> dict[UUID, tuple[str, str | None]]:
+        """Returns a dict of (agrees_to_extension, extension version)
+        by consent id.
+
+        The version is None unless the subject agreed to the extension.
+        """
+        extensions = {}
+        for extension in {
+            cdef.extended_by for cdef in site_consents.registry.values() if cdef.extended_by
+        }:
+            for subject_consent_id, agrees_to_extension, report_datetime in (
+                extension.model_cls._base_manager.using(self.using)
+                .filter(subject_consent_id__in=consent_ids)
+                .values_list("subject_consent_id", "agrees_to_extension", "report_datetime")
+            ):
+                extension_version = (
+                    extension.version
+                    if agrees_to_extension == YES and report_datetime >= extension.start
+                    else None
+                )
+                extensions[subject_consent_id] = (agrees_to_extension, extension_version)
+        return extensions
+
+    def as_csv(self) -> Iterator[str]:
+        """Yields the header and rows as CSV lines."""
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.columns)
+        for row in self.rows():
+            yield writer.writerow([self.format_value(row[column]) for column in self.columns])
+
+    def as_jsonl(self) -> Iterator[str]:
+        """Yields one JSON object per line."""
+        for row in self.rows():
+            yield json.dumps({k: self.format_value(v) for k, v in row.items()}) + "\n"
+
+    @staticmethod
+    def format_value(value: Any) -> Any:
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        elif isinstance(value, UUID):
+            return str(value)
+        return value
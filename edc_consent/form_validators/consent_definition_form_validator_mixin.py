@@ -19,6 +19,9 @@ from edc_consent.site_consents import site_consents
 if TYPE_CHECKING:
     from django.contrib.sites.models import Site
 
+    from edc_consent.consent_handle import ConsentHandle
+    from edc_consent.stubs import ConsentLikeModel
+
 
 class ConsentDefinitionFormValidatorMixin:
 
@@ -36,7 +39,11 @@ class ConsentDefinitionFormValidatorMixin:
     ) -> datetime:
         """Returns the consent_datetime of this subject"""
         consent_obj = self.get_consent_or_raise(
-            report_datetime=report_datetime, site=site, fldname=fldname, error_code=error_code
+            report_datetime=report_datetime,
+            site=site,
+            fldname=fldname,
+            error_code=error_code,
+            lightweight=True,
         )
         return consent_obj.consent_datetime
 
@@ -46,11 +53,13 @@ class ConsentDefinitionFormValidatorMixin:
         site: Site = None,
         fldname: str | None = None,
         error_code: str | None = None,
-    ) -> datetime:
-        """Returns the consent_datetime of this subject.
+        lightweight: bool | None = None,
+    ) -> ConsentLikeModel | ConsentHandle:
+        """Returns the consent model instance of this subject.
 
-        Wraps func `consent_datetime_or_raise` to re-raise exceptions
-        as ValidationError.
+        Wraps func `site_consents.get_consent_or_raise` to re-raise
+        exceptions as ValidationError. If `lightweight`, returns a
+        ConsentHandle instead of the model instance.
         """
 
         fldname = fldname or "report_datetime"
@@ -60,6 +69,7 @@ class ConsentDefinitionFormValidatorMixin:
                 subject_identifier=self.subject_identifier,
                 report_datetime=report_datetime,
                 site_id=getattr(site, "id", None),
+                lightweight=lightweight,
             )
         except (NotConsentedError, ConsentDefinitionNotConfiguredForUpdate) as e:
             self.raise_validation_error({fldname: str(e)}, error_code)
@@ -0,0 +1,214 @@
+"""What-if impact analysis for proposed consent definitions.
+
+Before registering an amendment (a new version, a new validity window,
+`updates=`), count the consents and CRFs that would resolve to a
+different consent version or model, per site:
+
+    analysis = ConsentImpactAnalysis([cdef_v1_amended, cdef_v2])
+    for impact in analysis.run():
+        impact.model, impact.changed, impact.total, impact.sites
+
+The live registry is not changed. The current and the proposed
+registries are each read into a `ConsentSnapshot` and rows are
+streamed with `values_list(...).iterator()` and assigned to a
+consent definition by site and datetime interval, see
+`ConsentSnapshot.resolve_many`.
+
+Resolution is by registry only, as `site_consents.get_consent_definition`,
+not by visit schedule, and ignores consent extensions.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Type
+
+from django.apps import apps as django_apps
+
+from .consent_definition import ConsentDefinition
+from .exceptions import ConsentDefinitionError
+from .model_mixins import RequiresConsentFieldsModelMixin
+from .site_consents import site_consents
+from .snapshot import ConsentSnapshot, SnapshotEntry
+from .utils import get_consent_models
+
+if TYPE_CHECKING:
+    from django.db import models
+
+__all__ = ["ConsentImpactAnalysis", "ModelImpact", "get_proposed_snapshot_data"]
+
+CHUNK_SIZE = 2000
+SAMPLE_SIZE = 20
+
+
+def get_proposed_snapshot_data(proposed: Iterable[ConsentDefinition]) -> dict[str, Any]:
+    """Returns snapshot data of the live registry with the proposed
+    consent definitions added.
+
+    A proposed consent definition with the name of a registered one
+    replaces it. The registry is not changed.
+    """
+    data = site_consents.export_snapshot()
+    items = {item["name"]: item for item in data["cdefs"]}
+    for cdef in proposed:
+        item = site_consents.get_snapshot_item(cdef)
+        if existing := items.get(cdef.name):
+            item["updated_by"] = item["updated_by"] or existing["updated_by"]
+            item["extended_by"] = item["extended_by"] or existing["extended_by"]
+        if cdef.updates:
+            if cdef.updates.name not in items:
+                raise ConsentDefinitionError(
+                    f"Updates unregistered consent definition. See {cdef.name}. "
+                    f"Got {cdef.updates.name}"
+                )
+            items[cdef.updates.name]["updated_by"] = cdef.name
+        items[cdef.name] = item
+    data.update(cdefs=list(items.values()))
+    return data
+
+
+def get_crf_models() -> list[Type[models.Model]]:
+    """Returns the concrete models that require consent and have
+    a `report_datetime` and `site`.
+    """
+    crf_models = []
+    for model_cls in django_apps.get_models():
+        if (
+            issubclass(model_cls, RequiresConsentFieldsModelMixin)
+            and not model_cls._meta.proxy
+            and {"report_datetime", "site"}.issubset(
+                f.name for f in model_cls._meta.concrete_fields
+            )
+        ):
+            crf_models.append(model_cls)
+    return crf_models
+
+
+@dataclass
+class ModelImpact:
+    """Counts and sample rows for one model.
+
+    `sites` counts changed rows by site_id. `transitions` counts
+    changed rows by (site_id, current version, proposed version).
+    """
+
+    model: str
+    total: int = 0
+    changed: int = 0
+    sites: Counter = field(default_factory=Counter)
+    transitions: Counter = field(default_factory=Counter)
+    samples: list[dict[str, Any]] = field(default_factory=list)
+
+
+class ConsentImpactAnalysis:
+    """Compares the consent definitions resolved for consents and
+    CRFs by the live registry and by the registry with the
+    `proposed` consent definition(s) added.
+    """
+
+    def __init__(
+        self,
+        proposed: ConsentDefinition | Iterable[ConsentDefinition],
+        sample_size: int | None = None,
+        chunk_size: int | None = None,
+        using: str | None = None,
+    ):
+        if isinstance(proposed, ConsentDefinition):
+            proposed = [proposed]
+        self.proposed = list(proposed)
+        self.sample_size = SAMPLE_SIZE if sample_size is None else sample_size
+        self.chunk_size = chunk_size or CHUNK_SIZE
+        self.using = using
+        self.current = ConsentSnapshot(site_consents.export_snapshot())
+        self.snapshot = ConsentSnapshot(get_proposed_snapshot_data(self.proposed))
+
+    def run(self) -> list[ModelImpact]:
+        impacts = []
+        for model_cls in get_consent_models():
+            impacts.append(
+                self.analyze(
+                    model_cls,
+                    datetime_field="consent_datetime",
+                    version_field="version",
+                    model_field="model_name",
+                )
+            )
+        for model_cls in get_crf_models():
+            impacts.append(
+                self.analyze(
+                    model_cls,
+                    datetime_field="report_datetime",
+                    version_field="consent_version",
+                    model_field="consent_model",
+                )
+            )
+        return impacts
+
+    def analyze(
+        self,
+        model_cls: Type[models.Model],
+        datetime_field: str,
+        version_field: str,
+        model_field: str,
+    ) -> ModelImpact:
+        impact = ModelImpact(model=model_cls._meta.label_lower)
+        fields = ["id", "site_id", datetime_field, version_field, model_field]
+        if "subject_identifier" in [f.name for f in model_cls._meta.concrete_fields]:
+            fields.append("subject_identifier")
+        rows = (
+            model_cls._base_manager.using(self.using)
+            .values_list(*fields)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        for chunk in self.chunks(rows):
+            by_site: dict[int, list[tuple]] = {}
+            for row in chunk:
+                by_site.setdefault(row[1], []).append(row)
+            for site_id, site_rows in by_site.items():
+                report_datetimes = [row[2] for row in site_rows]
+                current = self.current.resolve_many(site_id, report_datetimes)
+                proposed = self.snapshot.resolve_many(site_id, report_datetimes)
+                for row, entry, proposed_entry in zip(site_rows, current, proposed):
+                    impact.total += 1
+                    if self.key(entry) != self.key(proposed_entry):
+                        self.add_change(impact, row, entry, proposed_entry)
+        return impact
+
+    def chunks(self, rows: Iterator[tuple]) -> Iterator[list[tuple]]:
+        while chunk := list(islice(rows, self.chunk_size)):
+            yield chunk
+
+    @staticmethod
+    def key(entry: SnapshotEntry | None) -> tuple[str, str] | None:
+        return (entry.version, entry.model) if entry else None
+
+    def add_change(
+        self,
+        impact: ModelImpact,
+        row: tuple,
+        entry: SnapshotEntry | None,
+        proposed_entry: SnapshotEntry | None,
+    ) -> None:
+        pk, site_id, report_datetime, version, model = row[:5]
+        current_version = getattr(entry, "version", None)
+        proposed_version = getattr(proposed_entry, "version", None)
+        impact.changed += 1
+        impact.sites[site_id] += 1
+        impact.transitions[(site_id, current_version, proposed_version)] += 1
+        if len(impact.samples) < self.sample_size:
+            impact.samples.append(
+                dict(
+                    id=pk,
+                    subject_identifier=row[5] if len(row) > 5 else None,
+                    site_id=site_id,
+                    report_datetime=report_datetime,
+                    stored_version=version,
+                    stored_model=model,
+                    current_version=current_version,
+                    current_model=getattr(entry, "model", None),
+                    proposed_version=proposed_version,
+                    proposed_model=getattr(proposed_entry, "model", None),
+                )
+            )
@@ -0,0 +1,214 @@
+"""Call counts, wall time, DB queries and cache hits for the consent
+lookup APIs.
+
+Disabled by default. Enable with settings.EDC_CONSENT_INSTRUMENTATION=True
+or `consent_metrics.enable()`. When disabled, an instrumented call costs
+one attribute lookup.
+
+Signals `consent_lookup_started` and `consent_lookup_finished` are sent
+around each instrumented call if enabled and if there are receivers.
+
+Each process publishes its stats to the cache at most once every
+settings.EDC_CONSENT_INSTRUMENTATION_PUBLISH_INTERVAL seconds (default
+60), at the end of a request. Counters are incremented in the cache,
+one key per name and field.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import ExitStack
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.dispatch import Signal
+
+__all__ = [
+    "consent_lookup_finished",
+    "consent_lookup_started",
+    "consent_metrics",
+    "instrumented",
+    "publish_consent_metrics",
+    "record_cache_hit",
+]
+
+# sender is the name of the instrumented call
+consent_lookup_started = Signal()
+# sender is the name of the instrumented call. Also sends
+# `wall_time` and `queries`
+consent_lookup_finished = Signal()
+
+CACHE_KEY = "edc_consent_metrics"
+# names published, see `ConsentMetrics.publish`
+NAMES_CACHE_KEY = f"{CACHE_KEY}:names"
+PUBLISH_INTERVAL = 60
+# wall time is published as integer microseconds
+WALL_TIME_SCALE = 1_000_000
+
+
+def get_metrics_cache():
+    return caches[getattr(settings, "EDC_CONSENT_INSTRUMENTATION_CACHE", "default")]
+
+
+def get_cache_key(name: str, field: str) -> str:
+    return f"{CACHE_KEY}:{name}:{field}"
+
+
+def incr(cache, key: str, delta: int) -> None:
+    """Atomically increments a counter in the cache, adding it if
+    it does not exist.
+    """
+    if delta and not cache.add(key, delta, timeout=None):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # deleted since `add`, e.g. by `reset_published`
+            cache.add(key, delta, timeout=None)
+
+
+class ConsentMetrics:
+    """A registry of counters and timers by name."""
+
+    fields = ("calls", "wall_time", "queries", "cache_hits")
+
+    def __init__(self):
+        self.enabled: bool = False
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, int | float]] = {}
+        self._published_at: float = perf_counter()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+    def record(self, name: str, **values: int | float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, {f: 0 for f in self.fields})
+            for k, v in values.items():
+                stats[k] += v
+
+    def snapshot(self) -> dict[str, dict[str, int | float]]:
+        """Returns a copy of the stats for this process."""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def publish(self, force: bool | None = None) -> None:
+        """Adds the stats for this process to the cache and resets.
+
+        Unless `force`, does nothing if published less than the
+        publish interval ago, see module docstring.
+
+        The cache is shared by processes if the cache backend is.
+        Counters are added with `cache.incr`, so concurrent publishes
+        do not lose counts. The list of names is not updated
+        atomically; a name lost to a concurrent publish is added
+        again on the next.
+        """
+        interval = getattr(
+            settings, "EDC_CONSENT_INSTRUMENTATION_PUBLISH_INTERVAL", PUBLISH_INTERVAL
+        )
+        if not force and perf_counter() - self._published_at < interval:
+            return
+        self._published_at = perf_counter()
+        snapshot = self.snapshot()
+        if snapshot:
+            self.reset()
+            cache = get_metrics_cache()
+            for name, stats in snapshot.items():
+                for k, v in stats.items():
+                    incr(
+                        cache,
+                        get_cache_key(name, k),
+                        round(v * WALL_TIME_SCALE) if k == "wall_time" else v,
+                    )
+            names = cache.get(NAMES_CACHE_KEY) or []
+            if not set(snapshot).issubset(names):
+                cache.set(NAMES_CACHE_KEY, sorted(set(names) | set(snapshot)), timeout=None)
+
+    def published_snapshot(self) -> dict[str, dict[str, int | float]]:
+        cache = get_metrics_cache()
+        names = cache.get(NAMES_CACHE_KEY) or []
+        values = cache.get_many(
+            [get_cache_key(name, k) for name in names for k in self.fields]
+        )
+        published = {}
+        for name in names:
+            stats = {k: values.get(get_cache_key(name, k), 0) for k in self.fields}
+            stats["wall_time"] = stats["wall_time"] / WALL_TIME_SCALE
+            published[name] = stats
+        return published
+
+    def reset_published(self) -> None:
+        cache = get_metrics_cache()
+        names = cache.get(NAMES_CACHE_KEY) or []
+        cache.delete_many(
+            [NAMES_CACHE_KEY, *(get_cache_key(name, k) for name in names for k in self.fields)]
+        )
+
+    def measure(self, name: str, func: Callable, *args, **kwargs) -> Any:
+        """Calls func and records the call.
+
+        Queries are counted on all connections, e.g. reads routed to
+        a replica, and, like wall time, include those of nested
+        instrumented calls.
+        """
+        queries = [0]
+
+        def count_queries(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        if consent_lookup_started.has_listeners(sender=name):
+            consent_lookup_started.send(sender=name)
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(count_queries))
+                return func(*args, **kwargs)
+        finally:
+            wall_time = perf_counter() - start
+            self.record(name, calls=1, wall_time=wall_time, queries=queries[0])
+            if consent_lookup_finished.has_listeners(sender=name):
+                consent_lookup_finished.send(
+                    sender=name, wall_time=wall_time, queries=queries[0]
+                )
+
+
+consent_metrics = ConsentMetrics()
+
+
+def instrumented(name: str) -> Callable:
+    """Decorator to record calls to `func` as `name`."""
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def inner(*args, **kwargs):
+            if not consent_metrics.enabled:
+                return func(*args, **kwargs)
+            return consent_metrics.measure(name, func, *args, **kwargs)
+
+        return inner
+
+    return decorator
+
+
+def record_cache_hit(name: str) -> None:
+    if consent_metrics.enabled:
+        consent_metrics.record(name, cache_hits=1)
+
+
+def publish_consent_metrics(sender=None, **kwargs) -> None:
+    """`request_finished` receiver, see AppConfig.ready."""
+    if consent_metrics.enabled:
+        consent_metrics.publish()
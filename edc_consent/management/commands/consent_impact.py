@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from edc_consent.exceptions import ConsentDefinitionError
+from edc_consent.impact import ConsentImpactAnalysis
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the consents and CRFs that would resolve to a different consent "
+        "version or model if the proposed consent definition(s) were registered. "
+        "See edc_consent.impact."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "proposed",
+            help=(
+                "Dotted path to a consent definition or a list of consent definitions, "
+                "for example myapp.consents_amendment.proposed_cdefs"
+            ),
+        )
+        parser.add_argument("--sample-size", dest="sample_size", type=int, default=20)
+        parser.add_argument("--chunk-size", dest="chunk_size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            proposed = import_string(options["proposed"])
+        except ImportError as e:
+            raise CommandError(str(e))
+        try:
+            analysis = ConsentImpactAnalysis(
+                proposed,
+                sample_size=options["sample_size"],
+                chunk_size=options["chunk_size"],
+            )
+        except ConsentDefinitionError as e:
+            raise CommandError(str(e))
+        for impact in analysis.run():
+            self.stdout.write(f"{impact.model}: {impact.changed} of {impact.total} changed")
+            for (site_id, version, proposed_version), count in sorted(
+                impact.transitions.items(), key=lambda x: str(x[0])
+            ):
+                self.stdout.write(
+                    f"  site {site_id}: {version} -> {proposed_version}: {count}"
+                )
+            for row in impact.samples:
+                self.stdout.write(
+                    f"    {row['subject_identifier'] or row['id']} "
+                    f"{row['report_datetime'].isoformat()} stored={row['stored_version']} "
+                    f"current={row['current_version']} proposed={row['proposed_version']}"
+                )
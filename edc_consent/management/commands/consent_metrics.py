@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from edc_consent.instrumentation import consent_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Dump the consent lookup metrics published to the cache. "
+        "See settings.EDC_CONSENT_INSTRUMENTATION."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="format",
+            choices=["text", "json"],
+            default="text",
+        )
+        parser.add_argument(
+            "--reset",
+            dest="reset",
+            action="store_true",
+            default=False,
+            help="Clear the published metrics after dumping",
+        )
+
+    def handle(self, *args, **options):
+        consent_metrics.publish(force=True)
+        snapshot = consent_metrics.published_snapshot()
+        if options["format"] == "json":
+            self.stdout.write(json.dumps(snapshot, indent=2, sort_keys=True))
+        elif not snapshot:
+            self.stdout.write("No consent metrics published.")
+        else:
+            for name, stats in sorted(snapshot.items()):
+                mean = stats["wall_time"] / stats["calls"] if stats["calls"] else 0.0
+                self.stdout.write(
+                    f"{name}: calls={stats['calls']} "
+                    f"wall_time={stats['wall_time']:.4f}s mean={mean * 1000:.3f}ms "
+                    f"queries={stats['queries']} cache_hits={stats['cache_hits']}"
+                )
+        if options["reset"]:
+            consent_metrics.reset_published()
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from edc_consent.site_consents import site_consents
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the consent definition registry to a JSON snapshot. "
+        "See edc_consent.snapshot and settings.EDC_CONSENT_SNAPSHOT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the snapshot file to write")
+
+    def handle(self, *args, **options):
+        data = site_consents.export_snapshot(path=options["path"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {len(data['cdefs'])} consent definitions to {options['path']}"
+            )
+        )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from edc_consent.export import ConsentExport
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a consent listing by site and version as CSV or JSONL. "
+        "Encrypted fields are only exported if given with --fields. "
+        "See edc_consent.export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", dest="format", choices=["csv", "jsonl"], default="csv")
+        parser.add_argument(
+            "--output", dest="output", default=None, help="Path of the file to write"
+        )
+        parser.add_argument("--site", dest="site_id", type=int, default=None)
+        parser.add_argument("--consent-version", dest="consent_version", default=None)
+        parser.add_argument(
+            "--fields",
+            dest="fields",
+            default="",
+            help="Comma separated list of additional consent fields, e.g. first_name",
+        )
+        parser.add_argument("--chunk-size", dest="chunk_size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            export = ConsentExport(
+                fields=[name for name in options["fields"].split(",") if name],
+                site_id=options["site_id"],
+                version=options["consent_version"],
+                chunk_size=options["chunk_size"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        lines = export.as_csv() if options["format"] == "csv" else export.as_jsonl()
+        if options["output"]:
+            count = 0
+            with open(options["output"], "w", newline="") as f:
+                for line in lines:
+                    f.write(line)
+                    count += 1
+            if options["format"] == "csv":
+                count -= 1
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote {count} consents to {options['output']}")
+            )
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from edc_consent.timeline import check_timeline, rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the subject consent timeline from the consents and consent "
+        "extensions. See edc_consent.timeline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            default=False,
+            help="Check the timeline against the consents instead of rebuilding it",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of subjects to process at a time",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            subject_identifiers = check_timeline(batch_size=options["batch_size"])
+            if subject_identifiers:
+                raise CommandError(
+                    f"Consent timeline does not match the consents for "
+                    f"{len(subject_identifiers)} subjects. "
+                    f"Got {', '.join(subject_identifiers[:20])}."
+                )
+            self.stdout.write(self.style.SUCCESS("Consent timeline is consistent"))
+        else:
+            count = rebuild_timeline(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Created {count} consent timeline rows"))
@@ -0,0 +1,52 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from edc_consent.exceptions import ConsentDefinitionError
+from edc_consent.reconsent_worklist import ReconsentWorklist
+from edc_consent.site_consents import site_consents
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a CSV of subjects consented under a previous version who have "
+        "not yet completed the given consent definition."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Name of the consent definition that updates")
+        parser.add_argument("--site", dest="site_id", type=int, default=None)
+        parser.add_argument("--page-size", dest="page_size", type=int, default=500)
+        parser.add_argument(
+            "--output", dest="output", default=None, help="Path of the CSV file to write"
+        )
+
+    def handle(self, *args, **options):
+        if not (cdef := site_consents.get(options["name"])):
+            raise CommandError(f"Consent definition not registered. Got {options['name']}.")
+        try:
+            worklist = ReconsentWorklist(
+                cdef, site_id=options["site_id"], page_size=options["page_size"]
+            )
+        except ConsentDefinitionError as e:
+            raise CommandError(str(e))
+        if options["output"]:
+            with open(options["output"], "w", newline="") as f:
+                count = self.write_csv(worklist, f)
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote {count} subjects to {options['output']}")
+            )
+        else:
+            self.write_csv(worklist, self.stdout)
+
+    @staticmethod
+    def write_csv(worklist: ReconsentWorklist, f) -> int:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["subject_identifier", "site_id", "version", "consent_datetime", "consent_id"]
+        )
+        count = 0
+        for row in worklist:
+            writer.writerow(worklist.as_csv_row(row))
+            count += 1
+        return count
@@ -1,17 +1,91 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Iterable, Iterator, Type
+from uuid import UUID
+
 from django.db import models
+from django.db.models import Case, CharField, OuterRef, Q, Subquery, Value, When
 from edc_search.model_mixins import SearchSlugManager
 from edc_sites.managers import CurrentSiteManager
+from edc_utils import ceil_secs, floor_secs
 
+from .exceptions import ConsentError
 from .site_consents import site_consents
 
+if TYPE_CHECKING:
+    from .consent_definition import ConsentDefinition
+
+
+# instances by (model, database, subject_identifier_as_pk), see
+# natural_key_cache
+_natural_keys: ContextVar[dict | None] = ContextVar("edc_consent_natural_keys", default=None)
+
+NATURAL_KEY_CHUNK_SIZE = 500
+
+
+@contextmanager
+def natural_key_cache() -> Iterator[dict]:
+    """Caches instances resolved by `get_by_natural_keys` and
+    `get_by_natural_key` for the duration of the block, for example
+    a deserialization run, see edc_consent.serialization.
+    """
+    token = _natural_keys.set({})
+    try:
+        yield _natural_keys.get()
+    finally:
+        _natural_keys.reset(token)
+
 
 class ConsentObjectsManager(SearchSlugManager, models.Manager):
     use_in_migrations = True
 
     def get_by_natural_key(self, subject_identifier_as_pk):
-        return self.get(subject_identifier_as_pk=subject_identifier_as_pk)
+        cache = _natural_keys.get()
+        if cache is None:
+            return self.get(subject_identifier_as_pk=subject_identifier_as_pk)
+        key = self.natural_key_cache_key(subject_identifier_as_pk)
+        if key not in cache:
+            cache[key] = self.get(subject_identifier_as_pk=subject_identifier_as_pk)
+        return cache[key]
+
+    def get_by_natural_keys(
+        self, natural_keys: Iterable[str | UUID | tuple], chunk_size: int | None = None
+    ) -> dict[UUID, models.Model]:
+        """Returns a dict of instances by subject_identifier_as_pk,
+        resolved with `__in` queries.
+
+        Only the pk and natural key are loaded; PII fields are not
+        decrypted. If a natural key cache is active, adds the
+        instances to the cache.
+        """
+        chunk_size = chunk_size or NATURAL_KEY_CHUNK_SIZE
+        field = self.model._meta.get_field("subject_identifier_as_pk")
+        values = list(
+            {
+                field.to_python(value[0] if isinstance(value, (list, tuple)) else value)
+                for value in natural_keys
+            }
+        )
+        instances = {}
+        for index in range(0, len(values), chunk_size):
+            for obj in self.filter(
+                subject_identifier_as_pk__in=values[index : index + chunk_size]
+            ).only("id", "subject_identifier_as_pk"):
+                instances[obj.subject_identifier_as_pk] = obj
+        if (cache := _natural_keys.get()) is not None:
+            for value, obj in instances.items():
+                cache[self.natural_key_cache_key(value)] = obj
+        return instances
+
+    def natural_key_cache_key(self, subject_identifier_as_pk) -> tuple[str, str, UUID]:
+        field = self.model._meta.get_field("subject_identifier_as_pk")
+        return (
+            self.model._meta.label_lower,
+            self.db,
+            field.to_python(subject_identifier_as_pk),
+        )
 
 
 class ConsentObjectsByCdefManager(ConsentObjectsManager):
@@ -38,3 +112,119 @@ class CurrentSiteByCdefManager(CurrentSiteManager):
         qs = super().get_queryset()
         cdef = site_consents.get_consent_definition(model=qs.model._meta.label_lower)
         return qs.filter(site_id=cdef.site.site_id, version=cdef.version)
+
+
+class RequiresConsentQuerySetMixin:
+    """A QuerySet mixin for models declared with
+    RequiresConsentFieldsModelMixin.
+    """
+
+    _consent_model_cls: Type[models.Model] | None = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._consent_model_cls = self._consent_model_cls
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super()._fetch_all()
+        if not fetched and self._consent_model_cls and self._result_cache:
+            self.set_resolved_consents(self._result_cache)
+
+    def set_resolved_consents(self, objs: list[models.Model]) -> None:
+        """Sets `resolved_consent_version` and
+        `resolved_consent_datetime` on instances annotated by
+        `with_consent`, with one query per chunk of consent ids.
+
+        Not called for `iterator()`.
+        """
+        objs = [obj for obj in objs if hasattr(obj, "resolved_consent_id")]
+        ids = list({obj.resolved_consent_id for obj in objs} - {None})
+        consents = {}
+        for index in range(0, len(ids), NATURAL_KEY_CHUNK_SIZE):
+            consents.update(
+                (consent_id, (version, consent_datetime))
+                for consent_id, version, consent_datetime in (
+                    self._consent_model_cls._base_manager.using(self.db)
+                    .filter(id__in=ids[index : index + NATURAL_KEY_CHUNK_SIZE])
+                    .values_list("id", "version", "consent_datetime")
+                )
+            )
+        for obj in objs:
+            version, consent_datetime = consents.get(obj.resolved_consent_id, (None, None))
+            obj.resolved_consent_version = version
+            obj.resolved_consent_datetime = consent_datetime
+
+    def with_consent(
+        self,
+        subject_identifier_field: str | None = None,
+        report_datetime_field: str | None = None,
+        consent_model: str | None = None,
+    ) -> models.QuerySet:
+        """Returns the queryset annotated with the consent that
+        `site_consents.get_consent_or_raise` would return for each row.
+
+        Annotates `cdef_version` and `resolved_consent_id`. On fetch,
+        `resolved_consent_version` and `resolved_consent_datetime` are
+        set from the consents by id, see `set_resolved_consents`. The
+        resolved values are None if the subject is not consented.
+
+        The validity periods of the registered consent definitions
+        become a CASE on report_datetime and site_id. The consent id
+        is the only subquery on the concrete consent model.
+        """
+        subject_identifier_field = subject_identifier_field or "subject_identifier"
+        report_datetime_field = report_datetime_field or "report_datetime"
+        model_cls, cdefs = self.get_consent_model_and_cdefs(consent_model)
+        cdef_whens = []
+        # if periods overlap, the consent definition that updates
+        # another starts later and should match first
+        for cdef in sorted(cdefs, reverse=True):
+            condition = Q(
+                **{
+                    f"{report_datetime_field}__gte": floor_secs(cdef.start),
+                    f"{report_datetime_field}__lte": ceil_secs(cdef.end),
+                    "site_id__in": [site.site_id for site in cdef.sites],
+                }
+            )
+            cdef_whens.append(When(condition, then=Value(cdef.version)))
+        # like `cdef.get_consent_for`, the consent of the cdef's
+        # version regardless of consent_datetime
+        consents = model_cls._base_manager.filter(
+            subject_identifier=OuterRef(subject_identifier_field),
+            version=OuterRef("cdef_version"),
+        )
+        qs = self.annotate(
+            cdef_version=Case(*cdef_whens, default=Value(None), output_field=CharField()),
+        ).annotate(resolved_consent_id=Subquery(consents.values("id")[:1]))
+        qs._consent_model_cls = model_cls
+        return qs
+
+    @staticmethod
+    def get_consent_model_and_cdefs(
+        consent_model: str | None = None,
+    ) -> tuple[Type[models.Model], list[ConsentDefinition]]:
+        """Returns the concrete consent model and its registered
+        consent definitions.
+        """
+        cdefs_by_model: dict[Type[models.Model], list[ConsentDefinition]] = {}
+        for cdef in site_consents.registry.values():
+            model_cls = cdef.model_cls._meta.concrete_model
+            if not consent_model or model_cls._meta.label_lower == consent_model:
+                cdefs_by_model.setdefault(model_cls, []).append(cdef)
+        if len(cdefs_by_model) != 1:
+            raise ConsentError(
+                "Expected consent definitions for one concrete consent model. "
+                f"Got {[model_cls._meta.label_lower for model_cls in cdefs_by_model]}. "
+                "Try passing `consent_model`."
+            )
+        return list(cdefs_by_model.items())[0]
+
+
+class RequiresConsentQuerySet(RequiresConsentQuerySetMixin, models.QuerySet):
+    pass
+
+
+class RequiresConsentManager(models.Manager.from_queryset(RequiresConsentQuerySet)):
+    pass
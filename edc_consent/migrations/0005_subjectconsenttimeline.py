@@ -0,0 +1,371 @@
+import uuid
+
+import _socket
+import django.db.models.deletion
+import django.db.models.manager
+import django_audit_fields.fields.hostname_modification_field
+import django_audit_fields.fields.userfield
+import django_audit_fields.fields.uuid_auto_field
+import django_audit_fields.models.audit_model_mixin
+import django_revision.revision_field
+import edc_sites.managers
+import simple_history.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("sites", "0002_alter_domain_unique"),
+        ("edc_consent", "0004_alter_edcpermissions_options_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubjectConsentTimeline",
+            fields=[
+                (
+                    "revision",
+                    django_revision.revision_field.RevisionField(
+                        blank=True,
+                        editable=False,
+                        help_text="System field. Git repository tag:branch:commit.",
+                        max_length=75,
+                        null=True,
+                        verbose_name="Revision",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        blank=True,
+                        default=django_audit_fields.models.audit_model_mixin.utcnow,
+                    ),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(
+                        blank=True,
+                        default=django_audit_fields.models.audit_model_mixin.utcnow,
+                    ),
+                ),
+                (
+                    "user_created",
+                    django_audit_fields.fields.userfield.UserField(
+                        blank=True,
+                        help_text="Updated by admin.save_model",
+                        max_length=50,
+                        verbose_name="user created",
+                    ),
+                ),
+                (
+                    "user_modified",
+                    django_audit_fields.fields.userfield.UserField(
+                        blank=True,
+                        help_text="Updated by admin.save_model",
+                        max_length=50,
+                        verbose_name="user modified",
+                    ),
+                ),
+                (
+                    "hostname_created",
+                    models.CharField(
+                        blank=True,
+                        default=_socket.gethostname,
+                        help_text="System field. (modified on create only)",
+                        max_length=60,
+                        verbose_name="Hostname created",
+                    ),
+                ),
+                (
+                    "hostname_modified",
+                    django_audit_fields.fields.hostname_modification_field.HostnameModificationField(
+                        blank=True,
+                        help_text="System field. (modified on every save)",
+                        max_length=50,
+                        verbose_name="Hostname modified",
+                    ),
+                ),
+                (
+                    "device_created",
+                    models.CharField(
+                        blank=True, max_length=10, verbose_name="Device created"
+                    ),
+                ),
+                (
+                    "device_modified",
+                    models.CharField(
+                        blank=True, max_length=10, verbose_name="Device modified"
+                    ),
+                ),
+                (
+                    "locale_created",
+                    models.CharField(
+                        blank=True,
+                        help_text="Auto-updated by Modeladmin",
+                        max_length=10,
+                        null=True,
+                        verbose_name="Locale created",
+                    ),
+                ),
+                (
+                    "locale_modified",
+                    models.CharField(
+                        blank=True,
+                        help_text="Auto-updated by Modeladmin",
+                        max_length=10,
+                        null=True,
+                        verbose_name="Locale modified",
+                    ),
+                ),
+                (
+                    "id",
+                    django_audit_fields.fields.uuid_auto_field.UUIDAutoField(
+                        blank=True,
+                        editable=False,
+                        help_text="System auto field. UUID primary key.",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("subject_identifier", models.CharField(max_length=50)),
+                ("consent_id", models.UUIDField(unique=True)),
+                ("consent_model", models.CharField(max_length=50)),
+                ("consent_definition_name", models.CharField(max_length=50)),
+                ("version", models.CharField(max_length=10)),
+                ("start", models.DateTimeField(help_text="The consent datetime")),
+                (
+                    "end",
+                    models.DateTimeField(
+                        help_text=(
+                            "The next consent datetime for this subject or the "
+                            "end of the consent definition"
+                        )
+                    ),
+                ),
+                ("extension_version", models.CharField(max_length=10, null=True)),
+                (
+                    "extension_start",
+                    models.DateTimeField(
+                        help_text="Start of the agreed consent extension, if any", null=True
+                    ),
+                ),
+                (
+                    "site",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="sites.site",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Subject Consent Timeline",
+                "verbose_name_plural": "Subject Consent Timeline",
+                "abstract": False,
+                "default_permissions": (
+                    "add",
+                    "change",
+                    "delete",
+                    "view",
+                    "export",
+                    "import",
+                ),
+                "default_manager_name": "objects",
+                "indexes": [
+                    models.Index(
+                        fields=["modified", "created"], name="edc_consent_modifie_807b74_idx"
+                    ),
+                    models.Index(
+                        fields=["user_modified", "user_created"],
+                        name="edc_consent_user_mo_4317d2_idx",
+                    ),
+                    models.Index(
+                        fields=["subject_identifier", "start", "end"],
+                        name="edc_consent_timeline_idx",
+                    ),
+                ],
+            },
+            managers=[
+                ("objects", django.db.models.manager.Manager()),
+                ("on_site", edc_sites.managers.CurrentSiteManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="HistoricalSubjectConsentTimeline",
+            fields=[
+                (
+                    "revision",
+                    django_revision.revision_field.RevisionField(
+                        blank=True,
+                        editable=False,
+                        help_text="System field. Git repository tag:branch:commit.",
+                        max_length=75,
+                        null=True,
+                        verbose_name="Revision",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(
+                        blank=True,
+                        default=django_audit_fields.models.audit_model_mixin.utcnow,
+                    ),
+                ),
+                (
+                    "modified",
+                    models.DateTimeField(
+                        blank=True,
+                        default=django_audit_fields.models.audit_model_mixin.utcnow,
+                    ),
+                ),
+                (
+                    "user_created",
+                    django_audit_fields.fields.userfield.UserField(
+                        blank=True,
+                        help_text="Updated by admin.save_model",
+                        max_length=50,
+                        verbose_name="user created",
+                    ),
+                ),
+                (
+                    "user_modified",
+                    django_audit_fields.fields.userfield.UserField(
+                        blank=True,
+                        help_text="Updated by admin.save_model",
+                        max_length=50,
+                        verbose_name="user modified",
+                    ),
+                ),
+                (
+                    "hostname_created",
+                    models.CharField(
+                        blank=True,
+                        default=_socket.gethostname,
+                        help_text="System field. (modified on create only)",
+                        max_length=60,
+                        verbose_name="Hostname created",
+                    ),
+                ),
+                (
+                    "hostname_modified",
+                    django_audit_fields.fields.hostname_modification_field.HostnameModificationField(
+                        blank=True,
+                        help_text="System field. (modified on every save)",
+                        max_length=50,
+                        verbose_name="Hostname modified",
+                    ),
+                ),
+                (
+                    "device_created",
+                    models.CharField(
+                        blank=True, max_length=10, verbose_name="Device created"
+                    ),
+                ),
+                (
+                    "device_modified",
+                    models.CharField(
+                        blank=True, max_length=10, verbose_name="Device modified"
+                    ),
+                ),
+                (
+                    "locale_created",
+                    models.CharField(
+                        blank=True,
+                        help_text="Auto-updated by Modeladmin",
+                        max_length=10,
+                        null=True,
+                        verbose_name="Locale created",
+                    ),
+                ),
+                (
+                    "locale_modified",
+                    models.CharField(
+                        blank=True,
+                        help_text="Auto-updated by Modeladmin",
+                        max_length=10,
+                        null=True,
+                        verbose_name="Locale modified",
+                    ),
+                ),
+                (
+                    "id",
+                    django_audit_fields.fields.uuid_auto_field.UUIDAutoField(
+                        blank=True,
+                        editable=False,
+                        help_text="System auto field. UUID primary key.",
+                        db_index=True,
+                    ),
+                ),
+                ("subject_identifier", models.CharField(max_length=50)),
+                ("consent_id", models.UUIDField(db_index=True)),
+                ("consent_model", models.CharField(max_length=50)),
+                ("consent_definition_name", models.CharField(max_length=50)),
+                ("version", models.CharField(max_length=10)),
+                ("start", models.DateTimeField(help_text="The consent datetime")),
+                (
+                    "end",
+                    models.DateTimeField(
+                        help_text=(
+                            "The next consent datetime for this subject or the "
+                            "end of the consent definition"
+                        )
+                    ),
+                ),
+                ("extension_version", models.CharField(max_length=10, null=True)),
+                (
+                    "extension_start",
+                    models.DateTimeField(
+                        help_text="Start of the agreed consent extension, if any", null=True
+                    ),
+                ),
+                (
+                    "history_id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("history_date", models.DateTimeField(db_index=True)),
+                ("history_change_reason", models.CharField(max_length=100, null=True)),
+                (
+                    "history_type",
+                    models.CharField(
+                        choices=[("+", "Created"), ("~", "Changed"), ("-", "Deleted")],
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "history_user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "site",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="sites.site",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "historical Subject Consent Timeline",
+                "verbose_name_plural": "historical Subject Consent Timeline",
+                "ordering": ("-history_date", "-history_id"),
+                "get_latest_by": ("history_date", "history_id"),
+            },
+            bases=(simple_history.models.HistoricalChanges, models.Model),
+        ),
+    ]
@@ -1,21 +1,48 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from django.apps import apps as django_apps
 from django.conf import settings
 from django.contrib import admin
-from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
 from django.urls import reverse
+from django.utils.formats import date_format
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
+from django.utils.text import capfirst
+from django.utils.timezone import localtime
+from django.utils.translation import gettext as _
+from django_crypto_fields.fields import BaseField
 from edc_identifier import SubjectIdentifierError, is_subject_identifier_or_raise
 
-from ..actions import flag_as_verified_against_paper, unflag_as_verified_against_paper
+from ..actions import (
+    export_consents_as_csv,
+    flag_as_verified_against_paper,
+    unflag_as_verified_against_paper,
+)
+from ..utils import get_open_data_queries
+
+if TYPE_CHECKING:
+    from ..stubs import ConsentLikeModel
+
+DATA_QUERY_PK_PLACEHOLDER = "__dataquery_pk__"
 
 
 class ConsentModelAdminMixin:
     name_fields: list[str] = ["first_name", "last_name"]
     name_display_field: str = "first_name"
-    actions = (flag_as_verified_against_paper, unflag_as_verified_against_paper)
+    # changelist mode: do not load (and decrypt) encrypted fields
+    # not displayed in the changelist
+    changelist_defer_encrypted_fields: bool = True
+    # set to True to search encrypted fields by an exact match on the
+    # hash instead of the default partial match
+    search_encrypted_fields_exact: bool = False
+    delete_view_protected_limit: int = 10
+    actions = (
+        flag_as_verified_against_paper,
+        unflag_as_verified_against_paper,
+        export_consents_as_csv,
+    )
 
     def __init__(self, *args):
         self.update_radio_fields()
@@ -75,10 +102,51 @@ class ConsentModelAdminMixin:
             return fields + readonly_fields
 
     def get_search_fields(self, request) -> tuple[str, ...]:
+        """Returns search fields where, if
+        `search_encrypted_fields_exact`, encrypted fields, e.g. the
+        names and identity, are searched by an exact match on the
+        hash column instead of a full scan.
+
+        Note: an exact search on an encrypted field matches the whole
+        value only, not part of it. Other fields keep the default
+        partial match.
+        """
         search_fields: tuple[str] = super().get_search_fields(request)
         name_fields: tuple[str] = tuple(self.name_fields)
-        return tuple(
-            set(search_fields + ("id", "subject_identifier", *name_fields, "identity"))
+        search_fields = search_fields + ("id", "subject_identifier", *name_fields, "identity")
+        if self.search_encrypted_fields_exact:
+            encrypted_fields = self.get_encrypted_fields()
+            search_fields = tuple(
+                f"{f}__exact" if f in encrypted_fields else f for f in search_fields
+            )
+        return tuple(dict.fromkeys(search_fields))
+
+    def get_encrypted_fields(self) -> list[str]:
+        return [f.name for f in self.model._meta.concrete_fields if isinstance(f, BaseField)]
+
+    def get_queryset(self, request):
+        """Defers encrypted fields not displayed in the changelist
+        so that only the visible columns are decrypted.
+
+        Not applied to POST requests, e.g. changelist actions, which
+        may need the full instance.
+        """
+        queryset = super().get_queryset(request)
+        if (
+            self.changelist_defer_encrypted_fields
+            and request.method == "GET"
+            and self.is_changelist_request(request)
+        ):
+            list_display = self.get_list_display(request)
+            if deferred := [f for f in self.get_encrypted_fields() if f not in list_display]:
+                queryset = queryset.defer(*deferred)
+        return queryset
+
+    def is_changelist_request(self, request) -> bool:
+        opts = self.model._meta
+        return (
+            getattr(getattr(request, "resolver_match", None), "url_name", None)
+            == f"{opts.app_label}_{opts.model_name}_changelist"
         )
 
     def get_list_display(self, request) -> tuple[str, ...]:
@@ -107,6 +175,65 @@ class ConsentModelAdminMixin:
         )
         return fields
 
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        if request.user.has_perm("edc_data_manager.add_dataquery"):
+            self.prefetch_open_data_queries(changelist.result_list)
+        return changelist
+
+    def prefetch_open_data_queries(self, objs) -> None:
+        """Fetches the open data queries for all unverified
+        consents on the changelist page in one query.
+
+        Links are attached to each object for the `queries` column.
+        URLs are reversed once and the pk substituted per query.
+        """
+        objs = [obj for obj in objs if not obj.is_verified]
+        if objs:
+            add_url = reverse("edc_data_manager_admin:edc_data_manager_dataquery_add")
+            change_url = reverse(
+                "edc_data_manager_admin:edc_data_manager_dataquery_change",
+                args=(DATA_QUERY_PK_PLACEHOLDER,),
+            )
+            links: dict[str, list[tuple[str, str]]] = {}
+            for pk, subject_identifier, action_identifier in (
+                get_open_data_queries(
+                    [obj.subject_identifier for obj in objs],
+                    model=self.model._meta.label_lower,
+                )
+                .order_by()
+                .values_list("id", "subject_identifier", "action_identifier")
+                .distinct()
+            ):
+                links.setdefault(subject_identifier, []).append(
+                    (change_url.replace(DATA_QUERY_PK_PLACEHOLDER, str(pk)), action_identifier)
+                )
+            for obj in objs:
+                obj.open_data_query_links = links.get(obj.subject_identifier, [])
+                obj.data_query_add_url = add_url
+
+    @staticmethod
+    def get_open_data_query_links(obj: ConsentLikeModel) -> list[tuple[str, str]]:
+        """Returns a list of (url, action_identifier) for the open
+        data queries of this consent.
+
+        Uses the links prefetched for the changelist, if available.
+        """
+        try:
+            links = obj.open_data_query_links
+        except AttributeError:
+            links = [
+                (
+                    reverse(
+                        "edc_data_manager_admin:edc_data_manager_dataquery_change",
+                        args=(query_obj.id,),
+                    ),
+                    query_obj.action_identifier,
+                )
+                for query_obj in obj.open_data_queries
+            ]
+        return links
+
     def get_list_filter(self, request) -> tuple[str, ...]:
         list_filter = super().get_list_filter(request)
         custom_fields = (
@@ -125,22 +252,43 @@ class ConsentModelAdminMixin:
         )
         return custom_fields + tuple(f for f in list_filter if f not in custom_fields)
 
+    def has_export_permission(self, request) -> bool:
+        """Returns True if the user may run the
+        `export_consents_as_csv` action.
+        """
+        return request.user.has_perm("edc_consent.export_consents")
+
     def delete_view(self, request, object_id, extra_context=None):
-        """Prevent deletion if SubjectVisit objects exist."""
+        """Prevent deletion if SubjectVisit objects exist.
+
+        Only the report datetimes of the first
+        `delete_view_protected_limit` visits are fetched for display.
+        If there are more, the total is counted and the remainder
+        listed as "and N more".
+        """
         extra_context = extra_context or {}
         subject_consent_model_cls = django_apps.get_model(settings.SUBJECT_CONSENT_MODEL)
         related_visit_model_cls = django_apps.get_model(settings.SUBJECT_VISIT_MODEL)
-        obj = subject_consent_model_cls.objects.get(id=object_id)
-        try:
+        protected = None
+        if subject_identifier := (
+            subject_consent_model_cls.objects.filter(id=object_id)
+            .values_list("subject_identifier", flat=True)
+            .first()
+        ):
+            visits = related_visit_model_cls.objects.filter(
+                subject_identifier=subject_identifier
+            ).order_by("report_datetime")
+            verbose_name = capfirst(related_visit_model_cls._meta.verbose_name)
             protected = [
-                related_visit_model_cls.objects.get(subject_identifier=obj.subject_identifier)
-            ]
-        except ObjectDoesNotExist:
-            protected = None
-        except MultipleObjectsReturned:
-            protected = related_visit_model_cls.objects.filter(
-                subject_identifier=obj.subject_identifier
-            )
+                f"{verbose_name}: {subject_identifier} "
+                f"{date_format(localtime(report_datetime), 'SHORT_DATETIME_FORMAT')}"
+                for report_datetime in visits.values_list("report_datetime", flat=True)[
+                    : self.delete_view_protected_limit
+                ]
+            ] or None
+            if protected and len(protected) == self.delete_view_protected_limit:
+                if more := visits.count() - self.delete_view_protected_limit:
+                    protected.append(_("and %(count)s more") % {"count": more})
         extra_context.update({"protected": protected})
         return super().delete_view(request, object_id, extra_context)
 
@@ -162,21 +310,16 @@ class ConsentModelAdminMixin:
 
     @admin.display(description="Open queries")
     def queries(self, obj=None) -> str:
-        new_url = reverse(
-            "edc_data_manager_admin:edc_data_manager_dataquery_add",
-        )
         if obj.is_verified:
             formatted_html = None
         else:
+            new_url = getattr(obj, "data_query_add_url", None) or reverse(
+                "edc_data_manager_admin:edc_data_manager_dataquery_add",
+            )
             links = []
-            for query_obj in obj.open_data_queries:
-                url = reverse(
-                    "edc_data_manager_admin:edc_data_manager_dataquery_change",
-                    args=(query_obj.id,),
-                )
+            for url, action_identifier in self.get_open_data_query_links(obj):
                 links.append(
-                    f'<A title="go to query" href="{url}">'
-                    f"{query_obj.action_identifier[-9:]}</A>"
+                    f'<A title="go to query" href="{url}">{action_identifier[-9:]}</A>'
                 )
             if links:
                 formatted_html = format_html(
@@ -16,6 +16,7 @@ from ..exceptions import (
 from ..site_consents import site_consents
 
 if TYPE_CHECKING:
+    from ..consent_handle import ConsentHandle
     from ..stubs import ConsentLikeModel
 
 
@@ -30,7 +31,7 @@ class RequiresConsentModelFormMixin:
 
     def clean(self):
         cleaned_data = super().clean()
-        consent_obj = self.validate_against_consent()
+        consent_obj = self.validate_against_consent(lightweight=True)
         self.validate_against_dob(consent_obj)
         return cleaned_data
 
@@ -39,9 +40,14 @@ class RequiresConsentModelFormMixin:
             dte_str = formatted_date(consent_obj.dob)
             raise forms.ValidationError(f"Report datetime cannot be before DOB. Got {dte_str}")
 
-    def validate_against_consent(self) -> ConsentLikeModel | None:
+    def validate_against_consent(
+        self, lightweight: bool | None = None
+    ) -> ConsentLikeModel | ConsentHandle | None:
         """Raise an exception if the report datetime doesn't make
         sense relative to the consent.
+
+        Returns the consent model instance or, if `lightweight`, a
+        ConsentHandle.
         """
         consent_obj = None
         if self.report_datetime:
@@ -50,6 +56,7 @@ class RequiresConsentModelFormMixin:
                     subject_identifier=self.get_subject_identifier(),
                     report_datetime=self.report_datetime,
                     site_id=self.site.id,
+                    lightweight=lightweight,
                 )
             except (NotConsentedError, ConsentDefinitionNotConfiguredForUpdate) as e:
                 raise forms.ValidationError({"__all__": str(e)})
@@ -1,4 +1,5 @@
 from .edc_permissions import EdcPermissions
 from .signals import requires_consent_on_pre_save
+from .subject_consent_timeline import SubjectConsentTimeline
 
-__all__ = ["EdcPermissions", "requires_consent_on_pre_save"]
+__all__ = ["EdcPermissions", "SubjectConsentTimeline", "requires_consent_on_pre_save"]
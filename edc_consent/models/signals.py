@@ -1,8 +1,10 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from edc_sites import site_sites
 
+from ..deferred import defer_consent_check, get_requires_consent_cdef
+from ..instrumentation import instrumented
 from ..model_mixins import RequiresConsentFieldsModelMixin
+from ..routers import get_consent_read_database, is_consent_model, mark_consent_written
 from ..site_consents import site_consents
 
 
@@ -14,35 +16,43 @@ def requires_consent_on_pre_save(instance, raw, using, update_fields, **kwargs):
         and isinstance(instance, (RequiresConsentFieldsModelMixin,))
         and not instance._meta.model_name.startswith("historical")
     ):
-        subject_identifier = getattr(instance, "related_visit", instance).subject_identifier
-        site = getattr(instance, "related_visit", instance).site
-        try:
-            schedule = getattr(instance, "related_visit", instance).schedule
-        except AttributeError:
-            schedule = None
-        if schedule:
-            consent_definition = schedule.get_consent_definition(
-                site=site_sites.get(site.id), report_datetime=instance.report_datetime
-            )
-        else:
-            # this is a PRN model, like SubjectLocator, with no visit_schedule
-            consent_definition = site_consents.get_consent_definition(
-                site=site_sites.get(site.id), report_datetime=instance.report_datetime
-            )
-        site_consents.get_consent_or_raise(
+        if not defer_consent_check(instance):
+            update_consent_fields_or_raise(instance)
+
+
+@receiver(post_save, weak=False, dispatch_uid="consent_written_on_post_save")
+@receiver(post_delete, weak=False, dispatch_uid="consent_written_on_post_delete")
+def consent_written_on_save_or_delete(sender, using, **kwargs):
+    """Keeps consent reads on the primary for the rest of the
+    transaction, see edc_consent.routers.
+    """
+    if get_consent_read_database() and is_consent_model(sender):
+        mark_consent_written(using)
+
+
+@instrumented("requires_consent_on_pre_save")
+def update_consent_fields_or_raise(instance: RequiresConsentFieldsModelMixin) -> None:
+    """Raises if the subject is not consented, otherwise sets
+    `consent_version` and `consent_model` on the instance.
+    """
+    subject_identifier = getattr(instance, "related_visit", instance).subject_identifier
+    site = getattr(instance, "related_visit", instance).site
+    consent_definition = get_requires_consent_cdef(instance)
+    site_consents.get_consent_or_raise(
+        subject_identifier=subject_identifier,
+        report_datetime=instance.report_datetime,
+        site_id=site.id,
+        lightweight=True,
+    )
+    version = consent_definition.version
+    if (
+        consent_definition.extended_by
+        and consent_definition.extended_by.start <= instance.report_datetime
+        and consent_definition.extended_by.get_consent_extension_for(
             subject_identifier=subject_identifier,
-            report_datetime=instance.report_datetime,
-            site_id=site.id,
+            site_id=instance.site_id,
         )
-        version = consent_definition.version
-        if (
-            consent_definition.extended_by
-            and consent_definition.extended_by.start <= instance.report_datetime
-            and consent_definition.extended_by.get_consent_extension_for(
-                subject_identifier=subject_identifier,
-                site_id=instance.site_id,
-            )
-        ):
-            version = consent_definition.extended_by.version
-        instance.consent_version = version
-        instance.consent_model = consent_definition.model
+    ):
+        version = consent_definition.extended_by.version
+    instance.consent_version = version
+    instance.consent_model = consent_definition.model
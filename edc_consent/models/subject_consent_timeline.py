@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.db import models
+from edc_model.models import BaseUuidModel, HistoricalRecords
+from edc_sites.managers import CurrentSiteManager
+from edc_sites.model_mixins import SiteModelMixin
+from edc_utils import to_utc
+
+
+class SubjectConsentTimelineManager(models.Manager):
+    def consented_at(
+        self, subject_identifier: str, report_datetime: datetime, site_id: int | None = None
+    ) -> SubjectConsentTimeline | None:
+        """Returns the timeline row for the subject valid on the
+        report_datetime or None.
+        """
+        report_datetime = to_utc(report_datetime)
+        opts = dict(
+            subject_identifier=subject_identifier,
+            start__lte=report_datetime,
+            end__gte=report_datetime,
+        )
+        if site_id:
+            opts.update(site_id=site_id)
+        return self.filter(**opts).order_by("-start").first()
+
+
+class SubjectConsentTimeline(SiteModelMixin, BaseUuidModel):
+    """A denormalized table of consent validity intervals, one row
+    per subject per consent.
+
+    Maintained from consent and consent extension saves and deletes
+    if settings.EDC_CONSENT_TIMELINE=True. See edc_consent.timeline.
+    """
+
+    subject_identifier = models.CharField(max_length=50)
+
+    consent_id = models.UUIDField(unique=True)
+
+    consent_model = models.CharField(max_length=50)
+
+    consent_definition_name = models.CharField(max_length=50)
+
+    version = models.CharField(max_length=10)
+
+    start = models.DateTimeField(help_text="The consent datetime")
+
+    end = models.DateTimeField(
+        help_text=(
+            "The next consent datetime for this subject or the "
+            "end of the consent definition"
+        )
+    )
+
+    extension_version = models.CharField(max_length=10, null=True)
+
+    extension_start = models.DateTimeField(
+        null=True, help_text="Start of the agreed consent extension, if any"
+    )
+
+    objects = SubjectConsentTimelineManager()
+    on_site = CurrentSiteManager()
+    history = HistoricalRecords()
+
+    def __str__(self) -> str:
+        return f"{self.subject_identifier} v{self.version}"
+
+    def get_version(self, report_datetime: datetime) -> str:
+        """Returns the consent or consent extension version for the
+        report_datetime.
+        """
+        if self.extension_start and self.extension_start <= to_utc(report_datetime):
+            return self.extension_version
+        return self.version
+
+    class Meta(BaseUuidModel.Meta):
+        verbose_name = "Subject Consent Timeline"
+        verbose_name_plural = "Subject Consent Timeline"
+        indexes = BaseUuidModel.Meta.indexes + [
+            models.Index(
+                fields=["subject_identifier", "start", "end"], name="edc_consent_timeline_idx"
+            )
+        ]
@@ -0,0 +1,150 @@
+"""Resolve the next consent to offer for many screened subjects.
+
+A screening listboard decides, per screened subject, which consent
+definition (proxy model and version) to offer. Instead of a
+`site_consents.get_consent_definition(screening_model=..., site=...,
+report_datetime=...)` call per row:
+
+    resolver = NextConsentResolver("myapp.subjectscreening")
+    cdefs = resolver.resolve(
+        qs.values_list("screening_identifier", "site_id", "report_datetime")
+    )
+
+The registry is indexed once by screening model and site, and
+existing consents are fetched with one query per concrete consent
+model per chunk of 500 screening identifiers.
+
+With `raise_on_error=False`, a row that cannot be resolved is None
+in the result and its exception is kept in `resolver.errors` by row
+index, so one bad row does not fail the listboard page.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable
+
+from edc_utils import ceil_secs, floor_secs, formatted_date, to_utc
+
+from .exceptions import ConsentDefinitionDoesNotExist, SiteConsentError
+from .site_consents import site_consents
+
+if TYPE_CHECKING:
+    from .consent_definition import ConsentDefinition
+
+__all__ = ["NextConsentResolver"]
+
+CHUNK_SIZE = 500
+
+
+class NextConsentResolver:
+    """Returns the consent definition to offer next for rows of
+    (screening_identifier, site_id, report_datetime), or None if the
+    subject already has a consent of that version.
+
+    Resolves as `site_consents.get_consent_definition` and raises the
+    same exceptions.
+    """
+
+    def __init__(self, screening_model: str):
+        self.screening_model = screening_model
+        self.errors: dict[int, ConsentDefinitionDoesNotExist | SiteConsentError] = {}
+        # cdefs by site_id, sorted by start
+        self.cdefs: dict[int, list[ConsentDefinition]] = {}
+        for cdef in sorted(site_consents.registry.values(), key=lambda x: x.sort_key):
+            if screening_model in cdef.screening_model:
+                for site in cdef.sites:
+                    self.cdefs.setdefault(site.site_id, []).append(cdef)
+        if not self.cdefs:
+            raise ConsentDefinitionDoesNotExist(
+                "There are no consent definitions using this screening model."
+                f"Got {screening_model}."
+            )
+        self.starts: dict[int, list[datetime]] = {
+            site_id: [floor_secs(cdef.start) for cdef in cdefs]
+            for site_id, cdefs in self.cdefs.items()
+        }
+
+    def get_consent_definition(
+        self, site_id: int, report_datetime: datetime
+    ) -> ConsentDefinition:
+        report_datetime = to_utc(report_datetime)
+        cdefs = self.cdefs.get(site_id, [])
+        index = bisect_right(self.starts.get(site_id, []), report_datetime)
+        cdefs = sorted(
+            [cdef for cdef in cdefs[:index] if report_datetime <= ceil_secs(cdef.end)],
+            key=lambda x: x.version,
+        )
+        if not cdefs:
+            raise ConsentDefinitionDoesNotExist(
+                "Date does not fall within the validity period of any consent "
+                f"definition. Got {formatted_date(report_datetime)}. "
+                f"Using screening_model={self.screening_model} and site_id={site_id}."
+            )
+        return site_consents.select_consent_definition_or_raise(
+            cdefs,
+            dict(
+                screening_model=self.screening_model,
+                site_id=site_id,
+                report_datetime=report_datetime,
+            ),
+        )
+
+    def get_consented(
+        self, screening_identifiers: list[str], using: str | None = None
+    ) -> set[tuple[str, str]]:
+        """Returns a set of (screening_identifier, version) of existing
+        consents.
+        """
+        models = {}
+        for cdefs in self.cdefs.values():
+            for cdef in cdefs:
+                model_cls = cdef.model_cls._meta.concrete_model
+                models[model_cls._meta.label_lower] = model_cls
+        consented = set()
+        for model_cls in models.values():
+            for index in range(0, len(screening_identifiers), CHUNK_SIZE):
+                consented.update(
+                    model_cls._base_manager.using(using)
+                    .filter(
+                        screening_identifier__in=screening_identifiers[
+                            index : index + CHUNK_SIZE
+                        ]
+                    )
+                    .values_list("screening_identifier", "version")
+                )
+        return consented
+
+    def resolve(
+        self,
+        rows: Iterable[tuple[str, int, datetime]],
+        using: str | None = None,
+        raise_on_error: bool | None = None,
+    ) -> list[ConsentDefinition | None]:
+        """Returns the next consent definition for each row, in the
+        order of `rows`.
+
+        Raises on the first row that cannot be resolved unless
+        `raise_on_error=False`, see `errors`.
+        """
+        raise_on_error = True if raise_on_error is None else raise_on_error
+        self.errors = {}
+        rows = list(rows)
+        consented = self.get_consented(
+            list({screening_identifier for screening_identifier, *_ in rows}), using=using
+        )
+        next_cdefs = []
+        for index, (screening_identifier, site_id, report_datetime) in enumerate(rows):
+            try:
+                cdef = self.get_consent_definition(site_id, report_datetime)
+            except (ConsentDefinitionDoesNotExist, SiteConsentError) as e:
+                if raise_on_error:
+                    raise
+                self.errors[index] = e
+                cdef = None
+            else:
+                if (screening_identifier, cdef.version) in consented:
+                    cdef = None
+            next_cdefs.append(cdef)
+        return next_cdefs
@@ -0,0 +1,126 @@
+"""Subjects consented under a previous version who have not yet
+completed the consent that updates it.
+
+The worklist is a single anti-join on the concrete consent tables,
+instead of a `get_consent_or_raise` call per subject:
+
+    worklist = ReconsentWorklist(site_consents.get("myapp.subjectconsentv2-2.0"))
+    rows, next_key = worklist.page()
+    rows, next_key = worklist.page(after=next_key)
+
+Pages are keyset paginated on (subject_identifier, id).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Iterator
+from uuid import UUID
+
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
+
+from .exceptions import ConsentDefinitionError
+
+if TYPE_CHECKING:
+    from .consent_definition import ConsentDefinition
+
+__all__ = ["ReconsentWorklist"]
+
+WORKLIST_FIELDS = ["id", "subject_identifier", "site_id", "version", "consent_datetime"]
+
+
+class ReconsentWorklist:
+    """A worklist of consents of `cdef.updates` for which there is
+    no consent of `cdef` for the same subject.
+
+    Limited to the sites of `cdef` and, if given, to `site_id`.
+    """
+
+    def __init__(
+        self,
+        cdef: ConsentDefinition,
+        site_id: int | None = None,
+        page_size: int | None = None,
+    ):
+        if not cdef.updates:
+            raise ConsentDefinitionError(
+                f"Consent definition does not update a previous version. See {cdef.name}."
+            )
+        self.cdef = cdef
+        self.site_id = site_id
+        self.page_size = page_size or 500
+
+    @property
+    def site_ids(self) -> list[int]:
+        site_ids = [site.site_id for site in self.cdef.sites]
+        if self.site_id:
+            site_ids = [site_id for site_id in site_ids if site_id == self.site_id]
+        return site_ids
+
+    @property
+    def queryset(self) -> QuerySet:
+        """Returns a queryset of previous version consents on the
+        concrete consent model.
+        """
+        model_cls = self.cdef.updates.model_cls._meta.concrete_model
+        updated_model_cls = self.cdef.model_cls._meta.concrete_model
+        reconsents = updated_model_cls._base_manager.filter(
+            subject_identifier=OuterRef("subject_identifier"), version=self.cdef.version
+        )
+        return model_cls._base_manager.filter(
+            version=self.cdef.updates.version, site_id__in=self.site_ids
+        ).filter(~Exists(reconsents))
+
+    def page(
+        self, after: tuple[str, UUID] | None = None
+    ) -> tuple[list[dict[str, Any]], tuple[str, UUID] | None]:
+        """Returns a list of rows and the key to pass as `after` to
+        get the next page, or None if this is the last page.
+        """
+        qs = self.queryset
+        if after:
+            subject_identifier, pk = after
+            qs = qs.filter(
+                Q(subject_identifier__gt=subject_identifier)
+                | Q(subject_identifier=subject_identifier, id__gt=pk)
+            )
+        rows = list(
+            qs.order_by("subject_identifier", "id").values(*WORKLIST_FIELDS)[
+                : self.page_size + 1
+            ]
+        )
+        if len(rows) > self.page_size:
+            rows = rows[: self.page_size]
+            return rows, (rows[-1]["subject_identifier"], rows[-1]["id"])
+        return rows, None
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        after = None
+        while True:
+            rows, after = self.page(after=after)
+            yield from rows
+            if not after:
+                break
+
+    def count(self) -> int:
+        return self.queryset.count()
+
+    def counts(self) -> dict[tuple[int, str], int]:
+        """Returns a dict of counts by (site_id, version)."""
+        return {
+            (row["site_id"], row["version"]): row["count"]
+            for row in self.queryset.order_by()
+            .values("site_id", "version")
+            .annotate(count=Count("id"))
+        }
+
+    @staticmethod
+    def as_csv_row(row: dict[str, Any]) -> list[str]:
+        consent_datetime: datetime = row["consent_datetime"]
+        return [
+            row["subject_identifier"],
+            str(row["site_id"]),
+            row["version"],
+            consent_datetime.isoformat(),
+            str(row["id"]),
+        ]
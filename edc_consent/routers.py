@@ -0,0 +1,97 @@
+"""Route read-only consent lookups to a replica database.
+
+Set settings.EDC_CONSENT_READ_DATABASE to the replica alias and add
+the router to settings.DATABASE_ROUTERS:
+
+    DATABASE_ROUTERS = ["edc_consent.routers.ConsentReadRouter"]
+
+Reads of consent and consent extension models, including those made
+through the Cdef managers and the `get_consent_for` family of lookups,
+go to the replica. Writes always go to the primary (`default`).
+
+Once a consent is saved or deleted inside a transaction, reads stick
+to the primary until that transaction ends, so a caller may read
+its own writes.
+"""
+
+from __future__ import annotations
+
+from typing import Type
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+
+__all__ = [
+    "ConsentReadRouter",
+    "consent_written_in_transaction",
+    "get_consent_read_database",
+    "is_consent_model",
+    "mark_consent_written",
+]
+
+STICKY_ATTR = "edc_consent_written"
+
+
+def get_consent_read_database() -> str | None:
+    return getattr(settings, "EDC_CONSENT_READ_DATABASE", None)
+
+
+def is_consent_model(model: Type[models.Model]) -> bool:
+    from .model_mixins import ConsentExtensionModelMixin, ConsentModelMixin
+
+    return issubclass(model, (ConsentModelMixin, ConsentExtensionModelMixin))
+
+
+def mark_consent_written(using: str) -> None:
+    """Marks the connection so that consent reads stick to the
+    primary until the current transaction ends.
+
+    Does nothing in autocommit mode.
+    """
+    connection = connections[using]
+    if connection.in_atomic_block and not getattr(connection, STICKY_ATTR, False):
+        setattr(connection, STICKY_ATTR, True)
+        transaction.on_commit(lambda: setattr(connection, STICKY_ATTR, False), using=using)
+
+
+def consent_written_in_transaction(using: str = DEFAULT_DB_ALIAS) -> bool:
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        # the transaction ended, possibly by rollback
+        setattr(connection, STICKY_ATTR, False)
+        return False
+    return getattr(connection, STICKY_ATTR, False)
+
+
+class ConsentReadRouter:
+    """A database router for consent and consent extension models.
+
+    Does nothing if settings.EDC_CONSENT_READ_DATABASE is not set.
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        replica = get_consent_read_database()
+        if replica and is_consent_model(model):
+            if consent_written_in_transaction(DEFAULT_DB_ALIAS):
+                return DEFAULT_DB_ALIAS
+            return replica
+        return None
+
+    def db_for_write(self, model, **hints) -> str | None:
+        # an instance read from the replica is saved to the primary
+        if get_consent_read_database() and is_consent_model(model):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        replica = get_consent_read_database()
+        if replica:
+            databases = {DEFAULT_DB_ALIAS, replica}
+            if obj1._state.db in databases and obj2._state.db in databases:
+                return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool | None:
+        if db == get_consent_read_database():
+            return False
+        return None
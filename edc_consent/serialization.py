@@ -0,0 +1,173 @@
+"""Deserialize consents and consent extensions with natural keys
+resolved in bulk.
+
+Django's deserializer resolves each natural key with one
+`get_by_natural_key` query: once for each consent without a pk and
+once for each foreign key to a consent, for example
+`ConsentExtensionModelMixin.subject_consent`. `bulk_deserialize`
+first collects the natural keys of the payload, resolves them with
+`ConsentObjectsManager.get_by_natural_keys`, replaces the resolved
+natural keys in the payload with pks and deserializes the objects
+before the natural key cache is closed:
+
+    for deserialized_object in bulk_deserialize("json", payload):
+        deserialized_object.save()
+
+Objects are returned as a list of the objects yielded by
+`django.core.serializers.deserialize`.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from django.apps import apps as django_apps
+from django.core import serializers
+from django.db import DEFAULT_DB_ALIAS
+
+from .managers import ConsentObjectsManager, natural_key_cache
+from .model_mixins import ConsentModelMixin
+
+if TYPE_CHECKING:
+    from django.core.serializers.base import DeserializedObject
+
+__all__ = [
+    "bulk_deserialize",
+    "get_natural_key_manager",
+    "get_natural_keys",
+    "load_objects",
+    "replace_natural_keys",
+]
+
+
+def load_objects(format: str, stream_or_string: Any) -> list[dict[str, Any]]:
+    """Returns the serialized objects as a list of dicts, the
+    "python" serialization format.
+    """
+    if format == "python":
+        return list(stream_or_string)
+    if not isinstance(stream_or_string, (bytes, str)):
+        stream_or_string = stream_or_string.read()
+    if isinstance(stream_or_string, bytes):
+        stream_or_string = stream_or_string.decode()
+    if format == "json":
+        return json.loads(stream_or_string)
+    elif format == "jsonl":
+        return [json.loads(line) for line in stream_or_string.splitlines() if line.strip()]
+    raise ValueError(f"Unsupported serialization format. Got {format}.")
+
+
+def get_natural_key_manager(model_cls) -> ConsentObjectsManager | None:
+    """Returns the consent model's ConsentObjectsManager or None.
+
+    Looks for `objects` first, then any other manager. The default
+    manager is not used, on consent proxy models it is usually
+    `on_site`.
+    """
+    if not issubclass(model_cls, ConsentModelMixin):
+        return None
+    if isinstance(getattr(model_cls, "objects", None), ConsentObjectsManager):
+        return model_cls.objects
+    for manager in model_cls._meta.managers:
+        if isinstance(manager, ConsentObjectsManager):
+            return manager
+    return None
+
+
+def has_consent_natural_key(model_cls) -> bool:
+    return get_natural_key_manager(model_cls) is not None
+
+
+def get_natural_keys(objects: list[dict[str, Any]]) -> dict[type, set]:
+    """Returns the natural keys of consents in the payload by consent
+    model.
+
+    Includes the natural keys of consents without a pk and of
+    foreign keys to consent models given as natural keys.
+    """
+    natural_keys: dict[type, set] = {}
+    for item in objects:
+        model_cls = django_apps.get_model(item["model"])
+        fields = item.get("fields", {})
+        if has_consent_natural_key(model_cls) and item.get("pk") is None:
+            if value := fields.get("subject_identifier_as_pk"):
+                natural_keys.setdefault(model_cls, set()).add(value)
+        for field in model_cls._meta.concrete_fields:
+            value = fields.get(field.name)
+            if (
+                field.is_relation
+                and isinstance(value, (list, tuple))
+                and has_consent_natural_key(field.remote_field.model)
+            ):
+                natural_keys.setdefault(field.remote_field.model, set()).add(value[0])
+    return natural_keys
+
+
+def replace_natural_keys(
+    objects: list[dict[str, Any]], instances: dict[type, dict]
+) -> list[dict[str, Any]]:
+    """Returns a copy of the serialized objects with the natural keys
+    of consents replaced by the pks of the resolved `instances`.
+
+    `instances` are by consent model and subject_identifier_as_pk, as
+    returned by `get_by_natural_keys`. Natural keys not resolved are
+    left as is.
+    """
+
+    def get_pk(model_cls, value):
+        field = model_cls._meta.get_field("subject_identifier_as_pk")
+        obj = instances.get(model_cls, {}).get(field.to_python(value))
+        return None if obj is None else obj.pk
+
+    replaced = []
+    for item in objects:
+        model_cls = django_apps.get_model(item["model"])
+        item = dict(item, fields=dict(item.get("fields", {})))
+        fields = item["fields"]
+        if item.get("pk") is None and model_cls in instances:
+            if value := fields.get("subject_identifier_as_pk"):
+                item["pk"] = get_pk(model_cls, value)
+        for field in model_cls._meta.concrete_fields:
+            value = fields.get(field.name)
+            if (
+                field.is_relation
+                and isinstance(value, (list, tuple))
+                and field.remote_field.model in instances
+            ):
+                if (pk := get_pk(field.remote_field.model, value[0])) is not None:
+                    fields[field.name] = pk
+        replaced.append(item)
+    return replaced
+
+
+def bulk_deserialize(
+    format: str,
+    stream_or_string: Any,
+    using: str | None = None,
+    chunk_size: int | None = None,
+    **options,
+) -> list[DeserializedObject]:
+    """Returns deserialized objects with the natural keys of consents
+    resolved in bulk, see module docstring.
+
+    Objects are deserialized inside the `natural_key_cache` block
+    and not yielded, so the cache is not held open by the caller.
+
+    `format` is one of "json", "jsonl" or "python". `options` are
+    passed to the deserializer.
+    """
+    using = using or DEFAULT_DB_ALIAS
+    objects = load_objects(format, stream_or_string)
+    with natural_key_cache():
+        instances = {
+            model_cls: get_natural_key_manager(model_cls)
+            .db_manager(using)
+            .get_by_natural_keys(keys, chunk_size=chunk_size)
+            for model_cls, keys in get_natural_keys(objects).items()
+        }
+        return list(
+            serializers.deserialize(
+                "python", replace_natural_keys(objects, instances), using=using, **options
+            )
+        )
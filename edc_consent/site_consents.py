@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import sys
-from copy import deepcopy
+from copy import copy
 from datetime import datetime
-from typing import TYPE_CHECKING
+from importlib.util import find_spec
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator
 
 from django.apps import apps as django_apps
+from django.conf import settings
 from django.core.management.color import color_style
+from django.utils.functional import lazy
 from django.utils.module_loading import import_module, module_has_submodule
 from edc_sites.site import sites as site_sites
-from edc_utils import ceil_secs, floor_secs, formatted_date, to_utc
+from edc_utils import ceil_secs, floor_secs, formatted_date, get_utcnow, to_utc
 
 from .exceptions import (
     AlreadyRegistered,
@@ -18,22 +24,43 @@ from .exceptions import (
     ConsentDefinitionNotConfiguredForUpdate,
     SiteConsentError,
 )
+from .instrumentation import instrumented
+from .snapshot import (
+    SNAPSHOT_FORMAT,
+    SNAPSHOT_VERSION,
+    SnapshotError,
+    read_snapshot,
+    write_snapshot,
+)
 
 if TYPE_CHECKING:
+    from django.db.models import QuerySet
     from edc_sites.single_site import SingleSite
 
     from .consent_definition import ConsentDefinition
     from .consent_definition_extension import ConsentDefinitionExtension
+    from .consent_handle import ConsentHandle
     from .stubs import ConsentLikeModel
 
 
 __all__ = ["site_consents"]
 
+CONSENTS_CHUNK_SIZE = 500
+
+
+def lazy_message(func: Callable[[], str]) -> str:
+    """Returns a lazy string. `func` is called on `str()`, for
+    example when the exception is logged or displayed.
+    """
+    return lazy(func, str)()
+
 
 class SiteConsents:
     def __init__(self):
         self.registry = {}
         self.loaded = False
+        # consent definitions loaded by `load_snapshot`, by name
+        self.snapshot_cdefs: dict[str, ConsentDefinition] = {}
 
     def register(
         self,
@@ -41,22 +68,92 @@ class SiteConsents:
         updated_by: ConsentDefinition | None = None,
         extended_by: ConsentDefinitionExtension | None = None,
     ) -> None:
-        cdef.updated_by = updated_by
-        cdef.extended_by = extended_by
+        if self.from_snapshot(cdef.name):
+            self.replace_snapshot_cdef_or_raise(cdef, updated_by, extended_by)
+            return
         if cdef.name in self.registry:
             raise AlreadyRegistered(f"Consent definition already registered. Got {cdef.name}.")
+        if any(self.from_snapshot(name) for name in self.registry):
+            raise SnapshotError(
+                "Consent definition not in the loaded snapshot. Export the snapshot "
+                f"again. See settings.EDC_CONSENT_SNAPSHOT. Got {cdef.name}."
+            )
+        cdef.link(updated_by=updated_by, extended_by=extended_by)
         self.validate_period_overlap_or_raise(cdef)
         self.validate_updates_or_raise(cdef)
         self.registry.update({cdef.name: cdef})
         self.loaded = True
 
+    def from_snapshot(self, name: str) -> bool:
+        """Returns True if the registered consent definition `name`
+        was loaded from a snapshot and not yet registered by code.
+        """
+        return name in self.snapshot_cdefs and self.registry.get(name) is (
+            self.snapshot_cdefs[name]
+        )
+
+    def replace_snapshot_cdef_or_raise(
+        self,
+        cdef: ConsentDefinition,
+        updated_by: ConsentDefinition | None = None,
+        extended_by: ConsentDefinitionExtension | None = None,
+    ) -> None:
+        """Replaces a consent definition loaded from a snapshot with
+        the same consent definition registered by code, or raises if
+        they differ.
+        """
+        cdef.link(updated_by=updated_by, extended_by=extended_by)
+        if self.get_snapshot_item(cdef) != self.get_snapshot_item(self.registry[cdef.name]):
+            raise SnapshotError(
+                "Consent definition does not match the loaded snapshot. Export the "
+                f"snapshot again. See settings.EDC_CONSENT_SNAPSHOT. Got {cdef.name}."
+            )
+        self.registry.update({cdef.name: cdef})
+
+    def validate_snapshot_or_raise(self) -> None:
+        """Raises SnapshotError if the consent definitions registered
+        by code are not the same as those in the loaded snapshot.
+        """
+        names = sorted(
+            name
+            for name in set(self.registry) | set(self.snapshot_cdefs)
+            if self.from_snapshot(name)
+            or name not in self.registry
+            or name not in self.snapshot_cdefs
+        )
+        if names:
+            raise SnapshotError(
+                "Consent definitions registered by code do not match the loaded "
+                "snapshot. Export the snapshot again. See settings.EDC_CONSENT_SNAPSHOT. "
+                f"Got {names}."
+            )
+
     def unregister(self, cdef: ConsentDefinition) -> None:
         self.registry.pop(cdef.name, None)
 
-    def get_registry_display(self):
-        cdefs = sorted(list(self.registry.values()), key=lambda x: x.version)
+    def get_registry_display(self, cdefs: list[ConsentDefinition] | None = None) -> str:
+        cdefs = self.registry.values() if cdefs is None else cdefs
+        cdefs = sorted(cdefs, key=lambda x: x.version)
         return "', '".join([cdef.display_name for cdef in cdefs])
 
+    @staticmethod
+    def get_using_display(errror_messages: list[str | tuple[str, Any]]) -> str:
+        """Returns the criteria collected by the filter methods as a
+        string.
+
+        Items are formatted here, not when collected, since the
+        message is only needed if a filter raises.
+        """
+        items = []
+        for item in errror_messages:
+            if isinstance(item, tuple):
+                name, value = item
+                if name == "report_datetime":
+                    value = formatted_date(value)
+                item = f"{name}={value}"
+            items.append(item)
+        return "Using " + " and ".join(items)
+
     def get(self, name) -> ConsentDefinition:
         return self.registry.get(name)
 
@@ -102,28 +199,147 @@ class SiteConsents:
                         f"Got {cdef.name}."
                     )
 
-    def get_consents(self, subject_identifier: str, site_id: int | None) -> list:
-        consents = []
+    def get_consents(
+        self, subject_identifier: str, site_id: int | None, using: str | None = None
+    ) -> list:
+        """Returns the subject's consents, one for each consent
+        definition the subject has completed, in registry order.
+
+        Same as `ConsentDefinition.get_consent_for` for each consent
+        definition but with one query per concrete consent model.
+        Each consent is an instance of its consent definition's proxy
+        model.
+        """
+        return self.get_consents_for_subjects([subject_identifier], site_id, using=using)[
+            subject_identifier
+        ]
+
+    def get_consents_for_subjects(
+        self, subject_identifiers: list[str], site_id: int | None, using: str | None = None
+    ) -> dict[str, list]:
+        """Returns a dict of lists of consents by subject_identifier,
+        see `get_consents`.
+
+        One `subject_identifier__in` query per concrete consent model
+        and chunk of subject identifiers.
+        """
+        cdefs, cdefs_by_model = self.get_cdefs_by_concrete_model(site_id)
+        found: dict[tuple[str, str], ConsentLikeModel] = {}
+        for concrete_model, cdefs_by_version in cdefs_by_model.items():
+            for qs in self.get_consents_querysets(
+                concrete_model, cdefs_by_version, subject_identifiers, site_id, using
+            ):
+                for consent_obj in qs:
+                    self.add_proxy_consent(found, consent_obj, cdefs_by_version)
+        return self.group_consents(found, cdefs, subject_identifiers)
+
+    async def aget_consents(
+        self, subject_identifier: str, site_id: int | None, using: str | None = None
+    ) -> list:
+        """Async version of `get_consents`."""
+        consents = await self.aget_consents_for_subjects(
+            [subject_identifier], site_id, using=using
+        )
+        return consents[subject_identifier]
+
+    async def aget_consents_for_subjects(
+        self, subject_identifiers: list[str], site_id: int | None, using: str | None = None
+    ) -> dict[str, list]:
+        """Async version of `get_consents_for_subjects`.
+
+        The queries run one after another; the async ORM runs them
+        in a single thread.
+        """
+        cdefs, cdefs_by_model = self.get_cdefs_by_concrete_model(site_id)
+        found: dict[tuple[str, str], ConsentLikeModel] = {}
+        for concrete_model, cdefs_by_version in cdefs_by_model.items():
+            for qs in self.get_consents_querysets(
+                concrete_model, cdefs_by_version, subject_identifiers, site_id, using
+            ):
+                async for consent_obj in qs:
+                    self.add_proxy_consent(found, consent_obj, cdefs_by_version)
+        return self.group_consents(found, cdefs, subject_identifiers)
+
+    def get_cdefs_by_concrete_model(
+        self, site_id: int | None
+    ) -> tuple[list[ConsentDefinition], dict[type, dict[str, list[ConsentDefinition]]]]:
+        """Returns the consent definitions for the site and a dict of
+        them by concrete consent model and version.
+        """
         opts = {}
         if site_id:
-            single_site = site_sites.get(site_id)
-            opts.update(site=single_site)
-        for cdef in self.get_consent_definitions(**opts):
-            if consent_obj := cdef.get_consent_for(
-                subject_identifier=subject_identifier,
-                site_id=site_id,
-                raise_if_not_consented=False,
-            ):
-                consents.append(consent_obj)
-        return consents
+            opts.update(site=site_sites.get(site_id))
+        cdefs = self.get_consent_definitions(**opts)
+        cdefs_by_model: dict[type, dict[str, list[ConsentDefinition]]] = {}
+        for cdef in cdefs:
+            concrete_model = cdef.model_cls._meta.concrete_model
+            cdefs_by_model.setdefault(concrete_model, {}).setdefault(cdef.version, []).append(
+                cdef
+            )
+        return cdefs, cdefs_by_model
+
+    @staticmethod
+    def get_consents_querysets(
+        concrete_model: type,
+        cdefs_by_version: dict[str, list[ConsentDefinition]],
+        subject_identifiers: list[str],
+        site_id: int | None,
+        using: str | None,
+    ) -> Iterator[QuerySet]:
+        """Yields a queryset of consents for each chunk of
+        subject identifiers.
+        """
+        subject_identifiers = list(dict.fromkeys(subject_identifiers))
+        chunk_size = CONSENTS_CHUNK_SIZE
+        for index in range(0, len(subject_identifiers), chunk_size):
+            qs = concrete_model._base_manager.using(using).filter(
+                subject_identifier__in=subject_identifiers[index : index + chunk_size],
+                version__in=list(cdefs_by_version),
+            )
+            if site_id:
+                qs = qs.filter(site_id=site_id)
+            yield qs
+
+    @staticmethod
+    def add_proxy_consent(
+        found: dict[tuple[str, str], ConsentLikeModel],
+        consent_obj: ConsentLikeModel,
+        cdefs_by_version: dict[str, list[ConsentDefinition]],
+    ) -> None:
+        """Adds the consent, as an instance of each consent
+        definition's proxy model (as `get_consent_for`), by
+        (subject_identifier, cdef name).
+        """
+        for cdef in cdefs_by_version[consent_obj.version]:
+            proxy_obj = copy(consent_obj)
+            proxy_obj.__class__ = cdef.model_cls
+            found.setdefault((consent_obj.subject_identifier, cdef.name), proxy_obj)
 
+    @staticmethod
+    def group_consents(
+        found: dict[tuple[str, str], ConsentLikeModel],
+        cdefs: list[ConsentDefinition],
+        subject_identifiers: list[str],
+    ) -> dict[str, list]:
+        return {
+            subject_identifier: [
+                found[(subject_identifier, cdef.name)]
+                for cdef in cdefs
+                if (subject_identifier, cdef.name) in found
+            ]
+            for subject_identifier in subject_identifiers
+        }
+
+    @instrumented("site_consents.get_consent_or_raise")
     def get_consent_or_raise(
         self,
         subject_identifier: str,
         report_datetime: datetime,
         site_id: int | None = None,
         raise_if_not_consented: bool | None = None,
-    ) -> ConsentLikeModel:
+        using: str | None = None,
+        lightweight: bool | None = None,
+    ) -> ConsentLikeModel | ConsentHandle:
         """Returns a subject consent using this consent_definition's
         `model_cls` and `version`.
 
@@ -133,6 +349,9 @@ class SiteConsents:
 
         Finally, if the subject consent does not exist raises a
         `NotConsentedError`.
+
+        If `lightweight`, returns a ConsentHandle, see
+        `ConsentDefinition.get_consent_for`.
         """
         from edc_sites.site import sites as site_sites  # avoid circular import
 
@@ -147,8 +366,96 @@ class SiteConsents:
         consent_obj = cdef.get_consent_for(
             subject_identifier=subject_identifier,
             raise_if_not_consented=raise_if_not_consented,
+            using=using,
+            lightweight=lightweight,
+        )
+        if previous_cdef := self.get_previous_cdef_or_raise(
+            cdef, consent_obj, subject_identifier, report_datetime
+        ):
+            # return the previous version consent (updated_by)
+            consent_obj = previous_cdef.get_consent_for(
+                subject_identifier,
+                raise_if_not_consented=raise_if_not_consented,
+                using=using,
+                lightweight=lightweight,
+            )
+        return consent_obj
+
+    async def aget_consent_or_raise(
+        self,
+        subject_identifier: str,
+        report_datetime: datetime,
+        site_id: int | None = None,
+        raise_if_not_consented: bool | None = None,
+        using: str | None = None,
+        lightweight: bool | None = None,
+    ) -> ConsentLikeModel | ConsentHandle:
+        """Async version of `get_consent_or_raise`."""
+        from edc_sites.site import sites as site_sites  # avoid circular import
+
+        raise_if_not_consented = (
+            True if raise_if_not_consented is None else raise_if_not_consented
+        )
+        single_site = site_sites.get(site_id) if site_id else None
+        cdef = self.get_consent_definition(report_datetime=report_datetime, site=single_site)
+        consent_obj = await cdef.aget_consent_for(
+            subject_identifier=subject_identifier,
+            raise_if_not_consented=raise_if_not_consented,
+            using=using,
+            lightweight=lightweight,
+        )
+        if previous_cdef := self.get_previous_cdef_or_raise(
+            cdef, consent_obj, subject_identifier, report_datetime
+        ):
+            consent_obj = await previous_cdef.aget_consent_for(
+                subject_identifier,
+                raise_if_not_consented=raise_if_not_consented,
+                using=using,
+                lightweight=lightweight,
+            )
+        return consent_obj
+
+    async def aget_consent_or_raise_for_subjects(
+        self,
+        subject_identifiers: list[str],
+        report_datetime: datetime,
+        site_id: int | None = None,
+        raise_if_not_consented: bool | None = None,
+        using: str | None = None,
+    ) -> dict[str, ConsentLikeModel | None]:
+        """Returns a dict of consents by subject_identifier.
+
+        Raises on the first subject that raises. The lookups are
+        gathered but the async ORM runs their queries one after
+        another in a single thread.
+        """
+        consents = await asyncio.gather(
+            *[
+                self.aget_consent_or_raise(
+                    subject_identifier,
+                    report_datetime,
+                    site_id=site_id,
+                    raise_if_not_consented=raise_if_not_consented,
+                    using=using,
+                )
+                for subject_identifier in subject_identifiers
+            ]
         )
+        return dict(zip(subject_identifiers, consents))
+
+    @staticmethod
+    def get_previous_cdef_or_raise(
+        cdef: ConsentDefinition,
+        consent_obj: ConsentLikeModel | None,
+        subject_identifier: str,
+        report_datetime: datetime,
+    ) -> ConsentDefinition | None:
+        """Returns the cdef updated by `cdef` if the consent for the
+        report_datetime is of the previous version, otherwise None.
 
+        Raises if the consent is dated after the report_datetime and
+        `cdef` does not update a previous version.
+        """
         if consent_obj and to_utc(report_datetime) < consent_obj.consent_datetime:
             if not cdef.updates:
                 dte = formatted_date(report_datetime)
@@ -162,14 +469,10 @@ class SiteConsents:
                 # ensures the higher version is returned if there is overlap
                 pass
             elif cdef.updates.start <= to_utc(report_datetime) <= cdef.updates.end:
-                # return the previous version consent (updated_by)
-                consent_obj = cdef.updates.get_consent_for(
-                    subject_identifier, raise_if_not_consented=raise_if_not_consented
-                )
-            else:
-                pass
-        return consent_obj
+                return cdef.updates
+        return None
 
+    @instrumented("site_consents.get_consent_definition")
     def get_consent_definition(
         self,
         model: str = None,
@@ -191,6 +494,18 @@ class SiteConsents:
             screening_model=screening_model,
         )
         cdefs = self.get_consent_definitions(**opts, **kwargs)
+        return self.select_consent_definition_or_raise(cdefs, opts)
+
+    @staticmethod
+    def select_consent_definition_or_raise(
+        cdefs: list[ConsentDefinition], opts: dict[str, Any]
+    ) -> ConsentDefinition:
+        """Returns the consent definition from a list of valid consent
+        definitions, sorted by version.
+
+        If more than one, returns the one that updates another or
+        raises.
+        """
         if len(cdefs) > 1:
             cdef = None
             for index, _cdef in enumerate(cdefs):
@@ -258,9 +573,9 @@ class SiteConsents:
     def _filter_cdefs_by_model_or_raise(
         model: str | None,
         consent_definitions: list[ConsentDefinition],
-        errror_messages: list[str] = None,
+        errror_messages: list[str | tuple[str, Any]] = None,
         attrname: str | None = None,
-    ) -> tuple[list[ConsentDefinition], list[str]]:
+    ) -> tuple[list[ConsentDefinition], list[str | tuple[str, Any]]]:
         attrname = attrname or "model"
         cdefs = consent_definitions
         if model:
@@ -275,78 +590,79 @@ class SiteConsents:
                     f"There are no consent definitions using this model. Got {model}."
                 )
             else:
-                errror_messages.append(f"model={model}")
+                errror_messages.append(("model", model))
         return cdefs, errror_messages
 
     @staticmethod
     def _filter_cdefs_by_screening_model_or_raise(
         model: str | None,
         consent_definitions: list[ConsentDefinition],
-        errror_messages: list[str] = None,
-    ) -> tuple[list[ConsentDefinition], list[str]]:
+        errror_messages: list[str | tuple[str, Any]] = None,
+    ) -> tuple[list[ConsentDefinition], list[str | tuple[str, Any]]]:
         cdefs = consent_definitions
         if model:
-            cdefs = []
-            for cdef in consent_definitions:
-                if isinstance(cdef.screening_model, list):
-                    for screening_model in cdef.screening_model:
-                        if model == screening_model:
-                            if cdef not in cdefs:
-                                cdefs.append(cdef)
-                else:
-                    if model == cdef.screening_model:
-                        cdefs.append(cdef)
+            cdefs = [cdef for cdef in consent_definitions if model in cdef.screening_model]
             if not cdefs:
                 raise ConsentDefinitionDoesNotExist(
                     "There are no consent definitions using this screening model."
                     f"Got {model}."
                 )
             else:
-                errror_messages.append(f"model={model}")
+                errror_messages.append(("model", model))
         return cdefs, errror_messages
 
     def _filter_cdefs_by_report_datetime_or_raise(
         self,
         report_datetime: datetime | None,
         consent_definitions: list[ConsentDefinition],
-        errror_messages: list[str] = None,
-    ) -> tuple[list[ConsentDefinition], list[str]]:
+        errror_messages: list[str | tuple[str, Any]] = None,
+    ) -> tuple[list[ConsentDefinition], list[str | tuple[str, Any]]]:
         cdefs = consent_definitions
         if report_datetime:
+            utc_report_datetime = to_utc(report_datetime)
             cdefs = [
                 cdef
                 for cdef in cdefs
-                if floor_secs(cdef.start) <= to_utc(report_datetime) <= ceil_secs(cdef.end)
+                if floor_secs(cdef.start) <= utc_report_datetime <= ceil_secs(cdef.end)
             ]
             if not cdefs:
-                date_string = formatted_date(report_datetime)
-                using_msg = "Using " + " and ".join(errror_messages)
+                using = list(errror_messages)
+                registered = list(self.registry.values())
                 raise ConsentDefinitionDoesNotExist(
-                    "Date does not fall within the validity period of any consent definition. "
-                    f"Got {date_string}. {using_msg}. Consent definitions are: "
-                    f"{self.get_registry_display()}."
+                    lazy_message(
+                        lambda: (
+                            "Date does not fall within the validity period of any consent "
+                            f"definition. Got {formatted_date(report_datetime)}. "
+                            f"{self.get_using_display(using)}. Consent definitions are: "
+                            f"{self.get_registry_display(registered)}."
+                        )
+                    )
                 )
             else:
-                date_string = formatted_date(report_datetime)
-                errror_messages.append(f"report_datetime={date_string}")
+                errror_messages.append(("report_datetime", report_datetime))
         return cdefs, errror_messages
 
     def _filter_cdefs_by_version_or_raise(
         self,
         version: str | None,
         consent_definitions: list[ConsentDefinition],
-        errror_messages: list[str] = None,
-    ) -> tuple[list[ConsentDefinition], list[str]]:
+        errror_messages: list[str | tuple[str, Any]] = None,
+    ) -> tuple[list[ConsentDefinition], list[str | tuple[str, Any]]]:
         cdefs = consent_definitions
         if version:
             cdefs = [cdef for cdef in cdefs if cdef.version == version]
             if not cdefs:
-                using_msg = "Using " + " and ".join(errror_messages)
-                errror_messages.append(f"version={version}")
+                using = list(errror_messages)
+                registered = list(self.registry.values())
                 raise ConsentDefinitionDoesNotExist(
-                    f"There are no consent definitions for this version. "
-                    f"Got {version}. {using_msg}. "
-                    f"Consent definitions are: {self.get_registry_display()}."
+                    lazy_message(
+                        lambda: (
+                            f"There are no consent definitions for this version. "
+                            f"Got {version}. {self.get_using_display(using)}. "
+                            "Consent definitions are: "
+                            f"{self.get_registry_display(registered)}."
+                        )
+                    )
                 )
         return cdefs, errror_messages
 
@@ -354,7 +670,7 @@ class SiteConsents:
         self,
         site: SingleSite | None,
         consent_definitions: list[ConsentDefinition],
-        errror_messages: list[str] = None,
+        errror_messages: list[str | tuple[str, Any]] = None,
     ) -> list[ConsentDefinition]:
         cdefs = consent_definitions
         if site:
@@ -364,24 +680,199 @@ class SiteConsents:
                 if site.site_id in [s.site_id for s in cdef.sites]:
                     cdefs.append(cdef)
             if not cdefs:
-                using_msg = "Using " + " and ".join(errror_messages)
+                using = list(errror_messages or [])
+                registered = list(self.registry.values())
                 raise ConsentDefinitionDoesNotExist(
-                    f"There are no consent definitions for this site. "
-                    f"Got {site}. {using_msg}."
-                    f"Consent definitions are: {self.get_registry_display()}."
+                    lazy_message(
+                        lambda: (
+                            f"There are no consent definitions for this site. "
+                            f"Got {site}. {self.get_using_display(using)}."
+                            "Consent definitions are: "
+                            f"{self.get_registry_display(registered)}."
+                        )
+                    )
                 )
         return cdefs
 
     def versions(self):
         return [cdef.version for cdef in self.registry.values()]
 
+    def export_snapshot(
+        self, path: str | Path | None = None, module_name: str | None = None
+    ) -> dict[str, Any]:
+        """Returns the registry as snapshot data and, if `path` is
+        given, writes it as JSON.
+
+        Sites are resolved to site ids (see `ConsentDefinition.sites`)
+        so the snapshot can be read without edc_sites, see
+        `edc_consent.snapshot`. The hashes of the `consents` modules
+        are included, see `get_consents_sources` and `autodiscover`.
+        """
+        cdefs = [
+            self.get_snapshot_item(cdef)
+            for cdef in sorted(self.registry.values(), key=lambda x: x.sort_key)
+        ]
+        data = dict(
+            format=SNAPSHOT_FORMAT,
+            version=SNAPSHOT_VERSION,
+            created=get_utcnow().isoformat(),
+            sources=self.get_consents_sources(module_name),
+            cdefs=cdefs,
+        )
+        if path:
+            write_snapshot(data, path)
+        return data
+
+    @staticmethod
+    def get_consents_sources(module_name: str | None = None) -> dict[str, str]:
+        """Returns the sha256 of the source of the `consents` module
+        of each INSTALLED_APP, by module name.
+
+        Modules are found, not imported.
+        """
+        module_name = module_name or "consents"
+        sources = {}
+        for app in django_apps.app_configs:
+            try:
+                spec = find_spec(f"{app}.{module_name}")
+            except (ImportError, ValueError):
+                spec = None
+            if spec and spec.origin and Path(spec.origin).is_file():
+                sources[spec.name] = hashlib.sha256(Path(spec.origin).read_bytes()).hexdigest()
+        return sources
+
+    @staticmethod
+    def get_snapshot_item(cdef: ConsentDefinition) -> dict[str, Any]:
+        """Returns a consent definition as a snapshot item, see
+        `export_snapshot`.
+        """
+        extension = cdef.extended_by
+        return dict(
+            name=cdef.name,
+            model=cdef.proxy_model,
+            version=cdef.version,
+            start=cdef.start.isoformat(),
+            end=cdef.end.isoformat(),
+            updates=getattr(cdef.updates, "name", None),
+            updated_by=getattr(cdef.updated_by, "name", None),
+            extends=getattr(cdef.extends, "name", None),
+            screening_model=list(cdef.screening_model),
+            age_min=cdef.age_min,
+            age_max=cdef.age_max,
+            age_is_adult=cdef.age_is_adult,
+            gender=list(cdef.gender),
+            site_ids=list(cdef.site_ids),
+            country=cdef.country,
+            validate_duration_overlap_by_model=cdef.validate_duration_overlap_by_model,
+            subject_type=cdef.subject_type,
+            timepoints=sorted(cdef.timepoints),
+            resolved_site_ids=sorted(s.site_id for s in cdef.sites),
+            extended_by=(
+                None
+                if not extension
+                else dict(
+                    name=extension.name,
+                    model=extension.model,
+                    version=extension.version,
+                    start=extension.start.isoformat(),
+                    timepoints=sorted(extension.timepoints),
+                    site_ids=list(extension.site_ids),
+                    country=extension.country,
+                )
+            ),
+        )
+
+    def load_snapshot(self, path: str | Path | None = None, data: dict | None = None) -> None:
+        """Replaces the registry with the consent definitions in a
+        snapshot file or snapshot data.
+
+        Definitions were validated when exported and are not
+        validated again here. A `consents` module imported later may
+        still register the same definitions; `register` accepts
+        each one if identical to the loaded definition and raises
+        SnapshotError if not.
+        """
+        from .consent_definition import ConsentDefinition
+        from .consent_definition_extension import ConsentDefinitionExtension
+
+        data = data or read_snapshot(path)
+        items = {item["name"]: item for item in data["cdefs"]}
+        cdefs: dict[str, ConsentDefinition] = {}
+
+        def build(name: str) -> ConsentDefinition | None:
+            if name and name not in cdefs:
+                item = items[name]
+                cdefs[name] = ConsentDefinition(
+                    item["model"],
+                    start=datetime.fromisoformat(item["start"]),
+                    end=datetime.fromisoformat(item["end"]),
+                    version=item["version"],
+                    updates=build(item["updates"]),
+                    extends=build(item["extends"]),
+                    screening_model=item["screening_model"],
+                    age_min=item["age_min"],
+                    age_max=item["age_max"],
+                    age_is_adult=item["age_is_adult"],
+                    gender=item["gender"],
+                    site_ids=item["site_ids"],
+                    country=item["country"],
+                    validate_duration_overlap_by_model=item[
+                        "validate_duration_overlap_by_model"
+                    ],
+                    subject_type=item["subject_type"],
+                    timepoints=item["timepoints"],
+                )
+            return cdefs.get(name)
+
+        for name in items:
+            build(name)
+        for name, item in items.items():
+            extension = item["extended_by"]
+            cdefs[name].link(
+                updated_by=cdefs.get(item["updated_by"]),
+                extended_by=(
+                    None
+                    if not extension
+                    else ConsentDefinitionExtension(
+                        extension["model"],
+                        start=datetime.fromisoformat(extension["start"]),
+                        version=extension["version"],
+                        extends=cdefs[name],
+                        timepoints=extension["timepoints"],
+                        site_ids=extension["site_ids"],
+                        country=extension["country"],
+                    )
+                ),
+            )
+        self.registry = cdefs
+        self.snapshot_cdefs = dict(cdefs)
+        self.loaded = True
+
     def autodiscover(self, module_name=None, verbose=True):
         """Autodiscovers consent classes in the consents.py file of
         any INSTALLED_APP.
+
+        If settings.EDC_CONSENT_SNAPSHOT is the path of an existing
+        snapshot, loads the registry from the snapshot. If the
+        `consents` modules are unchanged since the snapshot was
+        exported (see `get_consents_sources`), they are not imported.
+        Otherwise they are imported and each definition they register
+        must match the snapshot, see `load_snapshot` and
+        `validate_snapshot_or_raise`.
         """
         before_import_registry = None
         module_name = module_name or "consents"
         writer = sys.stdout.write if verbose else lambda x: x
+        snapshot_path = getattr(settings, "EDC_CONSENT_SNAPSHOT", None)
+        if snapshot_path and Path(snapshot_path).exists():
+            data = read_snapshot(snapshot_path)
+            self.load_snapshot(data=data)
+            writer(f" * loaded consent definitions from snapshot '{snapshot_path}'\n")
+            if data.get("sources") == self.get_consents_sources(module_name):
+                return
+            writer(f" * {module_name} modules changed since the snapshot, validating ...\n")
+        else:
+            snapshot_path = None
         style = color_style()
         writer(f" * checking for site {module_name} ...\n")
         for app in django_apps.app_configs:
@@ -389,7 +880,7 @@ class SiteConsents:
             try:
                 mod = import_module(app)
                 try:
-                    before_import_registry = deepcopy(site_consents.registry)
+                    before_import_registry = dict(site_consents.registry)
                     import_module(f"{app}.{module_name}")
                     writer(f" * registered consent definitions '{module_name}' from '{app}'\n")
                 except SiteConsentError as e:
@@ -401,6 +892,8 @@ class SiteConsents:
                         raise SiteConsentError(str(e))
             except ImportError:
                 pass
+        if snapshot_path:
+            self.validate_snapshot_or_raise()
         for cdef in self.registry.values():
             start = cdef.start.strftime("%Y-%m-%d %Z")
             end = cdef.end.strftime("%Y-%m-%d %Z")
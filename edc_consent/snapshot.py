@@ -0,0 +1,230 @@
+"""Read, write and query a snapshot of the consent definition registry.
+
+A snapshot is a compact, versioned JSON file written by
+`site_consents.export_snapshot()`. This module uses only the standard
+library. `ConsentSnapshot` resolves the consent version for a site
+and datetime without Django settings or the ORM, for example from a
+reporting or ETL service:
+
+    snapshot = ConsentSnapshot.load("consents.json")
+    snapshot.resolve(site_id=10, report_datetime=dt).version
+
+`site_consents.load_snapshot()` rebuilds the registry from the same
+file, see also settings.EDC_CONSENT_SNAPSHOT.
+"""
+
+from __future__ import annotations
+
+import json
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterable
+
+__all__ = [
+    "SNAPSHOT_FORMAT",
+    "SNAPSHOT_VERSION",
+    "ConsentSnapshot",
+    "SnapshotEntry",
+    "SnapshotError",
+    "SnapshotLookupError",
+    "read_snapshot",
+    "write_snapshot",
+]
+
+SNAPSHOT_FORMAT = "edc_consent.snapshot"
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class SnapshotLookupError(LookupError):
+    pass
+
+
+def write_snapshot(data: dict[str, Any], path: str | Path) -> None:
+    with Path(path).open("w") as f:
+        json.dump(data, f, separators=(",", ":"), sort_keys=True)
+
+
+def read_snapshot(path: str | Path) -> dict[str, Any]:
+    """Returns the snapshot data or raises if the file is not a
+    snapshot of a supported version.
+    """
+    with Path(path).open() as f:
+        data = json.load(f)
+    if data.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"Not a consent registry snapshot. See {path}.")
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot version. Expected {SNAPSHOT_VERSION}. "
+            f"Got {data.get('version')}. See {path}."
+        )
+    return data
+
+
+@dataclass(frozen=True, slots=True)
+class SnapshotEntry:
+    """A consent definition as read from a snapshot."""
+
+    name: str
+    model: str
+    version: str
+    start: datetime
+    end: datetime
+    site_ids: frozenset[int]
+    updates: str | None
+    updated_by: str | None
+    extended_by: str | None
+    extension_version: str | None
+    extension_start: datetime | None
+    timepoints: frozenset[int]
+
+
+class ConsentSnapshot:
+    """Resolves consent definitions from snapshot data.
+
+    Like `site_consents.get_consent_definition`, a datetime matches
+    if within start and end (to the second). If more than one
+    matches, the one that updates another is returned.
+    """
+
+    def __init__(self, data: dict[str, Any]):
+        self.created: str = data.get("created")
+        self.entries: dict[str, SnapshotEntry] = {}
+        for item in data["cdefs"]:
+            extension = item.get("extended_by") or {}
+            self.entries[item["name"]] = SnapshotEntry(
+                name=item["name"],
+                model=item["model"],
+                version=item["version"],
+                start=datetime.fromisoformat(item["start"]).replace(microsecond=0),
+                end=datetime.fromisoformat(item["end"]).replace(microsecond=999999),
+                site_ids=frozenset(item["resolved_site_ids"]),
+                updates=item.get("updates"),
+                updated_by=item.get("updated_by"),
+                extended_by=extension.get("name"),
+                extension_version=extension.get("version"),
+                extension_start=(
+                    datetime.fromisoformat(extension["start"]) if extension else None
+                ),
+                timepoints=frozenset(extension.get("timepoints") or ()),
+            )
+        # entries by site_id, sorted by start
+        self._by_site: dict[int, list[SnapshotEntry]] = {}
+        for entry in sorted(self.entries.values(), key=lambda x: (x.start, x.name)):
+            for site_id in entry.site_ids:
+                self._by_site.setdefault(site_id, []).append(entry)
+        self._starts: dict[int, list[datetime]] = {
+            site_id: [entry.start for entry in entries]
+            for site_id, entries in self._by_site.items()
+        }
+        self._intervals: dict[int, tuple[list[datetime], list[SnapshotEntry | None]]] = {}
+
+    @classmethod
+    def load(cls, path: str | Path) -> ConsentSnapshot:
+        return cls(read_snapshot(path))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, name: str) -> SnapshotEntry | None:
+        return self.entries.get(name)
+
+    def candidates(self, site_id: int, report_datetime: datetime) -> list[SnapshotEntry]:
+        """Returns entries valid for the site and datetime, sorted by
+        version.
+        """
+        report_datetime = self.to_utc(report_datetime)
+        entries = self._by_site.get(site_id, [])
+        index = bisect_right(self._starts.get(site_id, []), report_datetime)
+        return sorted(
+            [entry for entry in entries[:index] if report_datetime <= entry.end],
+            key=lambda x: x.version,
+        )
+
+    def resolve(self, site_id: int, report_datetime: datetime) -> SnapshotEntry:
+        """Returns the entry for the site and datetime or raises
+        SnapshotLookupError.
+        """
+        entries = self.candidates(site_id, report_datetime)
+        if not entries:
+            raise SnapshotLookupError(
+                f"No consent definition for site {site_id} on {report_datetime}."
+            )
+        if len(entries) == 1:
+            return entries[0]
+        for entry, next_entry in zip(entries, entries[1:]):
+            if next_entry.updates == entry.name:
+                return next_entry
+        raise SnapshotLookupError(
+            f"Multiple consent definitions for site {site_id} on {report_datetime}. "
+            f"Got {', '.join(entry.name for entry in entries)}."
+        )
+
+    def intervals(self, site_id: int) -> tuple[list[datetime], list[SnapshotEntry | None]]:
+        """Returns the datetimes at which the resolved entry for the
+        site may change and the entry resolved from each, or None if
+        there is no entry or more than one.
+
+        Entries are valid to the end of their end second, so an
+        interval also starts one microsecond after each end.
+        """
+        if site_id not in self._intervals:
+            bounds = sorted(
+                {entry.start for entry in self._by_site.get(site_id, [])}
+                | {
+                    entry.end + timedelta(microseconds=1)
+                    for entry in self._by_site.get(site_id, [])
+                }
+            )
+            values = []
+            for bound in bounds:
+                try:
+                    values.append(self.resolve(site_id, bound))
+                except SnapshotLookupError:
+                    values.append(None)
+            self._intervals[site_id] = (bounds, values)
+        return self._intervals[site_id]
+
+    def resolve_many(
+        self, site_id: int, report_datetimes: Iterable[datetime]
+    ) -> list[SnapshotEntry | None]:
+        """Returns the entry for each datetime, or None where
+        `resolve` would raise.
+
+        Each datetime is assigned to an interval with one bisect, see
+        `intervals`, instead of filtering the entries again.
+        """
+        bounds, values = self.intervals(site_id)
+        entries = []
+        for report_datetime in report_datetimes:
+            index = bisect_right(bounds, self.to_utc(report_datetime))
+            entries.append(values[index - 1] if index else None)
+        return entries
+
+    def resolve_version(
+        self, site_id: int, report_datetime: datetime, extended: bool | None = None
+    ) -> str:
+        """Returns the consent version for the site and datetime.
+
+        If `extended`, returns the extension's version where the
+        consent definition is extended on or before the datetime.
+        """
+        entry = self.resolve(site_id, report_datetime)
+        if (
+            extended
+            and entry.extended_by
+            and entry.extension_start <= self.to_utc(report_datetime)
+        ):
+            return entry.extension_version
+        return entry.version
+
+    @staticmethod
+    def to_utc(report_datetime: datetime) -> datetime:
+        if report_datetime.tzinfo is None:
+            raise ValueError(f"Naive datetime not allowed. Got {report_datetime}.")
+        return report_datetime.astimezone(timezone.utc)
@@ -0,0 +1,134 @@
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.http.request import HttpRequest
+from django.test import override_settings
+from django.urls import reverse
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+from model_bakery.recipe import seq
+
+from consent_app.admin_site import consent_app_admin
+from consent_app.models import SubjectConsent, SubjectConsentV1
+from edc_consent.actions import (
+    flag_as_verified_against_paper,
+    unflag_as_verified_against_paper,
+)
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+from .benchmark_test_case import BenchmarkTestCase
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class BenchAdminActions(BenchmarkTestCase):
+    rounds = 5
+
+    def setUp(self):
+        super().setUp()
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        site_consents.register(
+            consent_definition_factory(
+                start=self.study_open_datetime,
+                end=ResearchProtocolConfig().study_close_datetime,
+            )
+        )
+        self.request = HttpRequest()
+        self.request.user = User.objects.create(username="erikvw")
+        self.request.session = "session"
+        self.request._messages = FallbackStorage(self.request)
+
+    @staticmethod
+    def set_verified() -> tuple:
+        SubjectConsentV1.objects.update(is_verified=True)
+        return ()
+
+    @staticmethod
+    def set_unverified() -> tuple:
+        SubjectConsentV1.objects.update(is_verified=False)
+        return ()
+
+    def test_verify_actions(self):
+        made = 0
+        for size in [10, 100]:
+            baker.make_recipe(
+                "consent_app.subjectconsentv1",
+                consent_datetime=self.study_open_datetime + relativedelta(days=1),
+                first_name=seq(f"NAME{size}X"),
+                _quantity=size - made,
+            )
+            made = size
+            self.benchmark(
+                "flag_as_verified_against_paper",
+                lambda: flag_as_verified_against_paper(
+                    None, self.request, SubjectConsentV1.objects.all()
+                ),
+                setup=self.set_unverified,
+                consents=size,
+            )
+            self.benchmark(
+                "unflag_as_verified_against_paper",
+                lambda: unflag_as_verified_against_paper(
+                    None, self.request, SubjectConsentV1.objects.all()
+                ),
+                setup=self.set_verified,
+                consents=size,
+            )
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+    ROOT_URLCONF="edc_consent.tests.urls",
+)
+class BenchAdminChangelist(BenchmarkTestCase):
+    rounds = 5
+
+    def setUp(self):
+        super().setUp()
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        site_consents.register(
+            consent_definition_factory(
+                start=self.study_open_datetime,
+                end=ResearchProtocolConfig().study_close_datetime,
+            )
+        )
+        self.client.force_login(User.objects.create_superuser(username="erikvw"))
+        self.model_admin = consent_app_admin._registry[SubjectConsent]
+
+    def tearDown(self):
+        self.model_admin.changelist_defer_encrypted_fields = True
+        super().tearDown()
+
+    def test_changelist(self):
+        """Times a GET of the consent changelist, with and without
+        deferring the encrypted fields not displayed.
+        """
+        url = reverse("consent_app_admin:consent_app_subjectconsent_changelist")
+        made = 0
+        for size in [10, 100]:
+            baker.make_recipe(
+                "consent_app.subjectconsentv1",
+                consent_datetime=self.study_open_datetime + relativedelta(days=1),
+                first_name=seq(f"NAME{size}X"),
+                _quantity=size - made,
+            )
+            made = size
+            for defer in [True, False]:
+                self.model_admin.changelist_defer_encrypted_fields = defer
+                self.benchmark(
+                    "changelist",
+                    lambda: self.client.get(url),
+                    consents=size,
+                    defer_encrypted_fields=defer,
+                )
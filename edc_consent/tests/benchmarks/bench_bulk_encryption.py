@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.test import override_settings
+from django_crypto_fields.utils import get_crypt_model_cls
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import SubjectConsentV1
+from edc_consent.bulk_encryption import BulkEncryptor
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+from .benchmark_test_case import BenchmarkTestCase
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class BenchBulkEncryption(BenchmarkTestCase):
+    """Compares BulkEncryptor in this thread (workers=1) to the
+    thread pool.
+
+    Each round encrypts values not yet in the Crypt table, so both
+    the hashing and the encryption of the secrets are timed.
+    """
+
+    rounds = 5
+
+    def setUp(self):
+        super().setUp()
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        site_consents.register(self.cdef)
+
+    def prepare(self, count: int):
+        get_crypt_model_cls().objects.all().delete()
+        return (
+            [
+                baker.prepare_recipe(
+                    self.cdef.model,
+                    first_name=f"FIRST{index:05d}",
+                    last_name=f"LAST{index:05d}",
+                    identity=f"{index:09d}",
+                    confirm_identity=f"{index:09d}",
+                    dob=self.study_open_datetime.date() - relativedelta(years=25),
+                )
+                for index in range(count)
+            ],
+        )
+
+    def test_encrypt(self):
+        for count in [100, 1000]:
+            for workers in [1, 4]:
+                encryptor = BulkEncryptor(SubjectConsentV1, workers=workers)
+                self.benchmark(
+                    "BulkEncryptor.encrypt",
+                    encryptor.encrypt,
+                    setup=lambda: self.prepare(count),
+                    objs=count,
+                    workers=workers,
+                )
@@ -0,0 +1,87 @@
+from itertools import count
+
+from dateutil.relativedelta import relativedelta
+from django import forms
+from django.forms import model_to_dict
+from django.test import override_settings
+from edc_constants.constants import FEMALE
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import SubjectConsentV1, SubjectScreening
+from edc_consent.modelform_mixins import ConsentModelFormMixin
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+from .benchmark_test_case import BenchmarkTestCase
+
+
+class SubjectConsentForm(ConsentModelFormMixin, forms.ModelForm):
+    screening_identifier = forms.CharField(
+        label="Screening identifier",
+        widget=forms.TextInput(attrs={"readonly": "readonly"}),
+    )
+
+    class Meta:
+        model = SubjectConsentV1
+        fields = "__all__"
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class BenchForms(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        site_consents.register(
+            consent_definition_factory(
+                model="consent_app.subjectconsentv1",
+                start=self.study_open_datetime,
+                end=ResearchProtocolConfig().study_close_datetime,
+                version="1.0",
+            )
+        )
+        self.counter = count()
+
+    def get_form(self) -> tuple[SubjectConsentForm]:
+        screening_identifier = f"SCR{next(self.counter):06d}"
+        consent_datetime = self.study_open_datetime + relativedelta(days=1)
+        SubjectScreening.objects.create(
+            age_in_years=25,
+            initials="ET",
+            gender=FEMALE,
+            screening_identifier=screening_identifier,
+            report_datetime=consent_datetime,
+            eligible=True,
+            eligibility_datetime=consent_datetime,
+        )
+        subject_consent = baker.prepare_recipe(
+            "consent_app.subjectconsentv1",
+            dob=consent_datetime.date() - relativedelta(years=25),
+            consent_datetime=consent_datetime,
+            first_name="ERIK",
+            last_name="THEPLEEB",
+            initials="ET",
+            gender=FEMALE,
+            screening_identifier=screening_identifier,
+        )
+        opts = SubjectConsentForm._meta
+        data = model_to_dict(subject_consent, opts.fields, opts.exclude)
+        return (
+            SubjectConsentForm(
+                data=data,
+                initial=dict(screening_identifier=screening_identifier),
+                instance=opts.model(site=subject_consent.site),
+            ),
+        )
+
+    def test_consent_modelform_clean(self):
+        self.benchmark(
+            "ConsentModelFormMixin.clean", lambda form: form.is_valid(), setup=self.get_form
+        )
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from itertools import count
+
+from dateutil.relativedelta import relativedelta
+from django.test import override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_registration.models import RegisteredSubject
+from edc_utils import get_utcnow
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from model_bakery import baker
+
+from consent_app.models import CrfOne, SubjectVisit, TestModel
+from consent_app.visit_schedules import get_visit_schedule
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+from .benchmark_test_case import BenchmarkTestCase
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class BenchModels(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+        )
+        site_consents.register(self.cdef1)
+        site_consents.register(self.cdef2)
+        self.dob = self.study_open_datetime - relativedelta(years=25)
+        self.counter = count()
+
+    def make_consent_v1(self) -> str:
+        subject_identifier = f"S{next(self.counter):06d}"
+        baker.make_recipe(
+            self.cdef1.model,
+            subject_identifier=subject_identifier,
+            consent_datetime=self.study_open_datetime + timedelta(days=1),
+            dob=self.dob,
+        )
+        return subject_identifier
+
+    def test_save_consent(self):
+        def setup():
+            return (
+                baker.prepare_recipe(
+                    self.cdef1.model,
+                    subject_identifier=f"S{next(self.counter):06d}",
+                    consent_datetime=self.study_open_datetime + timedelta(days=1),
+                    dob=self.dob,
+                ),
+            )
+
+        self.benchmark("ConsentVersionModelMixin.save", lambda obj: obj.save(), setup=setup)
+
+    def test_save_reconsent(self):
+        def setup():
+            subject_identifier = self.make_consent_v1()
+            return (
+                baker.prepare_recipe(
+                    self.cdef2.model,
+                    subject_identifier=subject_identifier,
+                    consent_datetime=self.study_open_datetime + timedelta(days=60),
+                    dob=self.dob,
+                ),
+            )
+
+        self.benchmark(
+            "ConsentVersionModelMixin.save",
+            lambda obj: obj.save(),
+            setup=setup,
+            reconsent=True,
+        )
+
+    def test_requires_consent_on_pre_save_crf(self):
+        site_visit_schedules._registry = {}
+        visit_schedule = get_visit_schedule([self.cdef1, self.cdef2])
+        site_visit_schedules.register(visit_schedule)
+        subject_identifier = self.make_consent_v1()
+        RegisteredSubject.objects.get_or_create(subject_identifier=subject_identifier)
+        subject_visit = SubjectVisit.objects.create(
+            report_datetime=self.study_open_datetime + timedelta(days=1),
+            subject_identifier=subject_identifier,
+            visit_schedule_name=visit_schedule.name,
+            schedule_name="schedule1",
+        )
+        self.benchmark(
+            "requires_consent_on_pre_save",
+            lambda: CrfOne.objects.create(
+                subject_visit=subject_visit,
+                subject_identifier=subject_identifier,
+                report_datetime=self.study_open_datetime + timedelta(days=2),
+            ),
+            model="consent_app.crfone",
+        )
+
+    def test_requires_consent_on_pre_save_prn(self):
+        subject_identifier = self.make_consent_v1()
+        self.benchmark(
+            "requires_consent_on_pre_save",
+            lambda: TestModel.objects.create(
+                subject_identifier=subject_identifier,
+                report_datetime=self.study_open_datetime + timedelta(days=2),
+            ),
+            model="consent_app.testmodel",
+        )
@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.test import override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.site import sites as site_sites
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+from .benchmark_test_case import BenchmarkTestCase
+from .utils import midpoint, register_cdefs, registered_sites
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class BenchSiteConsents(BenchmarkTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sites = self.enterContext(registered_sites(20))
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+
+    def test_get_consent_definition(self):
+        for count in [10, 100, 1000]:
+            cdefs = register_cdefs(count, site_ids=[s.site_id for s in self.sites])
+            cdef = cdefs[-1]
+            single_site = site_sites.get(cdef.site_ids[0])
+            self.benchmark(
+                "site_consents.get_consent_definition",
+                lambda: site_consents.get_consent_definition(
+                    report_datetime=midpoint(cdef), site=single_site
+                ),
+                cdefs=count,
+                sites=len(self.sites),
+            )
+
+    def test_get_consent_or_raise(self):
+        site_consents.registry = {}
+        cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+        )
+        site_consents.register(cdef1)
+        site_consents.register(cdef2)
+        baker.make_recipe(
+            cdef2.model,
+            subject_identifier="12345",
+            consent_datetime=midpoint(cdef2),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+        self.benchmark(
+            "site_consents.get_consent_or_raise",
+            lambda: site_consents.get_consent_or_raise(
+                subject_identifier="12345",
+                report_datetime=midpoint(cdef2),
+                site_id=settings.SITE_ID,
+            ),
+            cdefs=2,
+        )
@@ -0,0 +1,27 @@
+from dateutil.relativedelta import relativedelta
+from django.test import override_settings
+from edc_utils import get_utcnow
+
+from edc_consent.system_checks import check_consents
+
+from .benchmark_test_case import BenchmarkTestCase
+from .utils import register_cdefs, registered_sites
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class BenchSystemChecks(BenchmarkTestCase):
+    rounds = 5
+
+    def setUp(self):
+        super().setUp()
+        self.sites = self.enterContext(registered_sites(10))
+
+    def test_check_consents(self):
+        for count in [10, 100]:
+            register_cdefs(count, site_ids=[s.site_id for s in self.sites])
+            self.benchmark("check_consents", lambda: check_consents(None), cdefs=count)
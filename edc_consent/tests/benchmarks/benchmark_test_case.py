@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import statistics
+from time import perf_counter
+from typing import Any, Callable
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+__all__ = ["BenchmarkTestCase", "benchmark_results"]
+
+# collected across all benchmark test cases in a run. Written to
+# JSON by `runbenchmarks.py`.
+benchmark_results: list[dict[str, Any]] = []
+
+
+class BenchmarkTestCase(TestCase):
+    """A TestCase that times a callable over a number of rounds.
+
+    Timings and the number of queries per round are appended to
+    `benchmark_results`.
+    """
+
+    rounds: int = 20
+
+    def benchmark(
+        self,
+        name: str,
+        func: Callable,
+        rounds: int | None = None,
+        setup: Callable[[], tuple] | None = None,
+        **params,
+    ) -> dict[str, Any]:
+        """Calls `func` `rounds` times and records the result.
+
+        If given, `setup` is called before each round, untimed, and
+        its return value passed to `func` as positional args.
+        """
+        timings: list[float] = []
+        queries: list[int] = []
+        for _ in range(rounds or self.rounds):
+            args = setup() if setup else ()
+            with CaptureQueriesContext(connection) as ctx:
+                start = perf_counter()
+                func(*args)
+                timings.append(perf_counter() - start)
+            queries.append(len(ctx.captured_queries))
+        result = dict(
+            name=name,
+            params=params,
+            rounds=len(timings),
+            min=min(timings),
+            max=max(timings),
+            mean=statistics.mean(timings),
+            median=statistics.median(timings),
+            stdev=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            queries=max(queries),
+        )
+        benchmark_results.append(result)
+        return result
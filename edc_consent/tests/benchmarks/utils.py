@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.single_site import SingleSite
+from edc_sites.site import sites as site_sites
+from edc_sites.utils import add_or_update_django_sites
+
+from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@contextmanager
+def registered_sites(count: int) -> Iterator[list[SingleSite]]:
+    """Registers `count` sites with edc_sites and django.contrib.sites
+    for the duration of the block.
+
+    The edc_sites registry is restored on exit. In a TestCase, use
+    `self.enterContext(registered_sites(count))`.
+    """
+    registry, loaded = site_sites._registry, site_sites.loaded
+    site_sites._registry = {}
+    site_sites.loaded = False
+    try:
+        site_sites.register(
+            *[
+                SingleSite(
+                    site_id,
+                    f"site_{site_id}",
+                    country="botswana",
+                    country_code="bw",
+                    domain=f"site-{site_id}.bw.clinicedc.org",
+                )
+                for site_id in range(1, count + 1)
+            ]
+        )
+        add_or_update_django_sites(verbose=False)
+        yield site_sites.all(aslist=True)
+    finally:
+        site_sites._registry, site_sites.loaded = registry, loaded
+
+
+def register_cdefs(
+    count: int, site_ids: list[int], model: str | None = None
+) -> list[ConsentDefinition]:
+    """Registers `count` consent definitions spread evenly across
+    `site_ids`.
+
+    Each site gets consecutive, non-overlapping validity periods
+    covering the study period.
+    """
+    site_consents.registry = {}
+    study_open = ResearchProtocolConfig().study_open_datetime
+    study_close = ResearchProtocolConfig().study_close_datetime
+    per_site = max(1, count // len(site_ids))
+    period = (study_close - study_open) / per_site
+    cdefs = []
+    for site_id in site_ids:
+        for index in range(per_site):
+            cdef = consent_definition_factory(
+                model=model or "consent_app.subjectconsentv1",
+                start=study_open + (period * index),
+                end=study_open + (period * (index + 1)) - (period / 1000),
+                version=f"{site_id}.{index}",
+                site_ids=[site_id],
+                validate_duration_overlap_by_model=False,
+            )
+            site_consents.register(cdef)
+            cdefs.append(cdef)
+    return cdefs
+
+
+def midpoint(cdef: ConsentDefinition) -> datetime:
+    return cdef.start + ((cdef.end - cdef.start) / 2)
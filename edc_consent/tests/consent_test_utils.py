@@ -1,10 +1,73 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from uuid import uuid4
 
+from dateutil.relativedelta import relativedelta
+from edc_constants.constants import OPEN
+from edc_data_manager.models import DataDictionary, DataQuery
 from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from model_bakery import baker
 
 from edc_consent.consent_definition import ConsentDefinition
+from edc_consent.consent_definition_extension import ConsentDefinitionExtension
+from edc_consent.site_consents import site_consents
+from edc_consent.view_mixins import ConsentViewMixin
+
+
+class ContextMixin:
+    def get_context_data(self, **kwargs):
+        return kwargs
+
+
+class DashboardView(ConsentViewMixin, ContextMixin):
+    """A minimal dashboard view for testing ConsentViewMixin."""
+
+    appointment = None
+
+    def __init__(self, request=None, subject_identifier=None, report_datetime=None, **kwargs):
+        self.request = request
+        self.subject_identifier = subject_identifier
+        self.report_datetime = report_datetime
+        self.current_schedule = kwargs.pop("current_schedule", None)
+        super().__init__(**kwargs)
+
+
+class ConsentExtensionFixtureMixin:
+    """A TestCase mixin that registers consent v1.0 with extension
+    v1.1 and creates five v1.0 consents, S000 to S004.
+    """
+
+    def setUp(self):
+        super().setUp()
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.extension = ConsentDefinitionExtension(
+            "consent_app.subjectconsentv1ext",
+            version="1.1",
+            start=self.study_open_datetime + timedelta(days=20),
+            extends=self.cdef1,
+            timepoints=[1, 2],
+        )
+        site_consents.register(self.cdef1, extended_by=self.extension)
+        self.consents = [
+            baker.make_recipe(
+                self.cdef1.model,
+                subject_identifier=f"S00{index}",
+                first_name=f"NAME{index}",
+                identity=f"12345678{index}",
+                confirm_identity=f"12345678{index}",
+                consent_datetime=self.study_open_datetime + timedelta(days=1),
+                dob=self.study_open_datetime - relativedelta(years=25 + index),
+            )
+            for index in range(5)
+        ]
 
 
 def consent_definition_factory(
@@ -51,3 +114,35 @@ def consent_factory(proxy_model=None, **kwargs):
     )
     consent_definition = ConsentDefinition(proxy_model, **options)
     return consent_definition
+
+
+def make_open_data_queries(subject_identifiers: list[str], model: str, user) -> None:
+    """Creates an open data query per subject for `model`.
+
+    Uses bulk_create to skip the action item and registered
+    subject handling of `DataQuery.save`.
+    """
+    data_dictionary, _ = DataDictionary.objects.get_or_create(
+        model=model, field_name="first_name", defaults=dict(number=1, prompt="prompt")
+    )
+    data_queries = DataQuery.objects.bulk_create(
+        [
+            DataQuery(
+                id=uuid4(),
+                action_identifier=uuid4().hex,
+                subject_identifier=subject_identifier,
+                sender_id=user.id,
+                query_text="query",
+                status=OPEN,
+            )
+            for subject_identifier in subject_identifiers
+        ]
+    )
+    DataQuery.data_dictionaries.through.objects.bulk_create(
+        [
+            DataQuery.data_dictionaries.through(
+                dataquery_id=data_query.id, datadictionary_id=data_dictionary.id
+            )
+            for data_query in data_queries
+        ]
+    )
@@ -1,20 +1,28 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.sites.models import Site
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from edc_constants.constants import FEMALE
 from edc_utils import get_utcnow, get_utcnow_as_date
 from model_bakery import baker
 
+from edc_consent.site_consents import site_consents
 from edc_consent.utils import get_consent_model_name
 
 if TYPE_CHECKING:
+    from django.forms import ModelForm
     from screening_app.models import SubjectScreening
 
+    from edc_consent.model_mixins import RequiresConsentFieldsModelMixin
+    from edc_consent.stubs import ConsentLikeModel
+    from edc_consent.view_mixins import ConsentViewMixin
+
 
 class ConsentTestCaseMixin:
     @staticmethod
@@ -58,3 +66,96 @@ class ConsentTestCaseMixin:
             site=Site.objects.get(id=site_id or settings.SITE_ID),
             consent_datetime=consent_datetime,
         )
+
+
+class ConsentQueryBudgetTestCaseMixin:
+    """A TestCase mixin to assert the maximum number of queries
+    for standard consent operations.
+
+    Defaults in `consent_query_budgets` are the query counts measured
+    for the package's own models in `consent_app`. Override per
+    project or pass `max_queries`.
+    """
+
+    consent_query_budgets: dict[str, int] = dict(
+        save_consent=39,
+        save_reconsent=38,
+        save_crf=4,
+        clean_consent_form=19,
+    )
+
+    def get_max_queries(self, name: str, max_queries: int | None = None) -> int:
+        """Returns `max_queries`, if not None, or the budget for
+        `name`.
+        """
+        if max_queries is None:
+            return self.consent_query_budgets[name]
+        return max_queries
+
+    def assertMaxQueries(self, max_queries: int, func: Callable, *args, **kwargs) -> Any:
+        """Calls func and asserts it issued no more than
+        `max_queries`. Returns the return value of func.
+        """
+        with CaptureQueriesContext(connection) as ctx:
+            value = func(*args, **kwargs)
+        executed = len(ctx.captured_queries)
+        if executed > max_queries:
+            queries = "\n".join(
+                f"{i}. {q['sql']}" for i, q in enumerate(ctx.captured_queries, start=1)
+            )
+            self.fail(
+                f"{executed} queries executed, expected at most {max_queries}.\n{queries}"
+            )
+        return value
+
+    def assertSaveConsentQueries(
+        self, consent_obj: ConsentLikeModel, max_queries: int | None = None
+    ) -> None:
+        """Asserts saving a new consent is within budget."""
+        self.assertMaxQueries(
+            self.get_max_queries("save_consent", max_queries), consent_obj.save
+        )
+
+    def assertSaveReconsentQueries(
+        self, consent_obj: ConsentLikeModel, max_queries: int | None = None
+    ) -> None:
+        """Asserts saving a new consent for a subject with a previous
+        consent is within budget.
+        """
+        self.assertMaxQueries(
+            self.get_max_queries("save_reconsent", max_queries), consent_obj.save
+        )
+
+    def assertSaveCrfQueries(
+        self, crf_obj: RequiresConsentFieldsModelMixin, max_queries: int | None = None
+    ) -> None:
+        """Asserts saving a CRF, including the requires_consent
+        pre_save signal, is within budget.
+        """
+        self.assertMaxQueries(self.get_max_queries("save_crf", max_queries), crf_obj.save)
+
+    def assertCleanConsentFormQueries(
+        self, form: ModelForm, max_queries: int | None = None
+    ) -> bool:
+        """Asserts validating a consent form is within budget.
+
+        Returns form.is_valid().
+        """
+        return self.assertMaxQueries(
+            self.get_max_queries("clean_consent_form", max_queries), form.is_valid
+        )
+
+    def assertConsentViewQueries(
+        self, view: ConsentViewMixin, max_queries: int | None = None
+    ) -> None:
+        """Asserts resolving the consent context of a dashboard view
+        is within budget.
+
+        The default budget is one query per registered consent
+        definition (`consents`) plus the current consent and the
+        consent extension.
+        """
+        self.assertMaxQueries(
+            len(site_consents.registry) + 2 if max_queries is None else max_queries,
+            view.prefetch_consent_context,
+        )
@@ -70,6 +70,11 @@ project_settings = DefaultTestSettings(
     add_dashboard_middleware=True,
 ).settings
 
+# a stand-in for a read replica, see edc_consent.routers
+project_settings["DATABASES"]["replica"] = {
+    **project_settings["DATABASES"]["default"],
+    "TEST": {"MIRROR": "default"},
+}
 
 for k, v in project_settings.items():
     setattr(sys.modules[__name__], k, v)
@@ -1,8 +1,11 @@
 import string
 from secrets import choice
+from unittest.mock import patch
 
 from dateutil.relativedelta import relativedelta
 from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.fallback import FallbackStorage
 from django.http.request import HttpRequest
 from django.test import TestCase, override_settings
 from edc_protocol.research_protocol_config import ResearchProtocolConfig
@@ -11,10 +14,15 @@ from faker import Faker
 from model_bakery import baker
 
 from consent_app.models import SubjectConsentV1
-from edc_consent.actions import unverify_consent, verify_consent
+from edc_consent.actions import (
+    flag_as_verified_against_paper,
+    unflag_as_verified_against_paper,
+    unverify_consent,
+    verify_consent,
+)
 from edc_consent.site_consents import site_consents
 
-from ..consent_test_utils import consent_definition_factory
+from ..consent_test_utils import consent_definition_factory, make_open_data_queries
 
 fake = Faker()
 
@@ -63,3 +71,52 @@ class TestActions(TestCase):
             self.assertFalse(consent_obj.is_verified)
             self.assertIsNone(consent_obj.verified_by)
             self.assertIsNone(consent_obj.is_verified_datetime)
+
+    def test_flag_as_verified_against_paper(self):
+        self.request.session = "session"
+        self.request._messages = FallbackStorage(self.request)
+        flag_as_verified_against_paper(None, self.request, SubjectConsentV1.objects.all())
+        for consent_obj in SubjectConsentV1.objects.all():
+            self.assertTrue(consent_obj.is_verified)
+            self.assertEqual(consent_obj.verified_by, "erikvw")
+            self.assertIsNotNone(consent_obj.is_verified_datetime)
+        self.assertEqual(len(list(get_messages(self.request))), 1)
+        self.assertEqual(
+            SubjectConsentV1.history.filter(verified_by="erikvw").count(),
+            SubjectConsentV1.objects.all().count(),
+        )
+
+    def test_unflag_as_verified_against_paper(self):
+        self.request.session = "session"
+        self.request._messages = FallbackStorage(self.request)
+        flag_as_verified_against_paper(None, self.request, SubjectConsentV1.objects.all())
+        unflag_as_verified_against_paper(None, self.request, SubjectConsentV1.objects.all())
+        for consent_obj in SubjectConsentV1.objects.all():
+            self.assertFalse(consent_obj.is_verified)
+            self.assertIsNone(consent_obj.verified_by)
+            self.assertIsNone(consent_obj.is_verified_datetime)
+        self.assertEqual(len(list(get_messages(self.request))), 2)
+
+    def test_flag_as_verified_skips_open_data_queries(self):
+        self.request.session = "session"
+        self.request._messages = FallbackStorage(self.request)
+        subject_identifiers = sorted(
+            SubjectConsentV1.objects.values_list("subject_identifier", flat=True)
+        )
+        make_open_data_queries(
+            subject_identifiers[:2], "consent_app.subjectconsentv1", self.request.user
+        )
+        with patch("edc_consent.actions.MAX_SUBJECTS_IN_MESSAGE", 1):
+            flag_as_verified_against_paper(None, self.request, SubjectConsentV1.objects.all())
+        self.assertEqual(
+            list(
+                SubjectConsentV1.objects.filter(is_verified=True).values_list(
+                    "subject_identifier", flat=True
+                )
+            ),
+            subject_identifiers[2:],
+        )
+        message = str(list(get_messages(self.request))[0])
+        self.assertIn("Skipped 2 with open data queries.", message)
+        self.assertIn(f"See {subject_identifiers[0]} and 1 more.", message)
+        self.assertNotIn(subject_identifiers[1], message)
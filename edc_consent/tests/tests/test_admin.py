@@ -0,0 +1,214 @@
+from uuid import uuid4
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.admin_site import consent_app_admin
+from consent_app.models import SubjectConsent, SubjectVisit
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory, make_open_data_queries
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+    ROOT_URLCONF="edc_consent.tests.urls",
+)
+class TestConsentModelAdmin(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        site_consents.register(
+            consent_definition_factory(
+                start=self.study_open_datetime,
+                end=ResearchProtocolConfig().study_close_datetime,
+            )
+        )
+        self.user = User.objects.create_superuser(username="erikvw")
+        self.model_admin = consent_app_admin._registry[SubjectConsent]
+        self.consents = [
+            baker.make_recipe(
+                "consent_app.subjectconsentv1",
+                subject_identifier=f"S00{index}",
+                first_name=f"NAME{index}",
+                identity=f"12345678{index}",
+                confirm_identity=f"12345678{index}",
+                consent_datetime=self.study_open_datetime + relativedelta(days=1),
+            )
+            for index in range(5)
+        ]
+
+    def get_changelist_request(self):
+        request = RequestFactory().get(
+            reverse("consent_app_admin:consent_app_subjectconsent_changelist")
+        )
+        request.user = self.user
+        request.resolver_match = resolve(request.path)
+        return request
+
+    def test_prefetch_open_data_queries(self):
+        make_open_data_queries(["S000", "S001"], "consent_app.subjectconsent", self.user)
+        make_open_data_queries(["S001"], "consent_app.subjectconsent", self.user)
+        objs = list(SubjectConsent.objects.order_by("subject_identifier"))
+        with self.assertNumQueries(1):
+            self.model_admin.prefetch_open_data_queries(objs)
+        self.assertEqual([len(obj.open_data_query_links) for obj in objs], [1, 2, 0, 0, 0])
+        with self.assertNumQueries(0):
+            for obj in objs:
+                self.model_admin.queries(obj)
+        self.assertIn("Add query", self.model_admin.queries(objs[0]))
+        self.assertIn("go to query", self.model_admin.queries(objs[0]))
+        self.assertNotIn("go to query", self.model_admin.queries(objs[2]))
+
+    def test_prefetch_open_data_queries_ignores_other_models(self):
+        make_open_data_queries(["S000"], "consent_app.crfone", self.user)
+        objs = list(SubjectConsent.objects.order_by("subject_identifier"))
+        self.model_admin.prefetch_open_data_queries(objs)
+        self.assertEqual(objs[0].open_data_query_links, [])
+
+    def test_prefetch_open_data_queries_skips_verified(self):
+        make_open_data_queries(["S000"], "consent_app.subjectconsent", self.user)
+        SubjectConsent.objects.filter(subject_identifier="S000").update(is_verified=True)
+        objs = list(SubjectConsent.objects.order_by("subject_identifier"))
+        self.model_admin.prefetch_open_data_queries(objs)
+        self.assertFalse(hasattr(objs[0], "open_data_query_links"))
+        self.assertIsNone(self.model_admin.queries(objs[0]))
+
+    def test_changelist_queries_column(self):
+        make_open_data_queries(["S000"], "consent_app.subjectconsent", self.user)
+        changelist = self.model_admin.get_changelist_instance(self.get_changelist_request())
+        links = {
+            obj.subject_identifier: obj.open_data_query_links for obj in changelist.result_list
+        }
+        self.assertEqual(len(links["S000"]), 1)
+        self.assertEqual(links["S001"], [])
+
+    def test_changelist_defers_encrypted_fields_not_displayed(self):
+        request = self.get_changelist_request()
+        deferred, defer = self.model_admin.get_queryset(request).query.deferred_loading
+        self.assertTrue(defer)
+        list_display = self.model_admin.get_list_display(request)
+        self.assertEqual(
+            deferred,
+            {f for f in self.model_admin.get_encrypted_fields() if f not in list_display},
+        )
+        self.assertIn("identity", deferred)
+        self.assertNotIn("first_name", deferred)
+        changelist = self.model_admin.get_changelist_instance(request)
+        obj = changelist.result_list[0]
+        self.assertIn("identity", obj.get_deferred_fields())
+        with self.assertNumQueries(1):
+            self.assertEqual(obj.identity, f"12345678{obj.subject_identifier[-1]}")
+
+    def test_no_deferred_fields_outside_changelist(self):
+        request = self.get_changelist_request()
+        request.method = "POST"
+        self.assertEqual(
+            self.model_admin.get_queryset(request).query.deferred_loading,
+            (frozenset(), True),
+        )
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.resolver_match = None
+        self.assertEqual(
+            self.model_admin.get_queryset(request).query.deferred_loading,
+            (frozenset(), True),
+        )
+        self.model_admin.changelist_defer_encrypted_fields = False
+        try:
+            self.assertEqual(
+                self.model_admin.get_queryset(
+                    self.get_changelist_request()
+                ).query.deferred_loading,
+                (frozenset(), True),
+            )
+        finally:
+            self.model_admin.changelist_defer_encrypted_fields = True
+
+    def test_search_fields_match_encrypted_fields_exactly(self):
+        self.model_admin.search_encrypted_fields_exact = True
+        self.addCleanup(delattr, self.model_admin, "search_encrypted_fields_exact")
+        search_fields = self.model_admin.get_search_fields(self.get_changelist_request())
+        for f in ["identity", "first_name", "last_name"]:
+            self.assertIn(f"{f}__exact", search_fields)
+            self.assertNotIn(f, search_fields)
+        self.assertIn("subject_identifier", search_fields)
+
+    def test_search_fields_partial_match(self):
+        request = self.get_changelist_request()
+        queryset, _ = self.model_admin.get_search_results(
+            request, SubjectConsent.objects.all(), "S00"
+        )
+        self.assertEqual(queryset.count(), len(self.consents))
+        # the default
+        search_fields = self.model_admin.get_search_fields(request)
+        self.assertIn("first_name", search_fields)
+        self.assertNotIn("first_name__exact", search_fields)
+
+    def test_search_encrypted_field(self):
+        self.model_admin.search_encrypted_fields_exact = True
+        self.addCleanup(delattr, self.model_admin, "search_encrypted_fields_exact")
+        request = self.get_changelist_request()
+        queryset, _ = self.model_admin.get_search_results(
+            request, SubjectConsent.objects.all(), "123456782"
+        )
+        self.assertEqual(list(queryset.values_list("subject_identifier", flat=True)), ["S002"])
+        queryset, _ = self.model_admin.get_search_results(
+            request, SubjectConsent.objects.all(), "NAME3"
+        )
+        self.assertEqual(list(queryset.values_list("subject_identifier", flat=True)), ["S003"])
+
+    def test_changelist_view(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("consent_app_admin:consent_app_subjectconsent_changelist")
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "S004")
+
+    def test_delete_view_lists_bounded_protected_visits(self):
+        self.model_admin.delete_view_protected_limit = 3
+        self.addCleanup(delattr, self.model_admin, "delete_view_protected_limit")
+        SubjectVisit.objects.bulk_create(
+            [
+                SubjectVisit(
+                    id=uuid4(),
+                    subject_identifier="S000",
+                    report_datetime=self.study_open_datetime + relativedelta(days=day),
+                    visit_schedule_name="visit_schedule",
+                    schedule_name="schedule1",
+                )
+                for day in range(1, 6)
+            ]
+        )
+        self.client.force_login(self.user)
+        url = reverse(
+            "consent_app_admin:consent_app_subjectconsent_delete",
+            args=(self.consents[0].id,),
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        protected = response.context["protected"]
+        self.assertEqual(len(protected), 4)
+        self.assertTrue(all(str(p).startswith("Subject visit: S000") for p in protected[:3]))
+        self.assertEqual(protected[3], "and 2 more")
+        self.assertContains(response, "and 2 more")
+
+    def test_delete_view_not_protected_without_visits(self):
+        self.client.force_login(self.user)
+        url = reverse(
+            "consent_app_admin:consent_app_subjectconsent_delete",
+            args=(self.consents[0].id,),
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["protected"])
+        self.assertContains(response, "Yes, I’m sure")
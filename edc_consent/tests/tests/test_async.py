@@ -0,0 +1,176 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.core.exceptions import ObjectDoesNotExist
+from django.test import TestCase, override_settings
+from edc_constants.constants import YES
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import SubjectConsentV1Ext
+from edc_consent.consent_definition_extension import ConsentDefinitionExtension
+from edc_consent.exceptions import NotConsentedError
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestAsync(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.cdef1,
+        )
+        self.extension = ConsentDefinitionExtension(
+            "consent_app.subjectconsentv1ext",
+            version="1.1",
+            start=self.study_open_datetime + timedelta(days=20),
+            extends=self.cdef1,
+            timepoints=[1, 2],
+        )
+        site_consents.register(self.cdef1, updated_by=self.cdef2, extended_by=self.extension)
+        site_consents.register(self.cdef2)
+        self.subject_identifiers = ["S001", "S002", "S003"]
+        self.consents = {}
+        for index, subject_identifier in enumerate(self.subject_identifiers):
+            self.consents[subject_identifier] = baker.make_recipe(
+                self.cdef1.model,
+                subject_identifier=subject_identifier,
+                first_name=f"NAME{subject_identifier}",
+                identity=f"12345678{index}",
+                confirm_identity=f"12345678{index}",
+                consent_datetime=self.study_open_datetime + timedelta(days=1),
+                dob=self.study_open_datetime - relativedelta(years=25),
+            )
+        # S001 re-consents to v2
+        self.reconsent = baker.make_recipe(
+            self.cdef2.model,
+            subject_identifier="S001",
+            first_name="NAMES001",
+            consent_datetime=self.study_open_datetime + timedelta(days=60),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+
+    async def test_aget_consent_for(self):
+        consent_obj = await self.cdef1.aget_consent_for(subject_identifier="S001")
+        self.assertEqual(consent_obj.id, self.consents["S001"].id)
+        with self.assertRaises(NotConsentedError):
+            await self.cdef2.aget_consent_for(subject_identifier="S002")
+        self.assertIsNone(
+            await self.cdef2.aget_consent_for(
+                subject_identifier="S002", raise_if_not_consented=False
+            )
+        )
+
+    async def test_aget_consent_or_raise(self):
+        consent_obj = await site_consents.aget_consent_or_raise(
+            subject_identifier="S001",
+            report_datetime=self.study_open_datetime + timedelta(days=10),
+        )
+        self.assertEqual(consent_obj.id, self.consents["S001"].id)
+        consent_obj = await site_consents.aget_consent_or_raise(
+            subject_identifier="S001",
+            report_datetime=self.study_open_datetime + timedelta(days=70),
+        )
+        self.assertEqual(consent_obj.id, self.reconsent.id)
+        with self.assertRaises(NotConsentedError):
+            await site_consents.aget_consent_or_raise(
+                subject_identifier="S002",
+                report_datetime=self.study_open_datetime + timedelta(days=70),
+            )
+
+    async def test_aget_consent_or_raise_for_subjects(self):
+        report_datetime = self.study_open_datetime + timedelta(days=70)
+        consents = await site_consents.aget_consent_or_raise_for_subjects(
+            self.subject_identifiers, report_datetime, raise_if_not_consented=False
+        )
+        self.assertEqual(list(consents), self.subject_identifiers)
+        self.assertEqual(consents["S001"].id, self.reconsent.id)
+        self.assertIsNone(consents["S002"])
+        with self.assertRaises(NotConsentedError):
+            await site_consents.aget_consent_or_raise_for_subjects(
+                self.subject_identifiers, report_datetime
+            )
+
+    async def test_aget_consents(self):
+        consents = await site_consents.aget_consents("S001", site_id=None)
+        self.assertEqual(
+            sorted(obj.id for obj in consents),
+            sorted([self.consents["S001"].id, self.reconsent.id]),
+        )
+        consents = await site_consents.aget_consents_for_subjects(
+            self.subject_identifiers + ["S999"], site_id=None
+        )
+        self.assertEqual(len(consents["S001"]), 2)
+        self.assertEqual(len(consents["S002"]), 1)
+        self.assertEqual(consents["S999"], [])
+
+    async def test_aget_consents_for_subjects_using(self):
+        consents = await site_consents.aget_consents_for_subjects(
+            self.subject_identifiers, site_id=None, using="default"
+        )
+        self.assertEqual(consents["S001"][-1].id, self.reconsent.id)
+        self.assertEqual(
+            [obj._meta.label_lower for obj in consents["S001"]],
+            [self.cdef1.model, self.cdef2.model],
+        )
+
+    def test_get_consents_for_subjects(self):
+        # one query for the consent model of both consent definitions
+        with self.assertNumQueries(1):
+            consents = site_consents.get_consents_for_subjects(
+                self.subject_identifiers + ["S999"], site_id=None
+            )
+        self.assertEqual(
+            [obj.id for obj in consents["S001"]],
+            [self.consents["S001"].id, self.reconsent.id],
+        )
+        self.assertEqual(consents["S999"], [])
+
+    async def test_aget_previous_consent(self):
+        previous_consent = await self.cdef1.aget_previous_consent(subject_identifier="S002")
+        self.assertEqual(previous_consent.id, self.consents["S002"].id)
+        with self.assertRaises(ObjectDoesNotExist):
+            await self.cdef1.aget_previous_consent(
+                subject_identifier="S002", exclude_id=self.consents["S002"].id
+            )
+
+    async def test_aget_consent_extension_for(self):
+        self.assertIsNone(
+            await self.extension.aget_consent_extension_for(subject_identifier="S003")
+        )
+        consent_extension = await SubjectConsentV1Ext.objects.acreate(
+            subject_consent=self.consents["S003"],
+            report_datetime=self.study_open_datetime + timedelta(days=30),
+            agrees_to_extension=YES,
+        )
+        self.assertEqual(
+            (await self.extension.aget_consent_extension_for(subject_identifier="S003")).id,
+            consent_extension.id,
+        )
+        self.assertEqual(
+            (
+                await self.extension.aget_consent_extension_for(
+                    subject_consent=self.consents["S003"]
+                )
+            ).id,
+            consent_extension.id,
+        )
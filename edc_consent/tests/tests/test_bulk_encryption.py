@@ -0,0 +1,124 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django_crypto_fields.utils import get_crypt_model_cls
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import SubjectConsent, SubjectConsentV1
+from edc_consent.bulk_encryption import BulkEncryptor, bulk_create_consents
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestBulkEncryption(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        site_consents.register(self.cdef)
+
+    def prepare(self, count: int, start: int = 0):
+        consent_datetime = self.study_open_datetime + timedelta(days=1)
+        return [
+            baker.prepare_recipe(
+                self.cdef.model,
+                subject_identifier=f"S{index:03d}",
+                screening_identifier=f"SCR{index:03d}",
+                first_name=f"FIRST{index:03d}",
+                last_name="SAMELAST",
+                initials="FS",
+                identity=f"{index:09d}",
+                confirm_identity=f"{index:09d}",
+                consent_datetime=consent_datetime,
+                report_datetime=consent_datetime,
+                dob=self.study_open_datetime.date() - relativedelta(years=25),
+                model_name=self.cdef.model,
+                version=self.cdef.version,
+                consent_definition_name=self.cdef.name,
+            )
+            for index in range(start, start + count)
+        ]
+
+    @staticmethod
+    def get_stored(obj, fields):
+        columns = ", ".join(SubjectConsent._meta.get_field(f).column for f in fields)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"select {columns} from {SubjectConsent._meta.db_table} where id=%s",
+                [obj.id.hex],
+            )
+            return cursor.fetchone()
+
+    def test_stored_values_match_per_row_path(self):
+        fields = ["first_name", "last_name", "initials", "identity"]
+        objs = self.prepare(5)
+        bulk_create_consents(objs, batch_size=2)
+        for obj in objs:
+            # plaintext restored on the instances
+            self.assertTrue(obj.first_name.startswith("FIRST"))
+            self.assertEqual(
+                self.get_stored(obj, fields),
+                tuple(
+                    SubjectConsent._meta.get_field(f).get_prep_value(getattr(obj, f))
+                    for f in fields
+                ),
+            )
+        obj = SubjectConsentV1.objects.get(id=objs[0].id)
+        self.assertEqual(obj.first_name, objs[0].first_name)
+        self.assertEqual(obj.identity, objs[0].identity)
+        self.assertEqual(
+            SubjectConsentV1.objects.filter(identity=objs[1].identity).get().id, objs[1].id
+        )
+
+    def test_dedups_and_reuses_secrets(self):
+        crypt_model_cls = get_crypt_model_cls()
+        hash_with_prefix = SubjectConsent._meta.get_field("last_name").get_prep_value(
+            "SAMELAST"
+        )
+        hashed_value = hash_with_prefix[len("enc1:::") :]
+        bulk_create_consents(self.prepare(3))
+        self.assertEqual(crypt_model_cls.objects.filter(hash=hashed_value).count(), 1)
+        count = crypt_model_cls.objects.count()
+        # same values again, no new secrets
+        objs = self.prepare(3, start=3)
+        for obj, other in zip(objs, self.prepare(3)):
+            obj.first_name = other.first_name
+            obj.identity = obj.confirm_identity = other.identity
+            # not encrypted, avoids the unique constraint on first_name, dob, ...
+            obj.dob -= relativedelta(days=1)
+        bulk_create_consents(objs)
+        self.assertEqual(crypt_model_cls.objects.count(), count)
+
+    def test_parallel(self):
+        objs = self.prepare(4)
+        serial = BulkEncryptor(SubjectConsentV1).encrypt(objs)
+        parallel = BulkEncryptor(SubjectConsentV1, workers=2, parallel_threshold=0).encrypt(
+            objs
+        )
+        self.assertEqual(serial, parallel)
+        objs = self.prepare(4, start=4)
+        for obj in objs:
+            obj.id = uuid4()
+        encryptor = BulkEncryptor(SubjectConsentV1, workers=2, parallel_threshold=0)
+        with encryptor.encrypted(objs):
+            SubjectConsentV1.objects.bulk_create(objs)
+        self.assertEqual(
+            SubjectConsentV1.objects.get(id=objs[0].id).first_name, objs[0].first_name
+        )
@@ -1,10 +1,13 @@
+from dataclasses import FrozenInstanceError
+from unittest.mock import patch
+
 from dateutil.relativedelta import relativedelta
 from django.test import TestCase, override_settings
 from edc_protocol.research_protocol_config import ResearchProtocolConfig
 from edc_utils import get_utcnow
 
 from edc_consent.consent_definition import ConsentDefinition
-from edc_consent.exceptions import SiteConsentError
+from edc_consent.exceptions import ConsentDefinitionDoesNotExist, SiteConsentError
 from edc_consent.site_consents import site_consents
 
 
@@ -90,3 +93,74 @@ class TestConsentModel(TestCase):
         self.assertRaises(
             SiteConsentError, site_consents.get_consent_definition, country="uganda"
         )
+
+    def test_immutable(self):
+        cdef = ConsentDefinition("consent_app.subjectconsentv1", **self.default_options())
+        self.assertRaises(FrozenInstanceError, setattr, cdef, "version", "2")
+        self.assertRaises(FrozenInstanceError, setattr, cdef, "updated_by", None)
+        self.assertFalse(hasattr(cdef, "__dict__"))
+        self.assertEqual(cdef.gender, ("M", "F"))
+        self.assertEqual(cdef.screening_model, ("consent_app.subjectscreening",))
+        self.assertEqual(cdef.site_ids, ())
+
+    def test_eq_hash_and_order(self):
+        cdef1 = ConsentDefinition("consent_app.subjectconsentv1", **self.default_options())
+        cdef2 = ConsentDefinition(
+            "consent_app.subjectconsentv1", **self.default_options(gender=["F"])
+        )
+        cdef3 = ConsentDefinition(
+            "consent_app.subjectconsentv2",
+            **self.default_options(start=self.study_open_datetime + relativedelta(days=1)),
+        )
+        self.assertEqual(cdef1, cdef2)
+        self.assertEqual(hash(cdef1), hash(cdef2))
+        self.assertEqual(len({cdef1, cdef2, cdef3}), 2)
+        self.assertLess(cdef1, cdef3)
+        self.assertEqual(sorted([cdef3, cdef1]), [cdef1, cdef3])
+
+    def test_register_links(self):
+        cdef1 = ConsentDefinition("consent_app.subjectconsentv1", **self.default_options())
+        cdef2 = ConsentDefinition(
+            "consent_app.subjectconsentv2",
+            **self.default_options(version="2", updates=cdef1),
+        )
+        site_consents.register(cdef1, updated_by=cdef2)
+        site_consents.register(cdef2)
+        self.assertEqual(cdef1.updated_by, cdef2)
+        self.assertIsNone(cdef2.updated_by)
+
+    def test_screening_model_as_str(self):
+        cdef = ConsentDefinition(
+            "consent_app.subjectconsentv1",
+            **self.default_options(screening_model="consent_app.subjectscreening"),
+        )
+        site_consents.register(cdef)
+        self.assertEqual(
+            site_consents.get_consent_definition(
+                screening_model="consent_app.subjectscreening"
+            ),
+            cdef,
+        )
+
+    def test_does_not_exist_message_is_lazy(self):
+        cdef = ConsentDefinition("consent_app.subjectconsentv1", **self.default_options())
+        site_consents.register(cdef)
+        with patch.object(
+            site_consents, "get_registry_display", return_value="registered cdefs"
+        ) as get_registry_display:
+            with self.assertRaises(ConsentDefinitionDoesNotExist) as cm:
+                site_consents.get_consent_definition(
+                    model="consent_app.subjectconsentv1", version="2"
+                )
+            get_registry_display.assert_not_called()
+            message = str(cm.exception)
+            get_registry_display.assert_called_once()
+        self.assertIn("Got 2. Using model=consent_app.subjectconsentv1.", message)
+        self.assertIn("registered cdefs", message)
+
+        with self.assertRaises(ConsentDefinitionDoesNotExist) as cm:
+            site_consents.get_consent_definition(
+                report_datetime=self.study_close_datetime + relativedelta(days=1)
+            )
+        self.assertIn("Date does not fall within the validity period", str(cm.exception))
+        self.assertIn(cdef.display_name, str(cm.exception))
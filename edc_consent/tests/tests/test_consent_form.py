@@ -20,6 +20,8 @@ from edc_consent.form_validators import SubjectConsentFormValidatorMixin
 from edc_consent.modelform_mixins import ConsentModelFormMixin
 from edc_consent.site_consents import site_consents
 
+from ..test_case_mixins import ConsentQueryBudgetTestCaseMixin
+
 fake = Faker()
 
 
@@ -48,7 +50,7 @@ class SubjectConsentForm(ConsentModelFormMixin, FormValidatorMixin, forms.ModelF
     EDC_AUTH_SKIP_SITE_AUTHS=True,
     EDC_AUTH_SKIP_AUTH_UPDATER=False,
 )
-class TestConsentForm(TestCase):
+class TestConsentForm(ConsentQueryBudgetTestCaseMixin, TestCase):
     def setUp(self):
         site_consents.registry = {}
         self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
@@ -197,6 +199,24 @@ class TestConsentForm(TestCase):
         )
         self.assertTrue(form.is_valid())
 
+    def test_clean_consent_form_queries(self):
+        subject_consent = self.prepare_subject_consent(
+            dob=self.dob,
+            consent_datetime=self.study_open_datetime,
+            first_name="ERIK",
+            last_name="THEPLEEB",
+            initials="ET",
+            screening_identifier="ABCD1",
+        )
+        opts = SubjectConsentForm._meta
+        data = model_to_dict(subject_consent, opts.fields, opts.exclude)
+        form = SubjectConsentForm(
+            data=data,
+            initial=dict(screening_identifier=data.get("screening_identifier")),
+            instance=opts.model(site=subject_consent.site),
+        )
+        self.assertTrue(self.assertCleanConsentFormQueries(form))
+
     def test_base_form_catches_consent_datetime_before_study_open(self):
         options = dict(
             consent_datetime=self.study_open_datetime + relativedelta(days=1),
@@ -0,0 +1,143 @@
+from dataclasses import FrozenInstanceError
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import SubjectConsent
+from edc_consent.consent_handle import ConsentHandle
+from edc_consent.form_validators import ConsentDefinitionFormValidatorMixin
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+class FormValidator(ConsentDefinitionFormValidatorMixin):
+    subject_identifier = "S001"
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestConsentHandle(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.cdef1,
+        )
+        site_consents.register(self.cdef1, updated_by=self.cdef2)
+        site_consents.register(self.cdef2)
+        self.subject_consent = baker.make_recipe(
+            self.cdef1.model,
+            subject_identifier="S001",
+            consent_datetime=self.study_open_datetime + timedelta(days=1),
+            dob=(self.study_open_datetime - relativedelta(years=25)).date(),
+        )
+
+    def test_lightweight_get_consent_for(self):
+        with CaptureQueriesContext(connection) as queries:
+            handle = self.cdef1.get_consent_for(subject_identifier="S001", lightweight=True)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("first_name", queries[0]["sql"])
+        self.assertNotIn("identity", queries[0]["sql"])
+        self.assertIsInstance(handle, ConsentHandle)
+        self.assertEqual(handle.pk, self.subject_consent.id)
+        self.assertEqual(handle.version, "1.0")
+        self.assertEqual(handle.consent_datetime, self.subject_consent.consent_datetime)
+        self.assertEqual(handle.dob, self.subject_consent.dob)
+        self.assertEqual(handle.site_id, self.subject_consent.site_id)
+        self.assertIsNone(
+            self.cdef2.get_consent_for(
+                subject_identifier="S001", lightweight=True, raise_if_not_consented=False
+            )
+        )
+
+    def test_full_instance_on_demand(self):
+        handle = self.cdef1.get_consent_for(subject_identifier="S001", lightweight=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(handle.first_name, self.subject_consent.first_name)
+            self.assertEqual(handle.identity, self.subject_consent.identity)
+            self.assertEqual(handle.get_instance(), self.subject_consent)
+        self.assertRaises(AttributeError, getattr, handle, "blah")
+
+    def test_unknown_attribute_does_not_fetch_instance(self):
+        handle = self.cdef1.get_consent_for(subject_identifier="S001", lightweight=True)
+        with self.assertNumQueries(0):
+            self.assertRaises(AttributeError, getattr, handle, "frist_name")
+            self.assertFalse(hasattr(handle, "blah"))
+            self.assertEqual(handle._meta.label_lower, "consent_app.subjectconsentv1")
+
+    def test_read_only(self):
+        handle = self.cdef1.get_consent_for(subject_identifier="S001", lightweight=True)
+        with self.assertRaises(FrozenInstanceError):
+            handle.version = "2.0"
+        self.assertFalse(hasattr(handle, "__dict__"))
+
+    def test_lightweight_get_consent_or_raise(self):
+        baker.make_recipe(
+            self.cdef2.model,
+            subject_identifier="S001",
+            first_name="NAME",
+            consent_datetime=self.study_open_datetime + timedelta(days=60),
+            dob=(self.study_open_datetime - relativedelta(years=25)).date(),
+        )
+        for days in [10, 55, 70]:
+            report_datetime = self.study_open_datetime + timedelta(days=days)
+            with self.subTest(days=days):
+                consent_obj = site_consents.get_consent_or_raise(
+                    subject_identifier="S001", report_datetime=report_datetime
+                )
+                handle = site_consents.get_consent_or_raise(
+                    subject_identifier="S001",
+                    report_datetime=report_datetime,
+                    lightweight=True,
+                )
+                self.assertIsInstance(handle, ConsentHandle)
+                self.assertEqual(handle.pk, consent_obj.pk)
+                self.assertEqual(handle.version, consent_obj.version)
+
+    def test_get_consent_or_raise_returns_model_instance(self):
+        consent_obj = site_consents.get_consent_or_raise(
+            subject_identifier="S001",
+            report_datetime=self.study_open_datetime + timedelta(days=10),
+        )
+        self.assertIsInstance(consent_obj, SubjectConsent)
+        self.assertEqual(consent_obj.pk, self.subject_consent.pk)
+
+    def test_private_attributes_read_from_instance(self):
+        handle = self.cdef1.get_consent_for(subject_identifier="S001", lightweight=True)
+        self.assertEqual(handle._meta.label_lower, "consent_app.subjectconsentv1")
+        self.assertEqual(handle._state.db, "default")
+        self.assertRaises(AttributeError, getattr, handle, "__blah__")
+
+    def test_form_validator_get_consent_or_raise(self):
+        report_datetime = self.study_open_datetime + timedelta(days=10)
+        form_validator = FormValidator()
+        consent_obj = form_validator.get_consent_or_raise(report_datetime=report_datetime)
+        self.assertIsInstance(consent_obj, SubjectConsent)
+        self.assertEqual(consent_obj.pk, self.subject_consent.pk)
+        with CaptureQueriesContext(connection) as queries:
+            consent_datetime = form_validator.get_consent_datetime_or_raise(
+                report_datetime=report_datetime
+            )
+        self.assertEqual(consent_datetime, self.subject_consent.consent_datetime)
+        self.assertNotIn("first_name", queries[-1]["sql"])
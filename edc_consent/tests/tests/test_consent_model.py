@@ -1,3 +1,4 @@
+from dataclasses import FrozenInstanceError, replace
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -559,25 +560,27 @@ class TestConsentModel(TestCase):
         # subject_visit_2.save()
 
         # cut short v3 validity period, and introduce new v4 consent definition,
+        # (consent definitions are immutable, so replace v3)
         updated_v3_end_datetime = datetime_within_consent_v3 + relativedelta(days=1)
-        site_consents.registry[cdef_v3.name].end = updated_v3_end_datetime
-        site_consents.registry[cdef_v3.name].updated_by = "4.0"
-        self.assertEqual(site_consents.registry[cdef_v3.name].end, updated_v3_end_datetime)
-        self.assertEqual(site_consents.registry[cdef_v3.name].end, cdef_v3.end)
-        self.assertEqual(site_consents.registry[cdef_v3.name].updated_by, "4.0")
-        self.assertEqual(site_consents.registry[cdef_v3.name].updated_by, cdef_v3.updated_by)
+        with self.assertRaises(FrozenInstanceError):
+            site_consents.registry[cdef_v3.name].end = updated_v3_end_datetime
+        cdef_v3 = replace(cdef_v3, end=updated_v3_end_datetime)
+        self.assertEqual(cdef_v3, self.consent_v3)
+        self.assertEqual(cdef_v3.end, updated_v3_end_datetime)
 
         consent_v4 = consent_factory(
             proxy_model="consent_app.subjectconsentv4",
             start=cdef_v3.end + relativedelta(days=1),
             end=self.study_open_datetime + timedelta(days=150),
             version="4.0",
-            updates=self.consent_v3,
+            updates=cdef_v3,
         )
 
         site_consents.unregister(self.consent_v3)
-        site_consents.register(self.consent_v3, updated_by=consent_v4)
+        site_consents.register(cdef_v3, updated_by=consent_v4)
         site_consents.register(consent_v4)
+        self.assertEqual(site_consents.registry[cdef_v3.name].end, updated_v3_end_datetime)
+        self.assertEqual(site_consents.registry[cdef_v3.name].updated_by, consent_v4)
 
         traveller.stop()
         traveller = time_machine.travel(cdef_v3.end + relativedelta(days=20))
@@ -0,0 +1,111 @@
+from io import StringIO
+from unittest.mock import patch
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from edc_constants.constants import YES
+from edc_utils import get_utcnow
+
+from consent_app.data_generator import ConsentDataGenerator
+from consent_app.models import CrfOne, SubjectConsent, SubjectConsentV1Ext, SubjectVisit
+from edc_consent.site_consents import site_consents
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestDataGenerator(TestCase):
+    def test_generate(self):
+        generator = ConsentDataGenerator(subjects=50, versions=3, seed=1)
+        counts = generator.generate()
+        self.assertEqual(len(site_consents.registry), 3)
+        self.assertEqual(
+            SubjectConsent.objects.count(),
+            sum(counts[cdef.model] for cdef in generator.cdefs),
+        )
+        self.assertEqual(
+            SubjectConsent.objects.values("subject_identifier").distinct().count(), 50
+        )
+        self.assertEqual(
+            SubjectConsentV1Ext.objects.count(), counts["consent_app.subjectconsentv1ext"]
+        )
+        self.assertEqual(SubjectVisit.objects.count(), CrfOne.objects.count())
+
+    def test_generate_in_batches(self):
+        generator = ConsentDataGenerator(subjects=25, versions=2, batch_size=10, seed=1)
+        with patch.object(
+            generator, "generate_batch", wraps=generator.generate_batch
+        ) as generate_batch:
+            counts = generator.generate()
+        self.assertEqual(
+            [call.args[0] for call in generate_batch.call_args_list],
+            [range(0, 10), range(10, 20), range(20, 25)],
+        )
+        self.assertEqual(
+            SubjectConsent.objects.values("subject_identifier").distinct().count(), 25
+        )
+        self.assertEqual(SubjectVisit.objects.count(), counts["consent_app.subjectvisit"])
+
+    def test_consents_match_consent_definitions(self):
+        ConsentDataGenerator(subjects=20, versions=2, reconsent_rate=1.0, seed=1).generate()
+        for subject_consent in SubjectConsent.objects.all():
+            cdef = site_consents.get_consent_definition(
+                model=subject_consent.model_name, version=subject_consent.version
+            )
+            self.assertTrue(cdef.start <= subject_consent.consent_datetime <= cdef.end)
+            self.assertEqual(
+                cdef.get_consent_for(
+                    subject_identifier=subject_consent.subject_identifier,
+                    site_id=subject_consent.site_id,
+                ).id,
+                subject_consent.id,
+            )
+
+    def test_extension_version_on_crfs(self):
+        ConsentDataGenerator(
+            subjects=20, versions=1, extension_rate=1.0, crfs_per_subject=12, seed=1
+        ).generate()
+        for extension in SubjectConsentV1Ext.objects.filter(agrees_to_extension=YES):
+            for crf in CrfOne.objects.filter(subject_identifier=extension.subject_identifier):
+                self.assertEqual(
+                    crf.consent_version,
+                    "1.1" if crf.report_datetime >= extension.report_datetime else "1.0",
+                )
+
+    def test_deterministic(self):
+        def prepare(seed):
+            generator = ConsentDataGenerator(subjects=5, versions=2, seed=seed)
+            generator.register_cdefs()
+            return [
+                (obj.id, obj.version, obj.first_name, obj.consent_datetime, obj.site_id)
+                for index in range(5)
+                for _, obj in generator.prepare_subject_consents(index)
+            ]
+
+        self.assertEqual(prepare(1), prepare(1))
+        self.assertNotEqual(prepare(1), prepare(2))
+
+    def test_invalid_weights(self):
+        self.assertRaises(
+            ValueError, ConsentDataGenerator, versions=2, version_weights=[1.0, 2.0, 3.0]
+        )
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            "generate_consent_data",
+            "--subjects=10",
+            "--sites=2",
+            "--versions=2",
+            "--site-weights=3,1",
+            "--date-distribution=early",
+            stdout=out,
+        )
+        self.assertIn("consent_app.subjectconsentv1:", out.getvalue())
+        self.assertEqual(
+            SubjectConsent.objects.values("subject_identifier").distinct().count(), 10
+        )
@@ -0,0 +1,163 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from model_bakery import baker
+
+from consent_app.models import CrfOne, SubjectVisit, TestModel
+from consent_app.visit_schedules import get_visit_schedule
+from edc_consent.deferred import consent_checks_deferred, deferred_consent_checks
+from edc_consent.exceptions import NotConsentedError
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestDeferredConsentChecks(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.cdef1,
+        )
+        site_consents.register(self.cdef1, updated_by=self.cdef2)
+        site_consents.register(self.cdef2)
+        for index, subject_identifier in enumerate(["S001", "S002"]):
+            baker.make_recipe(
+                self.cdef1.model,
+                subject_identifier=subject_identifier,
+                first_name=f"NAME{index}",
+                identity=f"12345678{index}",
+                confirm_identity=f"12345678{index}",
+                consent_datetime=self.study_open_datetime + timedelta(days=1),
+                dob=self.study_open_datetime - relativedelta(years=25),
+            )
+        baker.make_recipe(
+            self.cdef2.model,
+            subject_identifier="S001",
+            first_name="NAME0",
+            consent_datetime=self.study_open_datetime + timedelta(days=60),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+
+    def make_test_model(self, subject_identifier: str, days: int) -> TestModel:
+        return TestModel.objects.create(
+            subject_identifier=subject_identifier,
+            report_datetime=self.study_open_datetime + timedelta(days=days),
+        )
+
+    def test_deferred(self):
+        self.assertFalse(consent_checks_deferred())
+        with deferred_consent_checks():
+            self.assertTrue(consent_checks_deferred())
+            objs = [
+                self.make_test_model("S001", 10),
+                self.make_test_model("S001", 55),
+                self.make_test_model("S001", 70),
+                self.make_test_model("S002", 10),
+            ]
+            self.assertEqual({obj.consent_version for obj in objs}, {None})
+        self.assertFalse(consent_checks_deferred())
+        self.assertEqual(
+            [TestModel.objects.get(id=obj.id).consent_version for obj in objs],
+            ["1.0", "2.0", "2.0", "1.0"],
+        )
+        for obj in objs:
+            obj.refresh_from_db()
+            consent_version, consent_model = obj.consent_version, obj.consent_model
+            obj.save()
+            self.assertEqual(
+                (obj.consent_version, obj.consent_model), (consent_version, consent_model)
+            )
+
+    def test_deferred_resolves_as_pre_save(self):
+        """Asserts deferred checks resolve the same consent as the
+        pre_save checks for a subject with v1 and v2 consents.
+        """
+        days = [10, 55, 70]
+        objs = [self.make_test_model("S001", day) for day in days]
+        with deferred_consent_checks():
+            deferred_objs = [self.make_test_model("S001", day) for day in days]
+        for obj in deferred_objs:
+            obj.refresh_from_db()
+        self.assertEqual(
+            [(obj.consent_version, obj.consent_model) for obj in deferred_objs],
+            [(obj.consent_version, obj.consent_model) for obj in objs],
+        )
+        self.assertEqual(
+            [(obj.consent_version, obj.consent_model) for obj in objs],
+            [
+                ("1.0", self.cdef1.model),
+                ("2.0", self.cdef2.model),
+                ("2.0", self.cdef2.model),
+            ],
+        )
+
+    def test_deferred_updates_history(self):
+        with deferred_consent_checks():
+            obj = self.make_test_model("S001", 55)
+            obj.save()
+            self.make_test_model("S002", 10)
+        self.assertEqual(
+            sorted(
+                TestModel.history.values_list(
+                    "subject_identifier", "consent_version", "consent_model"
+                )
+            ),
+            [
+                ("S001", "2.0", self.cdef2.model),
+                ("S001", "2.0", self.cdef2.model),
+                ("S002", "1.0", self.cdef1.model),
+            ],
+        )
+
+    def test_with_visit_schedule(self):
+        visit_schedule = get_visit_schedule([self.cdef1, self.cdef2])
+        site_visit_schedules._registry = {}
+        site_visit_schedules.register(visit_schedule)
+        subject_visit = SubjectVisit.objects.create(
+            report_datetime=self.study_open_datetime + timedelta(days=2),
+            subject_identifier="S002",
+            visit_schedule_name=visit_schedule.name,
+            schedule_name="schedule1",
+        )
+        with deferred_consent_checks():
+            crf_one = CrfOne.objects.create(
+                subject_visit=subject_visit,
+                subject_identifier="S002",
+                report_datetime=subject_visit.report_datetime,
+            )
+        crf_one.refresh_from_db()
+        self.assertEqual(crf_one.consent_version, "1.0")
+        self.assertEqual(crf_one.consent_model, self.cdef1.model)
+
+    def test_not_consented_rolls_back(self):
+        with self.assertRaises(NotConsentedError):
+            with deferred_consent_checks():
+                self.make_test_model("S001", 10)
+                # S002 has not completed v2
+                self.make_test_model("S002", 70)
+        self.assertEqual(TestModel.objects.count(), 0)
+        self.assertFalse(consent_checks_deferred())
+
+    def test_not_consented_without_defer(self):
+        self.assertRaises(NotConsentedError, self.make_test_model, "S999", 10)
@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, override_settings
+from edc_constants.constants import FEMALE, MALE
+from edc_utils import age, get_utcnow
+
+from edc_consent.eligibility import (
+    GENDER,
+    INVALID_DOB,
+    MAX_AGE,
+    MIN_AGE,
+    MINOR,
+    ConsentEligibility,
+    get_ages,
+)
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestEligibility(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.cdef = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            version="1.0",
+            gender=[FEMALE],
+            age_min=16,
+            age_max=64,
+            age_is_adult=18,
+        )
+
+    def test_ages_match_relativedelta(self):
+        utc = ZoneInfo("UTC")
+        dobs = [date(2000, 2, 29), date(1990, 12, 31), date(2008, 1, 1), date(1960, 7, 15)]
+        report_datetimes = [
+            datetime(2000, 2, 29, tzinfo=utc) + timedelta(days=days)
+            for days in [0, 364, 365, 366, 1460, 1461, 9000, 12000, 20000]
+        ]
+        pairs = [(dob, dt) for dob in dobs for dt in report_datetimes if dob <= dt.date()]
+        self.assertEqual(
+            get_ages([dob for dob, _ in pairs], [dt for _, dt in pairs]),
+            [age(dob, dt).years for dob, dt in pairs],
+        )
+        self.assertEqual(
+            get_ages([None, date(2001, 1, 1)], [date(2000, 1, 1)] * 2), [None, None]
+        )
+
+    def test_evaluate(self):
+        report_datetime = datetime(2024, 6, 1, 10, tzinfo=ZoneInfo("UTC"))
+        rows = [
+            (date(1994, 6, 1), FEMALE, report_datetime),
+            (date(2008, 6, 2), FEMALE, report_datetime),
+            (date(2007, 6, 1), MALE, report_datetime),
+            (date(1950, 1, 1), FEMALE, report_datetime),
+            (None, FEMALE, report_datetime),
+        ]
+        eligibility = ConsentEligibility(self.cdef)
+        self.assertEqual(
+            eligibility.evaluate_rows(rows),
+            [(), (MIN_AGE, MINOR), (MINOR, GENDER), (MAX_AGE,), (INVALID_DOB,)],
+        )
+
+    def test_messages(self):
+        eligibility = ConsentEligibility(self.cdef)
+        report_datetime = datetime(2024, 6, 1, 10, tzinfo=ZoneInfo("UTC"))
+        self.assertEqual(
+            eligibility.get_message(MIN_AGE, date(2010, 1, 1), FEMALE, report_datetime),
+            "Subject's age is 14. Subject is not eligible for consent. "
+            "Minimum age of consent is 16.",
+        )
+        self.assertEqual(
+            eligibility.get_message(GENDER, date(1990, 1, 1), MALE, report_datetime),
+            "Gender of consent can only be 'F'. Got 'M'.",
+        )
+        self.assertIn(
+            "Subject is a minor",
+            eligibility.get_message(MINOR, date(2007, 1, 1), FEMALE, report_datetime),
+        )
+        self.assertRaises(
+            ValueError, eligibility.get_message, "blah", None, FEMALE, report_datetime
+        )
@@ -0,0 +1,163 @@
+import csv
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.http.request import HttpRequest
+from django.test import RequestFactory, TestCase, override_settings
+from edc_constants.constants import NO, YES
+from edc_utils import get_utcnow
+
+from consent_app.admin_site import consent_app_admin
+from consent_app.models import SubjectConsent, SubjectConsentV1, SubjectConsentV1Ext
+from edc_consent.actions import export_consents_as_csv
+from edc_consent.export import COLUMNS, ConsentExport
+
+from ..consent_test_utils import ConsentExtensionFixtureMixin
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestExport(ConsentExtensionFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        SubjectConsentV1Ext.objects.create(
+            subject_consent=self.consents[0],
+            report_datetime=self.study_open_datetime + timedelta(days=30),
+            agrees_to_extension=YES,
+        )
+        SubjectConsentV1Ext.objects.create(
+            subject_consent=self.consents[1],
+            report_datetime=self.study_open_datetime + timedelta(days=30),
+            agrees_to_extension=NO,
+        )
+
+    def test_rows(self):
+        rows = list(ConsentExport(chunk_size=2).rows())
+        self.assertEqual(
+            [row["subject_identifier"] for row in rows], [f"S00{i}" for i in range(5)]
+        )
+        self.assertEqual([row["age_at_consent"] for row in rows], [25, 26, 27, 28, 29])
+        self.assertEqual(list(rows[0].keys()), COLUMNS)
+        self.assertEqual(rows[0]["version"], "1.0")
+        self.assertEqual(rows[0]["site_id"], self.consents[0].site_id)
+
+    def test_extension_status(self):
+        rows = {row["subject_identifier"]: row for row in ConsentExport().rows()}
+        self.assertEqual(rows["S000"]["agrees_to_extension"], YES)
+        self.assertEqual(rows["S000"]["extension_version"], "1.1")
+        self.assertEqual(rows["S001"]["agrees_to_extension"], NO)
+        self.assertIsNone(rows["S001"]["extension_version"])
+        self.assertIsNone(rows["S002"]["agrees_to_extension"])
+        self.assertIsNone(rows["S002"]["extension_version"])
+
+    def test_extension_status_one_query_per_chunk(self):
+        # one query for the consents, one per chunk for the extensions
+        with self.assertNumQueries(2):
+            list(ConsentExport(chunk_size=5).rows())
+        with self.assertNumQueries(4):
+            list(ConsentExport(chunk_size=2).rows())
+
+    def test_filter_by_site_and_version(self):
+        site_id = self.consents[0].site_id
+        self.assertEqual(len(list(ConsentExport(site_id=site_id, version="1.0").rows())), 5)
+        self.assertEqual(len(list(ConsentExport(version="2.0").rows())), 0)
+
+    def test_fields(self):
+        export = ConsentExport(fields=["identity"])
+        self.assertEqual(export.columns, COLUMNS + ["identity"])
+        rows = list(export.rows())
+        self.assertEqual(rows[0]["identity"], "123456780")
+        self.assertNotIn("identity", list(ConsentExport().rows())[0])
+
+    def test_unknown_field_raises(self):
+        self.assertRaises(ValueError, ConsentExport, fields=["blah"])
+
+    def test_as_csv(self):
+        lines = list(ConsentExport().as_csv())
+        self.assertEqual(len(lines), 6)
+        rows = list(csv.DictReader(lines))
+        self.assertEqual(list(rows[0].keys()), COLUMNS)
+        self.assertEqual(rows[0]["subject_identifier"], "S000")
+        self.assertEqual(rows[0]["age_at_consent"], "25")
+        self.assertEqual(rows[2]["agrees_to_extension"], "")
+
+    def test_as_jsonl(self):
+        rows = [json.loads(line) for line in ConsentExport().as_jsonl()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["extension_version"], "1.1")
+        self.assertEqual(
+            rows[0]["consent_datetime"], self.consents[0].consent_datetime.isoformat()
+        )
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "consents.csv")
+            out = StringIO()
+            call_command("export_consents", "--output", path, stdout=out)
+            self.assertIn("Wrote 5 consents", out.getvalue())
+            with open(path, newline="") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 5)
+
+    def test_command_jsonl_to_stdout(self):
+        out = StringIO()
+        call_command(
+            "export_consents", "--format", "jsonl", "--fields", "identity", stdout=out
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["identity"], "123456780")
+
+    def test_command_consent_version(self):
+        out = StringIO()
+        call_command(
+            "export_consents", "--format", "jsonl", "--consent-version", "2.0", stdout=out
+        )
+        self.assertEqual(out.getvalue(), "")
+        out = StringIO()
+        call_command(
+            "export_consents", "--format", "jsonl", "--consent-version", "1.0", stdout=out
+        )
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
+
+    def test_command_unknown_field(self):
+        self.assertRaises(
+            CommandError,
+            call_command,
+            "export_consents",
+            "--fields",
+            "blah",
+            stdout=StringIO(),
+        )
+
+    def test_action(self):
+        request = HttpRequest()
+        request.user = User.objects.create(username="erikvw")
+        response = export_consents_as_csv(
+            None, request, SubjectConsentV1.objects.filter(subject_identifier="S000")
+        )
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        lines = [line.decode() for line in response.streaming_content]
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith("S000,"))
+
+    def test_action_requires_export_permission(self):
+        model_admin = consent_app_admin._registry[SubjectConsent]
+        request = RequestFactory().get("/")
+        request.user = User.objects.create(username="erikvw", is_staff=True)
+        self.assertFalse(model_admin.has_export_permission(request))
+        self.assertNotIn("export_consents_as_csv", model_admin.get_actions(request))
+        request.user = User.objects.create_superuser(username="admin")
+        self.assertTrue(model_admin.has_export_permission(request))
+        self.assertIn("export_consents_as_csv", model_admin.get_actions(request))
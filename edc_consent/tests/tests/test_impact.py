@@ -0,0 +1,107 @@
+from datetime import timedelta
+from io import StringIO
+from uuid import uuid4
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import TestModel
+from edc_consent.impact import ConsentImpactAnalysis
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestConsentImpact(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=100),
+            version="1.0",
+        )
+        site_consents.register(self.cdef1)
+        for index, (subject_identifier, days) in enumerate([("S001", 1), ("S002", 60)]):
+            baker.make_recipe(
+                self.cdef1.model,
+                subject_identifier=subject_identifier,
+                first_name=f"NAME{index}",
+                identity=f"12345678{index}",
+                confirm_identity=f"12345678{index}",
+                consent_datetime=self.study_open_datetime + timedelta(days=days),
+                dob=self.study_open_datetime - relativedelta(years=25),
+            )
+        self.site_id = self.cdef1.sites[0].site_id
+        # bulk_create skips the requires consent pre_save signal
+        TestModel.objects.bulk_create(
+            [
+                TestModel(
+                    id=uuid4(),
+                    subject_identifier=subject_identifier,
+                    report_datetime=self.study_open_datetime + timedelta(days=days),
+                    site_id=self.site_id,
+                    consent_version="1.0",
+                )
+                for subject_identifier, days in [("S001", 10), ("S001", 70), ("S002", 70)]
+            ]
+        )
+        # amendment: v1 ends on day 50, v2 from day 51
+        self.proposed_cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.proposed_cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.proposed_cdef1,
+        )
+
+    def test_impact(self):
+        analysis = ConsentImpactAnalysis(
+            [self.proposed_cdef1, self.proposed_cdef2], chunk_size=2
+        )
+        impacts = {impact.model: impact for impact in analysis.run()}
+        impact = impacts["consent_app.subjectconsent"]
+        self.assertEqual((impact.changed, impact.total), (1, 2))
+        self.assertEqual(impact.samples[0]["subject_identifier"], "S002")
+        self.assertEqual(impact.samples[0]["proposed_model"], "consent_app.subjectconsentv2")
+        impact = impacts["consent_app.testmodel"]
+        self.assertEqual((impact.changed, impact.total), (2, 3))
+        self.assertEqual(impact.sites, {self.site_id: 2})
+        self.assertEqual(impact.transitions, {(self.site_id, "1.0", "2.0"): 2})
+        self.assertEqual(
+            sorted(row["subject_identifier"] for row in impact.samples), ["S001", "S002"]
+        )
+        self.assertEqual({row["stored_version"] for row in impact.samples}, {"1.0"})
+
+    def test_registry_unchanged(self):
+        ConsentImpactAnalysis([self.proposed_cdef1, self.proposed_cdef2]).run()
+        self.assertEqual(list(site_consents.registry), [self.cdef1.name])
+        self.assertEqual(site_consents.get(self.cdef1.name).end, self.cdef1.end)
+        self.assertIsNone(site_consents.get(self.cdef1.name).updated_by)
+
+    def test_no_change(self):
+        impacts = ConsentImpactAnalysis(self.cdef1, sample_size=0).run()
+        self.assertEqual(sum(impact.changed for impact in impacts), 0)
+        self.assertEqual(sum(len(impact.samples) for impact in impacts), 0)
+
+    def test_command(self):
+        self.assertRaises(
+            CommandError, call_command, "consent_impact", "blah.blah", stdout=StringIO()
+        )
@@ -0,0 +1,109 @@
+from io import StringIO
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+
+from edc_consent.instrumentation import (
+    consent_lookup_finished,
+    consent_metrics,
+    publish_consent_metrics,
+)
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestInstrumentation(TestCase):
+    databases = {DEFAULT_DB_ALIAS, "replica"}
+
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        site_consents.register(
+            consent_definition_factory(
+                start=self.study_open_datetime,
+                end=ResearchProtocolConfig().study_close_datetime,
+            )
+        )
+        consent_metrics.reset()
+        consent_metrics.reset_published()
+
+    def tearDown(self):
+        consent_metrics.disable()
+        consent_metrics.reset()
+        consent_metrics.reset_published()
+
+    def test_disabled_records_nothing(self):
+        site_consents.get_consent_definition(report_datetime=self.study_open_datetime)
+        self.assertEqual(consent_metrics.snapshot(), {})
+
+    def test_enabled_records_calls(self):
+        consent_metrics.enable()
+        for _ in range(3):
+            site_consents.get_consent_definition(report_datetime=self.study_open_datetime)
+        stats = consent_metrics.snapshot()["site_consents.get_consent_definition"]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["queries"], 0)
+        self.assertGreater(stats["wall_time"], 0)
+
+    def test_signal(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append((sender, kwargs.get("queries")))
+
+        consent_lookup_finished.connect(receiver)
+        consent_metrics.enable()
+        try:
+            site_consents.get_consent_definition(report_datetime=self.study_open_datetime)
+        finally:
+            consent_lookup_finished.disconnect(receiver)
+        self.assertEqual(received, [("site_consents.get_consent_definition", 0)])
+
+    def test_management_command(self):
+        consent_metrics.enable()
+        site_consents.get_consent_definition(report_datetime=self.study_open_datetime)
+        out = StringIO()
+        call_command("consent_metrics", "--reset", stdout=out)
+        self.assertIn("site_consents.get_consent_definition: calls=1", out.getvalue())
+        self.assertEqual(consent_metrics.published_snapshot(), {})
+
+    def test_queries_counted_on_all_connections(self):
+        def query(using):
+            with connections[using].cursor() as cursor:
+                cursor.execute("SELECT 1")
+
+        consent_metrics.enable()
+        consent_metrics.measure("query", query, DEFAULT_DB_ALIAS)
+        consent_metrics.measure("query", query, "replica")
+        self.assertEqual(consent_metrics.snapshot()["query"]["queries"], 2)
+
+    def test_publish_adds_counts(self):
+        consent_metrics.enable()
+        for _ in range(2):
+            site_consents.get_consent_definition(report_datetime=self.study_open_datetime)
+            consent_metrics.publish(force=True)
+        stats = consent_metrics.published_snapshot()["site_consents.get_consent_definition"]
+        self.assertEqual(stats["calls"], 2)
+        self.assertGreater(stats["wall_time"], 0)
+        self.assertEqual(consent_metrics.snapshot(), {})
+
+    @override_settings(EDC_CONSENT_INSTRUMENTATION_PUBLISH_INTERVAL=3600)
+    def test_publish_per_interval(self):
+        consent_metrics.enable()
+        consent_metrics.publish(force=True)
+        site_consents.get_consent_definition(report_datetime=self.study_open_datetime)
+        publish_consent_metrics()
+        # not yet published
+        self.assertEqual(consent_metrics.published_snapshot(), {})
+        self.assertIn("site_consents.get_consent_definition", consent_metrics.snapshot())
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase, override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_sites.site import sites as site_sites
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from edc_consent.exceptions import ConsentDefinitionDoesNotExist
+from edc_consent.next_consent import NextConsentResolver
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestNextConsent(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.cdef1,
+        )
+        site_consents.register(self.cdef1, updated_by=self.cdef2)
+        site_consents.register(self.cdef2)
+        self.site_id = self.cdef1.sites[0].site_id
+        baker.make_recipe(
+            self.cdef1.model,
+            subject_identifier="S002",
+            screening_identifier="SCR002",
+            consent_datetime=self.study_open_datetime + timedelta(days=1),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+
+    def test_resolve(self):
+        resolver = NextConsentResolver("consent_app.subjectscreening")
+        rows = [
+            ("SCR001", self.site_id, self.study_open_datetime + timedelta(days=10)),
+            ("SCR002", self.site_id, self.study_open_datetime + timedelta(days=10)),
+            ("SCR002", self.site_id, self.study_open_datetime + timedelta(days=60)),
+            ("SCR003", self.site_id, self.cdef2.end),
+        ]
+        with self.assertNumQueries(1):
+            cdefs = resolver.resolve(rows)
+        self.assertEqual(cdefs, [self.cdef1, None, self.cdef2, self.cdef2])
+        for _, site_id, report_datetime in rows:
+            with self.subTest(report_datetime=report_datetime):
+                self.assertEqual(
+                    resolver.get_consent_definition(site_id, report_datetime),
+                    site_consents.get_consent_definition(
+                        screening_model="consent_app.subjectscreening",
+                        site=site_sites.get(site_id),
+                        report_datetime=report_datetime,
+                    ),
+                )
+
+    def test_raises(self):
+        self.assertRaises(ConsentDefinitionDoesNotExist, NextConsentResolver, "blah.blah")
+        resolver = NextConsentResolver("consent_app.subjectscreening")
+        self.assertRaises(
+            ConsentDefinitionDoesNotExist,
+            resolver.resolve,
+            [("SCR001", self.site_id, self.cdef2.end + timedelta(days=1))],
+        )
+        self.assertRaises(
+            ConsentDefinitionDoesNotExist,
+            resolver.resolve,
+            [("SCR001", 9999, self.study_open_datetime + timedelta(days=10))],
+        )
+
+    def test_resolve_collects_errors(self):
+        resolver = NextConsentResolver("consent_app.subjectscreening")
+        rows = [
+            ("SCR001", self.site_id, self.study_open_datetime + timedelta(days=10)),
+            ("SCR001", self.site_id, self.cdef2.end + timedelta(days=1)),
+            ("SCR003", 9999, self.study_open_datetime + timedelta(days=10)),
+        ]
+        cdefs = resolver.resolve(rows, raise_on_error=False)
+        self.assertEqual(cdefs, [self.cdef1, None, None])
+        self.assertEqual(list(resolver.errors), [1, 2])
+        for error in resolver.errors.values():
+            self.assertIsInstance(error, ConsentDefinitionDoesNotExist)
+
+    @patch("edc_consent.next_consent.CHUNK_SIZE", 2)
+    def test_get_consented_chunks(self):
+        resolver = NextConsentResolver("consent_app.subjectscreening")
+        with self.assertNumQueries(2):
+            consented = resolver.get_consented(["SCR001", "SCR002", "SCR003"])
+        self.assertEqual(consented, {("SCR002", self.cdef1.version)})
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sites.models import Site
+from django.test import RequestFactory, TestCase, override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_registration.models import RegisteredSubject
+from edc_utils import get_utcnow
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from model_bakery import baker
+
+from consent_app.models import CrfOne, SubjectVisit
+from consent_app.visit_schedules import get_visit_schedule
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import DashboardView, consent_definition_factory
+from ..test_case_mixins import ConsentQueryBudgetTestCaseMixin
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestQueryBudgets(ConsentQueryBudgetTestCaseMixin, TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+        )
+        site_consents.register(self.cdef1)
+        site_consents.register(self.cdef2)
+        site_visit_schedules._registry = {}
+        self.visit_schedule = get_visit_schedule([self.cdef1, self.cdef2])
+        site_visit_schedules.register(self.visit_schedule)
+        self.subject_identifier = "12345"
+        self.dob = self.study_open_datetime - relativedelta(years=25)
+
+    def make_consent_v1(self):
+        return baker.make_recipe(
+            self.cdef1.model,
+            subject_identifier=self.subject_identifier,
+            consent_datetime=self.study_open_datetime + timedelta(days=1),
+            dob=self.dob,
+        )
+
+    def test_save_consent(self):
+        subject_consent = baker.prepare_recipe(
+            self.cdef1.model,
+            subject_identifier=self.subject_identifier,
+            consent_datetime=self.study_open_datetime + timedelta(days=1),
+            dob=self.dob,
+        )
+        self.assertSaveConsentQueries(subject_consent)
+
+    def test_zero_max_queries_is_a_budget(self):
+        subject_consent = baker.prepare_recipe(
+            self.cdef1.model,
+            subject_identifier=self.subject_identifier,
+            consent_datetime=self.study_open_datetime + timedelta(days=1),
+            dob=self.dob,
+        )
+        with self.assertRaises(self.failureException):
+            self.assertSaveConsentQueries(subject_consent, max_queries=0)
+
+    def test_save_reconsent(self):
+        self.make_consent_v1()
+        subject_consent = baker.prepare_recipe(
+            self.cdef2.model,
+            subject_identifier=self.subject_identifier,
+            consent_datetime=self.study_open_datetime + timedelta(days=60),
+            dob=self.dob,
+        )
+        self.assertSaveReconsentQueries(subject_consent)
+
+    def test_save_crf(self):
+        self.make_consent_v1()
+        RegisteredSubject.objects.get_or_create(subject_identifier=self.subject_identifier)
+        subject_visit = SubjectVisit.objects.create(
+            report_datetime=self.study_open_datetime + timedelta(days=1),
+            subject_identifier=self.subject_identifier,
+            visit_schedule_name=self.visit_schedule.name,
+            schedule_name="schedule1",
+        )
+        crf_one = CrfOne(
+            subject_visit=subject_visit,
+            subject_identifier=self.subject_identifier,
+            report_datetime=self.study_open_datetime + timedelta(days=2),
+        )
+        self.assertSaveCrfQueries(crf_one)
+
+    def test_consent_view(self):
+        self.make_consent_v1()
+        request = RequestFactory().get("/")
+        request.site = Site.objects.get_current()
+        request.session = "session"
+        request._messages = FallbackStorage(request)
+        view = DashboardView(
+            request=request,
+            subject_identifier=self.subject_identifier,
+            report_datetime=self.study_open_datetime + timedelta(days=2),
+            current_schedule=self.visit_schedule.schedules.get("schedule1"),
+        )
+        self.assertConsentViewQueries(view)
+        self.assertEqual(view.consent.version, "1.0")
+        self.assertMaxQueries(0, view.get_context_data)
@@ -0,0 +1,97 @@
+import csv
+from datetime import timedelta
+from io import StringIO
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from edc_consent.exceptions import ConsentDefinitionError
+from edc_consent.reconsent_worklist import ReconsentWorklist
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestReconsentWorklist(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.cdef1,
+        )
+        site_consents.register(self.cdef1, updated_by=self.cdef2)
+        site_consents.register(self.cdef2)
+        self.subject_identifiers = [f"S00{i}" for i in range(1, 6)]
+        for index, subject_identifier in enumerate(self.subject_identifiers):
+            baker.make_recipe(
+                self.cdef1.model,
+                subject_identifier=subject_identifier,
+                first_name=f"NAME{subject_identifier}",
+                identity=f"12345678{index}",
+                confirm_identity=f"12345678{index}",
+                consent_datetime=self.study_open_datetime + timedelta(days=1),
+                dob=self.study_open_datetime - relativedelta(years=25),
+            )
+        for subject_identifier in ["S001", "S003"]:
+            baker.make_recipe(
+                self.cdef2.model,
+                subject_identifier=subject_identifier,
+                first_name=f"NAME{subject_identifier}",
+                consent_datetime=self.study_open_datetime + timedelta(days=60),
+                dob=self.study_open_datetime - relativedelta(years=25),
+            )
+
+    def test_worklist(self):
+        worklist = ReconsentWorklist(self.cdef2)
+        self.assertEqual(
+            [row["subject_identifier"] for row in worklist], ["S002", "S004", "S005"]
+        )
+        self.assertEqual(worklist.count(), 3)
+        site_id = self.cdef2.sites[0].site_id
+        self.assertEqual(worklist.counts(), {(site_id, "1.0"): 3})
+        self.assertEqual(ReconsentWorklist(self.cdef2, site_id=9999).count(), 0)
+
+    def test_keyset_pages(self):
+        worklist = ReconsentWorklist(self.cdef2, page_size=2)
+        rows, after = worklist.page()
+        self.assertEqual([row["subject_identifier"] for row in rows], ["S002", "S004"])
+        self.assertEqual(after, ("S004", rows[-1]["id"]))
+        with self.assertNumQueries(1):
+            rows, after = worklist.page(after=after)
+        self.assertEqual([row["subject_identifier"] for row in rows], ["S005"])
+        self.assertIsNone(after)
+
+    def test_requires_updates(self):
+        self.assertRaises(ConsentDefinitionError, ReconsentWorklist, self.cdef1)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("reconsent_worklist", self.cdef2.name, "--page-size=1", stdout=out)
+        rows = list(csv.reader(StringIO(out.getvalue())))
+        self.assertEqual(rows[0][0], "subject_identifier")
+        self.assertEqual([row[0] for row in rows[1:]], ["S002", "S004", "S005"])
+        self.assertEqual({row[2] for row in rows[1:]}, {"1.0"})
+        self.assertRaises(
+            CommandError, call_command, "reconsent_worklist", self.cdef1.name, stdout=out
+        )
+        self.assertRaises(CommandError, call_command, "reconsent_worklist", "blah", stdout=out)
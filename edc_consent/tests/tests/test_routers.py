@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import SubjectConsentV1, SubjectConsentV1Ext, SubjectScreening
+from edc_consent.routers import ConsentReadRouter, consent_written_in_transaction
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+    EDC_CONSENT_READ_DATABASE="replica",
+    DATABASE_ROUTERS=["edc_consent.routers.ConsentReadRouter"],
+)
+class TestRouters(TestCase):
+    databases = {DEFAULT_DB_ALIAS, "replica"}
+
+    def setUp(self):
+        # the replica mirrors the sqlite in-memory test database through a
+        # second connection in its own transaction. Read uncommitted so the
+        # replica does not hold table locks that block writes to default.
+        if connections["replica"].vendor == "sqlite":
+            with connections["replica"].cursor() as cursor:
+                cursor.execute("PRAGMA read_uncommitted = true")
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        site_consents.register(self.cdef)
+
+    def make_consent(self):
+        return baker.make_recipe(
+            self.cdef.model,
+            subject_identifier="S001",
+            first_name="NAME",
+            consent_datetime=self.study_open_datetime + timedelta(days=1),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(SubjectConsentV1.objects.all().db, "replica")
+        self.assertEqual(SubjectConsentV1Ext.objects.all().db, "replica")
+        self.assertEqual(SubjectScreening.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_writes_go_to_primary(self):
+        router = ConsentReadRouter()
+        self.assertEqual(router.db_for_write(SubjectConsentV1), DEFAULT_DB_ALIAS)
+        self.assertIsNone(router.db_for_write(SubjectScreening))
+        self.assertFalse(router.allow_migrate("replica", "consent_app"))
+
+    @override_settings(EDC_CONSENT_READ_DATABASE=None)
+    def test_not_configured(self):
+        self.assertEqual(SubjectConsentV1.objects.all().db, DEFAULT_DB_ALIAS)
+        self.assertIsNone(ConsentReadRouter().db_for_write(SubjectConsentV1))
+
+    def test_get_consent_for_reads_from_replica(self):
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            self.cdef.get_consent_for(subject_identifier="S001", raise_if_not_consented=False)
+        self.assertEqual(len(replica_queries), 1)
+        with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary_queries:
+            self.cdef.get_consent_for(
+                subject_identifier="S001", raise_if_not_consented=False, using="default"
+            )
+        self.assertEqual(len(primary_queries), 1)
+
+    def test_reads_stick_to_primary_after_write(self):
+        self.assertFalse(consent_written_in_transaction())
+        subject_consent = self.make_consent()
+        self.assertTrue(consent_written_in_transaction())
+        self.assertEqual(SubjectConsentV1.objects.all().db, DEFAULT_DB_ALIAS)
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            consent_obj = self.cdef.get_consent_for(subject_identifier="S001")
+        self.assertEqual(len(replica_queries), 0)
+        self.assertEqual(consent_obj.id, subject_consent.id)
+        self.assertEqual(consent_obj._state.db, DEFAULT_DB_ALIAS)
@@ -0,0 +1,111 @@
+import json
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.core import serializers
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from edc_constants.constants import NO, YES
+from edc_utils import get_utcnow
+
+from consent_app.models import SubjectConsentV1, SubjectConsentV1Ext
+from edc_consent.managers import _natural_keys, natural_key_cache
+from edc_consent.serialization import (
+    bulk_deserialize,
+    get_natural_key_manager,
+    get_natural_keys,
+    load_objects,
+)
+
+from ..consent_test_utils import ConsentExtensionFixtureMixin
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestSerialization(ConsentExtensionFixtureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.extensions = [
+            SubjectConsentV1Ext.objects.create(
+                subject_consent=consent_obj,
+                report_datetime=self.study_open_datetime + timedelta(days=30),
+                agrees_to_extension=YES,
+            )
+            for consent_obj in self.consents
+        ]
+
+    def get_payload(self) -> str:
+        consents = json.loads(
+            serializers.serialize(
+                "json",
+                SubjectConsentV1.objects.all(),
+                use_natural_primary_keys=True,
+                use_natural_foreign_keys=True,
+            )
+        )
+        extensions = json.loads(
+            serializers.serialize(
+                "json", SubjectConsentV1Ext.objects.all(), use_natural_foreign_keys=True
+            )
+        )
+        return json.dumps(consents + extensions)
+
+    def test_natural_keys(self):
+        natural_keys = get_natural_keys(load_objects("json", self.get_payload()))
+        self.assertEqual(list(natural_keys), [SubjectConsentV1])
+        self.assertEqual(
+            {str(obj.subject_identifier_as_pk) for obj in self.consents},
+            natural_keys[SubjectConsentV1],
+        )
+
+    def test_get_by_natural_keys(self):
+        keys = [obj.subject_identifier_as_pk for obj in self.consents]
+        with natural_key_cache():
+            # 5 keys in chunks of 3
+            with self.assertNumQueries(2):
+                instances = SubjectConsentV1.objects.get_by_natural_keys(keys, chunk_size=3)
+            with self.assertNumQueries(0):
+                obj = SubjectConsentV1.objects.get_by_natural_key(str(keys[0]))
+        self.assertEqual(len(instances), 5)
+        self.assertEqual(obj.pk, self.consents[0].pk)
+        with self.assertNumQueries(1):
+            SubjectConsentV1.objects.get_by_natural_key(keys[0])
+
+    def test_natural_key_manager(self):
+        self.assertIs(get_natural_key_manager(SubjectConsentV1), SubjectConsentV1.objects)
+        self.assertIsNone(get_natural_key_manager(SubjectConsentV1Ext))
+
+    def test_bulk_deserialize(self):
+        payload = self.get_payload()
+        with CaptureQueriesContext(connection) as context:
+            objects = bulk_deserialize("json", payload)
+        # one query to resolve the 5 consent natural keys
+        db_table = f'"{SubjectConsentV1._meta.db_table}"'
+        self.assertEqual(
+            len([query for query in context.captured_queries if db_table in query["sql"]]), 1
+        )
+        self.assertEqual(
+            {(obj.object.pk, obj.object._meta.label_lower) for obj in objects},
+            {(obj.pk, SubjectConsentV1._meta.label_lower) for obj in self.consents}
+            | {(obj.pk, SubjectConsentV1Ext._meta.label_lower) for obj in self.extensions},
+        )
+        self.assertEqual(
+            {obj.object.subject_consent_id for obj in objects[5:]},
+            {obj.id for obj in self.consents},
+        )
+        # the natural key cache is closed on return
+        self.assertIsNone(_natural_keys.get())
+
+    def test_bulk_deserialize_and_save(self):
+        objects = load_objects("json", self.get_payload())
+        for item in objects[5:]:
+            item["fields"]["agrees_to_extension"] = NO
+        for deserialized_object in bulk_deserialize("python", objects):
+            deserialized_object.save()
+        self.assertEqual(SubjectConsentV1.objects.count(), 5)
+        self.assertEqual(SubjectConsentV1Ext.objects.filter(agrees_to_extension=NO).count(), 5)
@@ -0,0 +1,335 @@
+import json
+import sys
+import tempfile
+from datetime import timedelta
+from importlib import invalidate_caches
+from io import StringIO
+from pathlib import Path
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.module_loading import import_module
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+
+from edc_consent.consent_definition_extension import ConsentDefinitionExtension
+from edc_consent.site_consents import site_consents
+from edc_consent.snapshot import (
+    SNAPSHOT_VERSION,
+    ConsentSnapshot,
+    SnapshotError,
+    SnapshotLookupError,
+)
+
+from ..consent_test_utils import consent_definition_factory
+
+# a `consents` module registering the same definitions as
+# `TestSnapshot.setUp`, with the end of v2 in days as `{cdef2_end}`
+CONSENTS_MODULE = """
+from datetime import timedelta
+
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+
+from edc_consent.consent_definition_extension import ConsentDefinitionExtension
+from edc_consent.site_consents import site_consents
+from edc_consent.tests.consent_test_utils import consent_definition_factory
+
+study_open_datetime = ResearchProtocolConfig().study_open_datetime
+cdef1 = consent_definition_factory(
+    model="consent_app.subjectconsentv1",
+    start=study_open_datetime,
+    end=study_open_datetime + timedelta(days=50),
+    version="1.0",
+)
+cdef2 = consent_definition_factory(
+    model="consent_app.subjectconsentv2",
+    start=study_open_datetime + timedelta(days=40),
+    end=study_open_datetime + timedelta(days={cdef2_end}),
+    version="2.0",
+    updates=cdef1,
+)
+extension = ConsentDefinitionExtension(
+    "consent_app.subjectconsentv1ext",
+    version="1.1",
+    start=study_open_datetime + timedelta(days=20),
+    extends=cdef1,
+    timepoints=[1, 2],
+)
+site_consents.register(cdef1, updated_by=cdef2, extended_by=extension)
+site_consents.register(cdef2)
+"""
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestSnapshot(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=40),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.cdef1,
+        )
+        self.extension = ConsentDefinitionExtension(
+            "consent_app.subjectconsentv1ext",
+            version="1.1",
+            start=self.study_open_datetime + timedelta(days=20),
+            extends=self.cdef1,
+            timepoints=[1, 2],
+        )
+        site_consents.register(self.cdef1, updated_by=self.cdef2, extended_by=self.extension)
+        site_consents.register(self.cdef2)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "consents.json"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def import_consents_module(self, name: str, cdef2_end: int = 100):
+        """Writes and imports a `consents` module, see CONSENTS_MODULE."""
+        (Path(self.tmpdir.name) / f"{name}.py").write_text(
+            CONSENTS_MODULE.replace("{cdef2_end}", str(cdef2_end))
+        )
+        sys.path.insert(0, self.tmpdir.name)
+        self.addCleanup(sys.path.remove, self.tmpdir.name)
+        self.addCleanup(sys.modules.pop, name, None)
+        return import_module(name)
+
+    def test_export(self):
+        data = site_consents.export_snapshot(path=self.path)
+        self.assertEqual(data["version"], SNAPSHOT_VERSION)
+        self.assertEqual(json.loads(self.path.read_text()), data)
+        self.assertEqual(
+            [item["name"] for item in data["cdefs"]], [self.cdef1.name, self.cdef2.name]
+        )
+        item = data["cdefs"][0]
+        self.assertEqual(item["updated_by"], self.cdef2.name)
+        self.assertEqual(item["extended_by"]["version"], "1.1")
+        self.assertEqual(item["extended_by"]["timepoints"], [1, 2])
+        self.assertEqual(data["cdefs"][1]["updates"], self.cdef1.name)
+
+    def test_resolve(self):
+        site_consents.export_snapshot(path=self.path)
+        snapshot = ConsentSnapshot.load(self.path)
+        self.assertEqual(len(snapshot), 2)
+        site_id = min(snapshot.get(self.cdef1.name).site_ids)
+        for days, version in [(1, "1.0"), (45, "2.0"), (60, "2.0")]:
+            report_datetime = self.study_open_datetime + timedelta(days=days)
+            with self.subTest(days=days):
+                self.assertEqual(snapshot.resolve(site_id, report_datetime).version, version)
+                self.assertEqual(
+                    site_consents.get_consent_definition(
+                        report_datetime=report_datetime
+                    ).version,
+                    version,
+                )
+        self.assertEqual(
+            snapshot.resolve_version(
+                site_id, self.study_open_datetime + timedelta(days=30), extended=True
+            ),
+            "1.1",
+        )
+        self.assertEqual(
+            snapshot.resolve_version(
+                site_id, self.study_open_datetime + timedelta(days=10), extended=True
+            ),
+            "1.0",
+        )
+        self.assertRaises(
+            SnapshotLookupError,
+            snapshot.resolve,
+            site_id,
+            self.study_open_datetime + timedelta(days=200),
+        )
+        self.assertRaises(
+            SnapshotLookupError,
+            snapshot.resolve,
+            9999,
+            self.study_open_datetime + timedelta(days=1),
+        )
+        self.assertRaises(
+            ValueError,
+            snapshot.resolve,
+            site_id,
+            (self.study_open_datetime + timedelta(days=1)).replace(tzinfo=None),
+        )
+
+    def test_resolve_many(self):
+        snapshot = ConsentSnapshot(site_consents.export_snapshot())
+        site_id = min(snapshot.get(self.cdef1.name).site_ids)
+        report_datetimes = [
+            self.study_open_datetime - timedelta(days=1),
+            self.study_open_datetime,
+            self.study_open_datetime + timedelta(days=45),
+            self.cdef1.end,
+            self.cdef2.end,
+            self.cdef2.end + timedelta(seconds=1),
+        ]
+        expected = []
+        for report_datetime in report_datetimes:
+            try:
+                expected.append(snapshot.resolve(site_id, report_datetime))
+            except SnapshotLookupError:
+                expected.append(None)
+        self.assertEqual(snapshot.resolve_many(site_id, report_datetimes), expected)
+        self.assertEqual(
+            [getattr(entry, "version", None) for entry in expected],
+            [None, "1.0", "2.0", "2.0", "2.0", None],
+        )
+        self.assertEqual(snapshot.resolve_many(9999, report_datetimes[1:2]), [None])
+
+    def test_load_snapshot(self):
+        site_consents.export_snapshot(path=self.path)
+        site_consents.registry = {}
+        site_consents.load_snapshot(self.path)
+        self.assertEqual(list(site_consents.registry), [self.cdef1.name, self.cdef2.name])
+        cdef1 = site_consents.get(self.cdef1.name)
+        cdef2 = site_consents.get(self.cdef2.name)
+        self.assertEqual(cdef1, self.cdef1)
+        self.assertEqual(cdef1.end, self.cdef1.end)
+        self.assertIs(cdef1.updated_by, cdef2)
+        self.assertIs(cdef2.updates, cdef1)
+        self.assertEqual(cdef1.extended_by, self.extension)
+        self.assertIs(cdef1.extended_by.extends, cdef1)
+        self.assertEqual(cdef1.extended_by.timepoints, frozenset([1, 2]))
+        self.assertEqual(
+            site_consents.get_consent_definition(
+                report_datetime=self.study_open_datetime + timedelta(days=45)
+            ),
+            cdef2,
+        )
+
+    def add_consents_module_to_app(self, name: str, cdef2_end: int = 100) -> None:
+        """Writes a `consents` module, see CONSENTS_MODULE, that
+        autodiscover finds in consent_app.
+        """
+        consent_app = import_module("consent_app")
+        (Path(self.tmpdir.name) / f"{name}.py").write_text(
+            CONSENTS_MODULE.replace("{cdef2_end}", str(cdef2_end))
+        )
+        consent_app.__path__.append(self.tmpdir.name)
+        self.addCleanup(consent_app.__path__.remove, self.tmpdir.name)
+        self.addCleanup(sys.modules.pop, f"consent_app.{name}", None)
+
+    def test_autodiscover_with_snapshot(self):
+        site_consents.export_snapshot(path=self.path)
+        site_consents.registry = {}
+        self.add_consents_module_to_app("snapshot_consents")
+        with override_settings(EDC_CONSENT_SNAPSHOT=str(self.path)):
+            site_consents.autodiscover(module_name="snapshot_consents", verbose=False)
+        self.assertEqual(list(site_consents.registry), [self.cdef1.name, self.cdef2.name])
+        # the consents module was imported and replaced the loaded definitions
+        self.assertFalse(site_consents.from_snapshot(self.cdef1.name))
+        self.assertFalse(site_consents.from_snapshot(self.cdef2.name))
+
+    def test_autodiscover_with_stale_snapshot_raises(self):
+        site_consents.export_snapshot(path=self.path)
+        site_consents.registry = {}
+        self.add_consents_module_to_app("stale_autodiscover_consents", cdef2_end=110)
+        with override_settings(EDC_CONSENT_SNAPSHOT=str(self.path)):
+            with self.assertRaises(SnapshotError) as cm:
+                site_consents.autodiscover(
+                    module_name="stale_autodiscover_consents", verbose=False
+                )
+        self.assertIn(self.cdef2.name, str(cm.exception))
+
+    def test_autodiscover_with_snapshot_not_registered_raises(self):
+        # the snapshot lists a consents module since removed
+        self.add_consents_module_to_app("removed_consents")
+        site_consents.export_snapshot(path=self.path, module_name="removed_consents")
+        (Path(self.tmpdir.name) / "removed_consents.py").unlink()
+        invalidate_caches()
+        site_consents.registry = {}
+        with override_settings(EDC_CONSENT_SNAPSHOT=str(self.path)):
+            with self.assertRaises(SnapshotError) as cm:
+                site_consents.autodiscover(module_name="removed_consents", verbose=False)
+        self.assertIn(self.cdef1.name, str(cm.exception))
+
+    def test_autodiscover_with_unchanged_snapshot_skips_import(self):
+        self.add_consents_module_to_app("unchanged_consents")
+        data = site_consents.export_snapshot(path=self.path, module_name="unchanged_consents")
+        self.assertEqual(list(data["sources"]), ["consent_app.unchanged_consents"])
+        site_consents.registry = {}
+        with override_settings(EDC_CONSENT_SNAPSHOT=str(self.path)):
+            site_consents.autodiscover(module_name="unchanged_consents", verbose=False)
+        self.assertNotIn("consent_app.unchanged_consents", sys.modules)
+        self.assertEqual(list(site_consents.registry), [self.cdef1.name, self.cdef2.name])
+        self.assertTrue(site_consents.from_snapshot(self.cdef1.name))
+        self.assertTrue(site_consents.from_snapshot(self.cdef2.name))
+
+    def test_autodiscover_with_changed_source_imports(self):
+        self.add_consents_module_to_app("changed_consents")
+        site_consents.export_snapshot(path=self.path, module_name="changed_consents")
+        # edited after the snapshot was exported, same definitions
+        with (Path(self.tmpdir.name) / "changed_consents.py").open("a") as f:
+            f.write("# edited\n")
+        site_consents.registry = {}
+        with override_settings(EDC_CONSENT_SNAPSHOT=str(self.path)):
+            site_consents.autodiscover(module_name="changed_consents", verbose=False)
+        self.assertIn("consent_app.changed_consents", sys.modules)
+        self.assertFalse(site_consents.from_snapshot(self.cdef1.name))
+
+    def test_import_consents_after_snapshot(self):
+        site_consents.export_snapshot(path=self.path)
+        site_consents.registry = {}
+        site_consents.load_snapshot(self.path)
+        consents = self.import_consents_module("snapshot_consents")
+        self.assertEqual(list(site_consents.registry), [self.cdef1.name, self.cdef2.name])
+        # the registry holds the code-registered definitions
+        self.assertIs(site_consents.get(self.cdef1.name), consents.cdef1)
+        self.assertIs(site_consents.get(self.cdef2.name), consents.cdef2)
+        self.assertFalse(site_consents.from_snapshot(self.cdef1.name))
+        self.assertEqual(
+            site_consents.get_consent_definition(
+                report_datetime=self.study_open_datetime + timedelta(days=45)
+            ),
+            consents.cdef2,
+        )
+
+    def test_import_consents_after_stale_snapshot_raises(self):
+        site_consents.export_snapshot(path=self.path)
+        site_consents.registry = {}
+        site_consents.load_snapshot(self.path)
+        with self.assertRaises(SnapshotError) as cm:
+            self.import_consents_module("stale_snapshot_consents", cdef2_end=110)
+        self.assertIn(self.cdef2.name, str(cm.exception))
+
+    def test_register_not_in_snapshot_raises(self):
+        site_consents.export_snapshot(path=self.path)
+        site_consents.registry = {}
+        site_consents.load_snapshot(self.path)
+        cdef3 = consent_definition_factory(
+            model="consent_app.subjectconsentv3",
+            start=self.study_open_datetime + timedelta(days=101),
+            end=self.study_open_datetime + timedelta(days=150),
+            version="3.0",
+        )
+        self.assertRaises(SnapshotError, site_consents.register, cdef3)
+
+    def test_bad_snapshot_raises(self):
+        data = site_consents.export_snapshot()
+        data.update(version=SNAPSHOT_VERSION + 1)
+        self.path.write_text(json.dumps(data))
+        self.assertRaises(SnapshotError, ConsentSnapshot.load, self.path)
+        self.path.write_text(json.dumps({}))
+        self.assertRaises(SnapshotError, site_consents.load_snapshot, self.path)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("export_consent_snapshot", str(self.path), stdout=out)
+        self.assertIn("Wrote 2 consent definitions", out.getvalue())
+        self.assertEqual(len(ConsentSnapshot.load(self.path)), 2)
@@ -0,0 +1,141 @@
+from datetime import timedelta
+from io import StringIO
+
+from dateutil.relativedelta import relativedelta
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from edc_constants.constants import YES
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import SubjectConsentV1Ext
+from edc_consent.consent_definition_extension import ConsentDefinitionExtension
+from edc_consent.models import SubjectConsentTimeline
+from edc_consent.site_consents import site_consents
+from edc_consent.timeline import check_timeline, rebuild_timeline
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+    EDC_CONSENT_TIMELINE=True,
+)
+class TestTimeline(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.cdef1,
+        )
+        self.extension = ConsentDefinitionExtension(
+            "consent_app.subjectconsentv1ext",
+            version="1.1",
+            start=self.study_open_datetime + timedelta(days=20),
+            extends=self.cdef1,
+            timepoints=[1, 2],
+        )
+        site_consents.register(self.cdef1, updated_by=self.cdef2, extended_by=self.extension)
+        site_consents.register(self.cdef2)
+        self.consents = {}
+        for index, subject_identifier in enumerate(["S001", "S002", "S003"]):
+            self.consents[subject_identifier] = baker.make_recipe(
+                self.cdef1.model,
+                subject_identifier=subject_identifier,
+                first_name=f"NAME{index}",
+                identity=f"12345678{index}",
+                confirm_identity=f"12345678{index}",
+                consent_datetime=self.study_open_datetime + timedelta(days=1),
+                dob=self.study_open_datetime - relativedelta(years=25),
+            )
+        # S001 re-consents to v2
+        self.reconsent = baker.make_recipe(
+            self.cdef2.model,
+            subject_identifier="S001",
+            first_name="NAME0",
+            consent_datetime=self.study_open_datetime + timedelta(days=60),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+
+    def get_version(self, subject_identifier, days):
+        report_datetime = self.study_open_datetime + timedelta(days=days)
+        obj = SubjectConsentTimeline.objects.consented_at(subject_identifier, report_datetime)
+        return obj.get_version(report_datetime) if obj else None
+
+    def test_updated_on_save(self):
+        self.assertEqual(
+            SubjectConsentTimeline.objects.filter(subject_identifier="S001").count(), 2
+        )
+        self.assertIsNone(self.get_version("S001", 0))
+        self.assertEqual(self.get_version("S001", 10), "1.0")
+        # v1 is valid until the v2 consent
+        self.assertEqual(self.get_version("S001", 55), "1.0")
+        self.assertEqual(self.get_version("S001", 70), "2.0")
+        self.assertEqual(self.get_version("S002", 10), "1.0")
+        self.assertIsNone(self.get_version("S002", 70))
+        self.assertIsNone(self.get_version("S999", 10))
+        with self.assertNumQueries(1):
+            SubjectConsentTimeline.objects.consented_at(
+                "S001", self.study_open_datetime + timedelta(days=10)
+            )
+
+    def test_extension(self):
+        self.assertEqual(self.get_version("S003", 30), "1.0")
+        consent_extension = SubjectConsentV1Ext.objects.create(
+            subject_consent=self.consents["S003"],
+            report_datetime=self.study_open_datetime + timedelta(days=30),
+            agrees_to_extension=YES,
+        )
+        self.assertEqual(self.get_version("S003", 10), "1.0")
+        self.assertEqual(self.get_version("S003", 30), "1.1")
+        consent_extension.delete()
+        self.assertEqual(self.get_version("S003", 30), "1.0")
+
+    def test_updated_on_delete(self):
+        self.reconsent.delete()
+        self.assertEqual(
+            SubjectConsentTimeline.objects.filter(subject_identifier="S001").count(), 1
+        )
+        self.assertIsNone(self.get_version("S001", 55))
+
+    @override_settings(EDC_CONSENT_TIMELINE=False)
+    def test_disabled(self):
+        self.reconsent.delete()
+        self.assertEqual(
+            SubjectConsentTimeline.objects.filter(subject_identifier="S001").count(), 2
+        )
+
+    def test_check_and_rebuild(self):
+        self.assertEqual(check_timeline(), [])
+        SubjectConsentTimeline.objects.filter(subject_identifier="S002").update(
+            end=self.study_open_datetime + timedelta(days=90)
+        )
+        SubjectConsentTimeline.objects.filter(subject_identifier="S003").delete()
+        self.assertEqual(check_timeline(batch_size=1), ["S002", "S003"])
+        self.assertEqual(rebuild_timeline(batch_size=2), 4)
+        self.assertEqual(check_timeline(), [])
+
+    def test_command(self):
+        SubjectConsentTimeline.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_consent_timeline", "--check", stdout=StringIO())
+        out = StringIO()
+        call_command("rebuild_consent_timeline", stdout=out)
+        self.assertIn("Created 4 consent timeline rows", out.getvalue())
+        out = StringIO()
+        call_command("rebuild_consent_timeline", "--check", stdout=out)
+        self.assertIn("consistent", out.getvalue())
@@ -0,0 +1,178 @@
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.messages import get_messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sites.models import Site
+from django.test import RequestFactory, TestCase, override_settings
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+from model_bakery import baker
+
+from consent_app.models import SubjectConsent
+from consent_app.visit_schedules import get_visit_schedule
+from edc_consent.site_consents import site_consents
+from edc_consent.view_mixins.consent_view_mixins import NOT_FETCHED
+
+from ..consent_test_utils import DashboardView, consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestConsentViewMixin(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        site_consents.register(self.cdef1)
+        site_visit_schedules._registry = {}
+        self.visit_schedule = get_visit_schedule([self.cdef1])
+        site_visit_schedules.register(self.visit_schedule)
+        self.subject_identifier = "12345"
+
+    def make_consent(self):
+        return baker.make_recipe(
+            self.cdef1.model,
+            subject_identifier=self.subject_identifier,
+            first_name="NAME",
+            consent_datetime=self.study_open_datetime + timedelta(days=1),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+
+    def get_view(self, report_datetime=None, current_schedule=True):
+        request = RequestFactory().get("/")
+        request.site = Site.objects.get_current()
+        request.session = "session"
+        request._messages = FallbackStorage(request)
+        return DashboardView(
+            request=request,
+            subject_identifier=self.subject_identifier,
+            report_datetime=report_datetime or self.study_open_datetime + timedelta(days=2),
+            current_schedule=(
+                self.visit_schedule.schedules.get("schedule1") if current_schedule else None
+            ),
+        )
+
+    def test_nothing_fetched_on_init(self):
+        with self.assertNumQueries(0):
+            view = self.get_view()
+        self.assertIs(view._consent, NOT_FETCHED)
+        self.assertIs(view._consents, NOT_FETCHED)
+        self.assertIs(view._consent_definition, NOT_FETCHED)
+        self.assertIs(view._consent_extension, NOT_FETCHED)
+
+    def test_consent_fetched_once(self):
+        consent = self.make_consent()
+        view = self.get_view()
+        self.assertIsInstance(view.consent, SubjectConsent)
+        self.assertEqual(view.consent.pk, consent.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(view.consent.pk, consent.pk)
+
+    def test_not_consented_caches_none_and_messages_once(self):
+        view = self.get_view()
+        self.assertIsNone(view.consent)
+        self.assertIsNot(view._consent, NOT_FETCHED)
+        with self.assertNumQueries(0):
+            self.assertIsNone(view.consent)
+        self.assertEqual(len(list(get_messages(view.request))), 1)
+
+    def test_consent_definition_none_is_cached(self):
+        view = self.get_view(current_schedule=False)
+        self.assertIsNone(view.consent_definition)
+        self.assertIsNone(view._consent_definition)
+        self.assertIsNone(view.consent_extension)
+
+    def test_consent_extension_none_is_cached(self):
+        self.make_consent()
+        view = self.get_view()
+        self.assertIsNone(view.consent_extension)
+        self.assertIsNone(view._consent_extension)
+        with self.assertNumQueries(0):
+            self.assertIsNone(view.consent_extension)
+
+    def test_prefetch_consent_context(self):
+        consent = self.make_consent()
+        view = self.get_view()
+        view.prefetch_consent_context()
+        with self.assertNumQueries(0):
+            context = view.get_context_data()
+        self.assertEqual(context["consent_definition"], self.cdef1)
+        self.assertEqual(context["consent"].pk, consent.pk)
+        self.assertIsNone(context["consent_extension"])
+        self.assertEqual([obj.pk for obj in context["consents"]], [consent.pk])
+
+    def test_prefetch_consent_context_without_consent_definition(self):
+        view = self.get_view(report_datetime=self.study_open_datetime + timedelta(days=60))
+        view.prefetch_consent_context()
+        self.assertIs(view._consent, NOT_FETCHED)
+        context = view.get_context_data()
+        self.assertNotIn("consent", context)
+        self.assertEqual(len(list(get_messages(view.request))), 1)
+
+    def test_prefetch_consent_context_queries(self):
+        site_consents.registry = {}
+        cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=cdef1,
+        )
+        cdef3 = consent_definition_factory(
+            model="consent_app.subjectconsentv3",
+            start=self.study_open_datetime + timedelta(days=101),
+            end=self.study_open_datetime + timedelta(days=150),
+            version="3.0",
+            updates=cdef2,
+        )
+        site_consents.register(cdef1, updated_by=cdef2)
+        site_consents.register(cdef2, updated_by=cdef3)
+        site_consents.register(cdef3)
+        site_visit_schedules._registry = {}
+        self.visit_schedule = get_visit_schedule([cdef1, cdef2, cdef3])
+        site_visit_schedules.register(self.visit_schedule)
+        consent1 = self.make_consent()
+        consent2 = baker.make_recipe(
+            cdef2.model,
+            subject_identifier=self.subject_identifier,
+            first_name="NAME",
+            consent_datetime=self.study_open_datetime + timedelta(days=60),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+        for days, consent in [(2, consent1), (70, consent2)]:
+            with self.subTest(days=days):
+                view = self.get_view(
+                    report_datetime=self.study_open_datetime + timedelta(days=days)
+                )
+                # one query for the consents of the three definitions
+                with self.assertNumQueries(1):
+                    view.prefetch_consent_context()
+                self.assertEqual(view.consent.pk, consent.pk)
+                self.assertEqual(
+                    view.consent._meta.label_lower,
+                    site_consents.get_consent_or_raise(
+                        subject_identifier=self.subject_identifier,
+                        report_datetime=view.report_datetime,
+                        site_id=view.request.site.id,
+                    )._meta.label_lower,
+                )
+                self.assertEqual(
+                    [obj.pk for obj in view.consents], [consent1.pk, consent2.pk]
+                )
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from dateutil.relativedelta import relativedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from edc_protocol.research_protocol_config import ResearchProtocolConfig
+from edc_utils import get_utcnow
+from model_bakery import baker
+
+from consent_app.models import SubjectConsent, TestModel
+from edc_consent.exceptions import ConsentError
+from edc_consent.site_consents import site_consents
+
+from ..consent_test_utils import consent_definition_factory
+
+
+@override_settings(
+    EDC_PROTOCOL_STUDY_OPEN_DATETIME=get_utcnow() - relativedelta(years=5),
+    EDC_PROTOCOL_STUDY_CLOSE_DATETIME=get_utcnow() + relativedelta(years=1),
+    EDC_AUTH_SKIP_SITE_AUTHS=True,
+    EDC_AUTH_SKIP_AUTH_UPDATER=False,
+)
+class TestWithConsent(TestCase):
+    def setUp(self):
+        site_consents.registry = {}
+        self.study_open_datetime = ResearchProtocolConfig().study_open_datetime
+        self.cdef1 = consent_definition_factory(
+            model="consent_app.subjectconsentv1",
+            start=self.study_open_datetime,
+            end=self.study_open_datetime + timedelta(days=50),
+            version="1.0",
+        )
+        self.cdef2 = consent_definition_factory(
+            model="consent_app.subjectconsentv2",
+            start=self.study_open_datetime + timedelta(days=51),
+            end=self.study_open_datetime + timedelta(days=100),
+            version="2.0",
+            updates=self.cdef1,
+        )
+        site_consents.register(self.cdef1, updated_by=self.cdef2)
+        site_consents.register(self.cdef2)
+        self.consents = {}
+        for index, subject_identifier in enumerate(["S001", "S002"]):
+            self.consents[subject_identifier] = baker.make_recipe(
+                self.cdef1.model,
+                subject_identifier=subject_identifier,
+                first_name=f"NAME{index}",
+                identity=f"12345678{index}",
+                confirm_identity=f"12345678{index}",
+                consent_datetime=self.study_open_datetime + timedelta(days=1),
+                dob=self.study_open_datetime - relativedelta(years=25),
+            )
+        self.reconsent = baker.make_recipe(
+            self.cdef2.model,
+            subject_identifier="S001",
+            first_name="NAME0",
+            consent_datetime=self.study_open_datetime + timedelta(days=60),
+            dob=self.study_open_datetime - relativedelta(years=25),
+        )
+        site_id = self.consents["S001"].site_id
+        # bulk_create skips the requires consent pre_save signal
+        self.rows = TestModel.objects.bulk_create(
+            [
+                TestModel(
+                    id=uuid4(),
+                    subject_identifier=subject_identifier,
+                    report_datetime=self.study_open_datetime + timedelta(days=days),
+                    site_id=site_id,
+                )
+                for subject_identifier, days in [
+                    ("S001", 10),
+                    ("S001", 55),
+                    ("S001", 70),
+                    ("S002", 10),
+                    ("S002", 70),
+                    ("S999", 10),
+                ]
+            ]
+        )
+
+    def test_with_consent(self):
+        # the rows, then the version and consent_datetime of the consents
+        with self.assertNumQueries(2):
+            objs = {obj.id: obj for obj in TestModel.objects.with_consent()}
+        expected = [
+            ("1.0", self.consents["S001"]),
+            # the v2 consent, though dated after report_datetime
+            ("2.0", self.reconsent),
+            ("2.0", self.reconsent),
+            ("1.0", self.consents["S002"]),
+            ("2.0", None),
+            ("1.0", None),
+        ]
+        for row, (cdef_version, consent_obj) in zip(self.rows, expected):
+            obj = objs[row.id]
+            with self.subTest(
+                subject_identifier=obj.subject_identifier, report_datetime=obj.report_datetime
+            ):
+                self.assertEqual(obj.cdef_version, cdef_version)
+                if consent_obj:
+                    self.assertEqual(obj.resolved_consent_id, consent_obj.id)
+                    self.assertEqual(obj.resolved_consent_version, consent_obj.version)
+                    self.assertEqual(
+                        obj.resolved_consent_datetime, consent_obj.consent_datetime
+                    )
+                else:
+                    self.assertIsNone(obj.resolved_consent_id)
+                    self.assertIsNone(obj.resolved_consent_version)
+
+    def test_matches_get_consent_or_raise(self):
+        for obj in TestModel.objects.with_consent():
+            consent_obj = site_consents.get_consent_or_raise(
+                subject_identifier=obj.subject_identifier,
+                report_datetime=obj.report_datetime,
+                site_id=obj.site_id,
+                raise_if_not_consented=False,
+            )
+            with self.subTest(
+                subject_identifier=obj.subject_identifier, report_datetime=obj.report_datetime
+            ):
+                self.assertEqual(
+                    obj.resolved_consent_id, consent_obj.id if consent_obj else None
+                )
+
+    def test_one_consent_subquery(self):
+        with CaptureQueriesContext(connection) as context:
+            list(TestModel.objects.with_consent())
+        db_table = f'"{SubjectConsent._meta.db_table}"'
+        self.assertEqual(context.captured_queries[0]["sql"].count(db_table), 1)
+        self.assertIn(f"FROM {db_table}", context.captured_queries[1]["sql"])
+
+    def test_values(self):
+        with self.assertNumQueries(1):
+            rows = list(TestModel.objects.with_consent().values("id", "resolved_consent_id"))
+        self.assertEqual(len(rows), 6)
+
+    def test_filter_on_annotation(self):
+        qs = TestModel.objects.with_consent().filter(resolved_consent_id__isnull=True)
+        self.assertEqual(sorted(obj.subject_identifier for obj in qs), ["S002", "S999"])
+
+    def test_consent_model(self):
+        qs = TestModel.objects.with_consent(consent_model="consent_app.subjectconsent")
+        self.assertEqual(qs.count(), 6)
+        self.assertRaises(
+            ConsentError, TestModel.objects.with_consent, consent_model="consent_app.blah"
+        )
@@ -0,0 +1,12 @@
+from django.urls import path
+from edc_data_manager.admin_site import edc_data_manager_admin
+
+from consent_app.admin_site import consent_app_admin
+
+from ..admin_site import edc_consent_admin
+
+urlpatterns = [
+    path("consent_app/admin/", consent_app_admin.urls),
+    path("edc_consent/admin/", edc_consent_admin.urls),
+    path("edc_data_manager/admin/", edc_data_manager_admin.urls),
+]
@@ -0,0 +1,253 @@
+"""Build, update and check the subject consent timeline.
+
+`SubjectConsentTimeline` has one row per subject per consent with the
+interval for which the consent is valid. "Was the subject consented,
+and under which version, on this datetime?" is then a single indexed
+range query:
+
+    obj = SubjectConsentTimeline.objects.consented_at(
+        subject_identifier, report_datetime
+    )
+    obj.get_version(report_datetime) if obj else None
+
+A consent is valid from its consent datetime to the next consent
+datetime of the subject if the consent definition is updated by
+another, otherwise to the end of the consent definition. This mirrors
+`site_consents.get_consent_or_raise`.
+
+The timeline is kept up to date on consent and consent extension saves
+and deletes if settings.EDC_CONSENT_TIMELINE=True, see
+`connect_timeline_signals`. Use the management command
+`rebuild_consent_timeline` to rebuild or check it.
+"""
+
+from __future__ import annotations
+
+from itertools import groupby
+from operator import attrgetter
+from typing import Iterable
+from uuid import UUID, uuid4
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from edc_constants.constants import YES
+
+from .models.subject_consent_timeline import SubjectConsentTimeline
+from .routers import is_consent_model
+from .site_consents import site_consents
+from .utils import get_consent_models
+
+__all__ = [
+    "check_timeline",
+    "connect_timeline_signals",
+    "disconnect_timeline_signals",
+    "get_subject_identifiers",
+    "get_timeline_rows",
+    "rebuild_timeline",
+    "timeline_enabled",
+    "update_subject_timeline",
+]
+
+TIMELINE_FIELDS = [
+    "subject_identifier",
+    "site_id",
+    "consent_id",
+    "consent_model",
+    "consent_definition_name",
+    "version",
+    "start",
+    "end",
+    "extension_version",
+    "extension_start",
+]
+
+
+def timeline_enabled() -> bool:
+    return getattr(settings, "EDC_CONSENT_TIMELINE", False)
+
+
+def update_subject_timeline_on_save_or_delete(sender, instance, using, raw=None, **kwargs):
+    """post_save and post_delete receiver that updates the subject's
+    rows in SubjectConsentTimeline, see `connect_timeline_signals`.
+    """
+    if not raw and is_consent_model(sender):
+        update_subject_timeline(
+            instance.subject_identifier,
+            consent_id=getattr(instance, "subject_consent_id", instance.id),
+            using=using,
+        )
+
+
+def connect_timeline_signals() -> None:
+    """Connects the timeline receivers. Called from AppConfig.ready
+    if `timeline_enabled`, and when the setting changes.
+    """
+    post_save.connect(
+        update_subject_timeline_on_save_or_delete,
+        weak=False,
+        dispatch_uid="update_subject_timeline_on_post_save",
+    )
+    post_delete.connect(
+        update_subject_timeline_on_save_or_delete,
+        weak=False,
+        dispatch_uid="update_subject_timeline_on_post_delete",
+    )
+
+
+def disconnect_timeline_signals() -> None:
+    post_save.disconnect(dispatch_uid="update_subject_timeline_on_post_save")
+    post_delete.disconnect(dispatch_uid="update_subject_timeline_on_post_delete")
+
+
+def timeline_setting_changed(setting: str, **kwargs) -> None:
+    """`setting_changed` receiver, e.g. for override_settings."""
+    if setting == "EDC_CONSENT_TIMELINE":
+        if timeline_enabled():
+            connect_timeline_signals()
+        else:
+            disconnect_timeline_signals()
+
+
+def get_subject_identifiers(using: str | None = None) -> list[str]:
+    subject_identifiers = set()
+    for model_cls in get_consent_models():
+        subject_identifiers.update(
+            model_cls._base_manager.using(using).values_list("subject_identifier", flat=True)
+        )
+    return sorted(subject_identifiers)
+
+
+def get_agreed_extensions(
+    subject_identifiers: Iterable[str] | None = None, using: str | None = None
+) -> dict[str, set[UUID]]:
+    """Returns a dict of subject consent ids by consent definition
+    extension name where the subject agreed to the extension.
+    """
+    agreed = {}
+    for cdef in site_consents.registry.values():
+        if extension := cdef.extended_by:
+            qs = extension.model_cls._base_manager.using(using).filter(
+                report_datetime__gte=extension.start, agrees_to_extension=YES
+            )
+            if subject_identifiers is not None:
+                qs = qs.filter(subject_identifier__in=subject_identifiers)
+            agreed[extension.name] = set(qs.values_list("subject_consent_id", flat=True))
+    return agreed
+
+
+def get_timeline_rows(
+    subject_identifiers: Iterable[str] | None = None, using: str | None = None
+) -> list[SubjectConsentTimeline]:
+    """Returns unsaved timeline rows built from the consents of
+    the given subjects, or of all subjects if None.
+    """
+    if subject_identifiers is not None:
+        subject_identifiers = list(subject_identifiers)
+    consents = []
+    for model_cls in get_consent_models():
+        qs = model_cls._base_manager.using(using).only(
+            "id",
+            "subject_identifier",
+            "site_id",
+            "consent_datetime",
+            "consent_definition_name",
+            "version",
+        )
+        if subject_identifiers is not None:
+            qs = qs.filter(subject_identifier__in=subject_identifiers)
+        consents.extend(qs)
+    consents.sort(key=attrgetter("subject_identifier", "consent_datetime"))
+    agreed = get_agreed_extensions(subject_identifiers, using=using)
+    rows = []
+    for _, group in groupby(consents, key=attrgetter("subject_identifier")):
+        group = list(group)
+        for consent_obj, next_consent_obj in zip(group, group[1:] + [None]):
+            if not (cdef := site_consents.registry.get(consent_obj.consent_definition_name)):
+                continue
+            end = cdef.end
+            if next_consent_obj and cdef.updated_by:
+                end = next_consent_obj.consent_datetime
+            elif next_consent_obj:
+                end = min(end, next_consent_obj.consent_datetime)
+            extension = cdef.extended_by
+            if extension and consent_obj.id not in agreed.get(extension.name, ()):
+                extension = None
+            rows.append(
+                SubjectConsentTimeline(
+                    # set here, not by UUIDAutoField.pre_save, see bulk_create
+                    id=uuid4(),
+                    subject_identifier=consent_obj.subject_identifier,
+                    site_id=consent_obj.site_id,
+                    consent_id=consent_obj.id,
+                    consent_model=cdef.model,
+                    consent_definition_name=cdef.name,
+                    version=consent_obj.version,
+                    start=consent_obj.consent_datetime,
+                    end=end,
+                    extension_version=extension.version if extension else None,
+                    extension_start=extension.start if extension else None,
+                )
+            )
+    return rows
+
+
+def update_subject_timeline(
+    subject_identifier: str, consent_id: UUID | None = None, using: str | None = None
+) -> None:
+    """Replaces the timeline rows of a subject.
+
+    Also removes any row for `consent_id`, in case the consent's
+    subject_identifier changed.
+    """
+    qs = SubjectConsentTimeline.objects.using(using)
+    with transaction.atomic(using=using):
+        qs.filter(subject_identifier=subject_identifier).delete()
+        if consent_id:
+            qs.filter(consent_id=consent_id).delete()
+        qs.bulk_create(get_timeline_rows([subject_identifier], using=using))
+
+
+def rebuild_timeline(batch_size: int | None = None, using: str | None = None) -> int:
+    """Rebuilds the timeline for all subjects and returns the
+    number of rows created.
+    """
+    batch_size = batch_size or 500
+    subject_identifiers = get_subject_identifiers(using=using)
+    count = 0
+    qs = SubjectConsentTimeline.objects.using(using)
+    with transaction.atomic(using=using):
+        qs.all().delete()
+        for index in range(0, len(subject_identifiers), batch_size):
+            rows = get_timeline_rows(
+                subject_identifiers[index : index + batch_size], using=using
+            )
+            count += len(qs.bulk_create(rows))
+    return count
+
+
+def check_timeline(batch_size: int | None = None, using: str | None = None) -> list[str]:
+    """Returns a sorted list of subject identifiers where the
+    timeline does not match the consents.
+    """
+    batch_size = batch_size or 500
+    subject_identifiers = get_subject_identifiers(using=using)
+    # rows of subjects without a consent
+    stale = set(
+        SubjectConsentTimeline.objects.using(using)
+        .values_list("subject_identifier", flat=True)
+        .distinct()
+    ).difference(subject_identifiers)
+    for index in range(0, len(subject_identifiers), batch_size):
+        batch = subject_identifiers[index : index + batch_size]
+        expected = {
+            tuple(getattr(row, f) for f in TIMELINE_FIELDS)
+            for row in get_timeline_rows(batch, using=using)
+        }
+        stored = set(
+            SubjectConsentTimeline.objects.using(using)
+            .filter(subject_identifier__in=batch)
+            .values_list(*TIMELINE_FIELDS)
+        )
+        stale.update(row[0] for row in expected.symmetric_difference(stored))
+    return sorted(stale)
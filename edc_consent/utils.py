@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Iterable, Type
 
 from django import forms
 from django.apps import apps as django_apps
 from django.conf import settings
 from django.db import models
+from edc_constants.constants import OPEN
+from edc_data_manager.get_data_queries import get_data_queries
 from edc_sites import site_sites
 
 from .exceptions import ConsentDefinitionDoesNotExist
 from .site_consents import site_consents
 
 if TYPE_CHECKING:
+    from django.db.models import QuerySet
     from edc_model.models import BaseUuidModel
 
     from edc_consent.consent_definition import ConsentDefinition
@@ -72,6 +75,17 @@ def get_reconsent_model_cls() -> models.Model:
     return django_apps.get_model(get_reconsent_model_name())
 
 
+def get_consent_models() -> list[Type[ConsentModelMixin]]:
+    """Returns the concrete consent models of the registered
+    consent definitions.
+    """
+    consent_models = {}
+    for cdef in site_consents.registry.values():
+        model_cls = cdef.model_cls._meta.concrete_model
+        consent_models[model_cls._meta.label_lower] = model_cls
+    return list(consent_models.values())
+
+
 def verify_initials_against_full_name(
     first_name: str | None = None,
     last_name: str | None = None,
@@ -102,3 +116,29 @@ def values_as_string(*values) -> str | None:
 def get_remove_patient_names_from_countries() -> list[str]:
     """Returns a list of country names."""
     return getattr(settings, "EDC_CONSENT_REMOVE_PATIENT_NAMES_FROM_COUNTRIES", [])
+
+
+def get_open_data_queries(subject_identifiers: Iterable[str], model: str) -> QuerySet:
+    """Returns one queryset of open data queries for all the given
+    subjects.
+
+    Filters as `get_data_queries` but on `subject_identifier__in`.
+    """
+    return get_data_queries(
+        model=model, status=OPEN, subject_identifier__in=list(set(subject_identifiers))
+    )
+
+
+def get_open_data_query_counts(
+    subject_identifiers: Iterable[str], model: str
+) -> dict[str, int]:
+    """Returns a dict of {subject_identifier: count} of open data
+    queries. Subjects without open data queries are not included.
+    """
+    return {
+        row["subject_identifier"]: row["open_queries"]
+        for row in get_open_data_queries(subject_identifiers, model)
+        .order_by()
+        .values("subject_identifier")
+        .annotate(open_queries=models.Count("id", distinct=True))
+    }
@@ -8,13 +8,17 @@ from edc_sites import site_sites
 
 from .. import site_consents
 from ..exceptions import ConsentDefinitionDoesNotExist, NotConsentedError
+from ..instrumentation import record_cache_hit
 
 if TYPE_CHECKING:
-    from django.db.models import QuerySet
-
     from ..consent_definition import ConsentDefinition
+    from ..consent_definition_extension import ConsentExtensionLikeModel
     from ..stubs import ConsentLikeModel
 
+# sentinel for values not yet fetched. `None` and `[]` are valid
+# fetched values and are cached.
+NOT_FETCHED = object()
+
 
 class ConsentViewMixin:
     consent_model: str | dict[str, str] = None
@@ -22,9 +26,10 @@ class ConsentViewMixin:
     """Declare with edc_appointment view mixin to get `appointment`."""
 
     def __init__(self, **kwargs):
-        self._consent: ConsentLikeModel | None = None
-        self._consents: QuerySet | None = None
-        self._consent_definition: ConsentDefinition | None = None
+        self._consent: ConsentLikeModel | None | object = NOT_FETCHED
+        self._consents: list[ConsentLikeModel] | object = NOT_FETCHED
+        self._consent_definition: ConsentDefinition | None | object = NOT_FETCHED
+        self._consent_extension: ConsentExtensionLikeModel | None | object = NOT_FETCHED
         super().__init__(**kwargs)
 
     def get_context_data(self, **kwargs) -> dict[str, Any]:
@@ -35,48 +40,135 @@ class ConsentViewMixin:
         except ConsentDefinitionDoesNotExist as e:
             messages.add_message(self.request, message=str(e), level=ERROR)
         else:
-            kwargs.update(consent=self.consent, consents=self.consents)
+            kwargs.update(
+                consent=self.consent,
+                consents=self.consents,
+                consent_extension=self.consent_extension,
+            )
         return super().get_context_data(**kwargs)
 
+    def prefetch_consent_context(self) -> None:
+        """Resolves the consent definition, consents, consent and
+        consent extension for this subject.
+
+        Call once per request, e.g. from `get`, before composing the
+        dashboard. Each value is fetched at most once per request so
+        other view mixins accessing these attributes do not query
+        again. The consent is taken from the fetched consents, so
+        this is one query per concrete consent model, usually one,
+        and one for the consent extension.
+        """
+        try:
+            self.consent_definition  # noqa
+        except ConsentDefinitionDoesNotExist:
+            pass
+        else:
+            self.consents  # noqa
+            self.consent  # noqa
+            self.consent_extension  # noqa
+
     @property
-    def consents(self) -> QuerySet[ConsentLikeModel]:
-        """Returns a Queryset of consents for this subject."""
-        if not self._consents:
+    def consents(self) -> list[ConsentLikeModel]:
+        """Returns a list of consents for this subject."""
+        if self._consents is NOT_FETCHED:
             self._consents = site_consents.get_consents(
                 self.subject_identifier, site_id=self.request.site.id
             )
+        else:
+            record_cache_hit("ConsentViewMixin.consents")
         return self._consents
 
     @property
     def consent(self) -> ConsentLikeModel | None:
         """Returns a consent model instance or None for the current
         period.
+
+        Resolved as by `site_consents.get_consent_or_raise` but from
+        the already fetched `consents`, see `get_current_consent_or_raise`.
         """
-        if not self._consent:
+        if self._consent is NOT_FETCHED:
+            self._consent = None
             try:
-                self._consent = site_consents.get_consent_or_raise(
-                    subject_identifier=self.subject_identifier,
-                    report_datetime=self.report_datetime,
-                    site_id=self.request.site.id,
-                )
+                self._consent = self.get_current_consent_or_raise()
             except NotConsentedError as e:
                 messages.add_message(self.request, message=str(e), level=ERROR)
+        else:
+            record_cache_hit("ConsentViewMixin.consent")
         return self._consent
 
+    def get_current_consent_or_raise(self) -> ConsentLikeModel:
+        """Returns the consent for the current period from `consents`
+        or raises NotConsentedError, as
+        `site_consents.get_consent_or_raise`.
+        """
+        cdef = site_consents.get_consent_definition(
+            report_datetime=self.report_datetime, site=site_sites.get(self.request.site.id)
+        )
+        consent_obj = self.get_fetched_consent(cdef)
+        if not consent_obj:
+            raise cdef.not_consented_error(self.subject_identifier)
+        if previous_cdef := site_consents.get_previous_cdef_or_raise(
+            cdef, consent_obj, self.subject_identifier, self.report_datetime
+        ):
+            consent_obj = self.get_fetched_consent(previous_cdef)
+            if not consent_obj:
+                raise previous_cdef.not_consented_error(self.subject_identifier)
+        return consent_obj
+
+    def get_fetched_consent(self, cdef: ConsentDefinition) -> ConsentLikeModel | None:
+        """Returns the consent in `consents` for the consent
+        definition or None.
+        """
+        for consent_obj in self.consents:
+            if (
+                consent_obj._meta.label_lower == cdef.model
+                and consent_obj.version == cdef.version
+            ):
+                return consent_obj
+        return None
+
     @property
     def consent_definition(self) -> ConsentDefinition:
         """Returns a ConsentDefinition from the schedule for the
         current reporting period.
         """
-        if not self._consent_definition:
+        if self._consent_definition is NOT_FETCHED:
+            consent_definition = None
             if self.current_schedule:
-                self._consent_definition = self.current_schedule.get_consent_definition(
+                consent_definition = self.current_schedule.get_consent_definition(
                     report_datetime=self.report_datetime,
                     site=site_sites.get(self.request.site.id),
                 )
             elif self.appointment:
-                self._consent_definition = self.appointment.schedule.get_consent_definition(
+                consent_definition = self.appointment.schedule.get_consent_definition(
                     report_datetime=self.appointment.appt_datetime,
                     site=site_sites.get(self.appointment.site.id),
                 )
+            self._consent_definition = consent_definition
+        else:
+            record_cache_hit("ConsentViewMixin.consent_definition")
         return self._consent_definition
+
+    @property
+    def consent_extension(self) -> ConsentExtensionLikeModel | None:
+        """Returns the consent extension model instance, if the
+        subject agreed to extend followup, or None.
+
+        Uses the already fetched `consent` instead of looking up
+        the parent consent again.
+        """
+        if self._consent_extension is NOT_FETCHED:
+            self._consent_extension = None
+            if (
+                self.consent_definition
+                and self.consent_definition.extended_by
+                and self.consent
+            ):
+                self._consent_extension = (
+                    self.consent_definition.extended_by.get_consent_extension_for(
+                        subject_consent=self.consent
+                    )
+                )
+        else:
+            record_cache_hit("ConsentViewMixin.consent_extension")
+        return self._consent_extension
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""Runs the edc_consent benchmark suite and writes the results to a
+JSON file so that runs can be compared over time.
+
+    python runbenchmarks.py --output benchmarks/$(date +%Y%m%d).json
+    python runbenchmarks.py --compare benchmarks/20240101.json
+
+Benchmarks are the `bench_*.py` modules in `edc_consent.tests.benchmarks`.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess  # nosec B404
+import sys
+from datetime import datetime, timezone
+
+
+def get_git_revision() -> str | None:
+    try:
+        return subprocess.check_output(  # nosec B603 B607
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result: dict) -> str:
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare(previous_path: str, results: list[dict]) -> None:
+    with open(previous_path) as f:
+        previous = {result_key(r): r for r in json.load(f)["results"]}
+    sys.stdout.write(f"\nCompared to {previous_path}:\n")
+    for result in results:
+        key = result_key(result)
+        if old := previous.get(key):
+            change = (result["median"] - old["median"]) / old["median"] * 100
+            sys.stdout.write(
+                f"  {key}: median {old['median'] * 1000:.3f}ms -> "
+                f"{result['median'] * 1000:.3f}ms ({change:+.1f}%), "
+                f"queries {old['queries']} -> {result['queries']}\n"
+            )
+        else:
+            sys.stdout.write(f"  {key}: new\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("labels", nargs="*", default=["edc_consent.tests.benchmarks"])
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", default=None, help="a previous results file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "edc_consent.tests.test_settings")
+
+    import django
+    from django.conf import settings
+    from django.test.utils import get_runner
+
+    django.setup()
+
+    from edc_consent.tests.benchmarks.benchmark_test_case import benchmark_results
+
+    test_runner = get_runner(settings)(pattern="bench_*.py", verbosity=1)
+    failures = test_runner.run_tests(args.labels)
+    with open(args.output, "w") as f:
+        json.dump(
+            dict(
+                created=datetime.now(timezone.utc).isoformat(),
+                git_revision=get_git_revision(),
+                python=platform.python_version(),
+                django=django.get_version(),
+                results=benchmark_results,
+            ),
+            f,
+            indent=2,
+        )
+    sys.stdout.write(f"Wrote {len(benchmark_results)} results to {args.output}\n")
+    if args.compare:
+        compare(args.compare, benchmark_results)
+    sys.exit(bool(failures))
+
+
+if __name__ == "__main__":
+    main()